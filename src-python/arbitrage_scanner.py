@@ -0,0 +1,214 @@
+import bisect
+import heapq
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+class SymbolBook:
+    """
+    Latest quote per exchange for one symbol, with the best bid and best ask
+    across exchanges kept in heaps.
+
+    Heap entries are invalidated lazily: an entry is live only while its
+    sequence number matches the exchange's latest quote, so an update is one
+    push per side and stale entries are dropped when they reach the top.
+    """
+
+    def __init__(self):
+        self.quotes: Dict[str, Tuple[float, float, float, int]] = {}  # exchange -> (bid, ask, timestamp, seq)
+        self.bids: List[Tuple[float, int, str]] = []  # (-bid, seq, exchange), max-heap by bid
+        self.asks: List[Tuple[float, int, str]] = []  # (ask, seq, exchange), min-heap by ask
+        self._seq = 0
+
+    def update(self, exchange: str, bid: float, ask: float, timestamp: float) -> None:
+        self._seq += 1
+        self.quotes[exchange] = (bid, ask, timestamp, self._seq)
+        heapq.heappush(self.bids, (-bid, self._seq, exchange))
+        heapq.heappush(self.asks, (ask, self._seq, exchange))
+        # Rebuild once stale entries dominate so the heaps stay O(exchanges)
+        if len(self.bids) > 4 * len(self.quotes) + 16:
+            self.compact()
+
+    def remove(self, exchange: str) -> None:
+        self.quotes.pop(exchange, None)
+
+    def compact(self) -> None:
+        self.bids = [(-bid, seq, exchange) for exchange, (bid, _, _, seq) in self.quotes.items()]
+        self.asks = [(ask, seq, exchange) for exchange, (_, ask, _, seq) in self.quotes.items()]
+        heapq.heapify(self.bids)
+        heapq.heapify(self.asks)
+
+    def _live(self, entry: Tuple[float, int, str]) -> bool:
+        quote = self.quotes.get(entry[2])
+        return quote is not None and quote[3] == entry[1]
+
+    def _top_two(self, heap: List[Tuple[float, int, str]]) -> List[Tuple[float, int, str]]:
+        """Return up to the two best live entries of a heap, discarding stale ones on the way."""
+        best = []
+        while heap and len(best) < 2:
+            entry = heapq.heappop(heap)
+            if self._live(entry):
+                best.append(entry)
+        for entry in best:
+            heapq.heappush(heap, entry)
+        return best
+
+    def best_pair(self) -> Optional[Tuple[str, float, str, float]]:
+        """
+        Return the most profitable (buy exchange, ask, sell exchange, bid) pair.
+
+        Buying and selling on the same exchange is not an arbitrage, so if one
+        exchange holds both the best bid and the best ask, the runner-up on
+        either side is used instead.
+        """
+        bids = self._top_two(self.bids)
+        asks = self._top_two(self.asks)
+        pairs = [(bid, ask) for bid in bids for ask in asks if bid[2] != ask[2]]
+        if not pairs:
+            return None
+        bid, ask = max(pairs, key=lambda pair: -pair[0][0] - pair[1][0])
+        return ask[2], ask[0], bid[2], -bid[0]
+
+class ArbitrageScanner:
+    """
+    Cross-exchange arbitrage scanner updated incrementally as ticks arrive.
+
+    Each symbol's best opportunity is recomputed from its heaps on update
+    (O(log n) in the number of exchanges) and kept in a spread index sorted
+    across symbols, so opportunities above a minimum spread are found with a
+    binary search instead of comparing every pair of venues per query.
+    Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._books: Dict[str, SymbolBook] = {}
+        self._best: Dict[str, Dict[str, Any]] = {}
+        self._index: List[Tuple[float, str]] = []  # (spread, symbol), ascending
+        self.updates = 0
+
+    def update(self, symbol: str, exchange: str, bid: float, ask: float,
+               timestamp: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Record an exchange's latest quote for a symbol.
+
+        Args:
+            symbol: Trading symbol
+            exchange: Exchange name
+            bid: Best bid on the exchange
+            ask: Best ask on the exchange
+            timestamp: Unix timestamp of the quote (default: now)
+
+        Returns:
+            The symbol's best opportunity after the update, or None if no two
+            exchanges are quoting it
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            book = self._books.get(symbol)
+            if book is None:
+                book = self._books[symbol] = SymbolBook()
+            book.update(exchange, bid, ask, timestamp)
+            self.updates += 1
+            return self._reindex(symbol, book)
+
+    def remove(self, symbol: str, exchange: str) -> None:
+        """Forget an exchange's quote for a symbol, e.g. when its feed goes stale."""
+        with self._lock:
+            book = self._books.get(symbol)
+            if book is not None:
+                book.remove(exchange)
+                self._reindex(symbol, book)
+
+    def _reindex(self, symbol: str, book: SymbolBook) -> Optional[Dict[str, Any]]:
+        previous = self._best.pop(symbol, None)
+        if previous is not None:
+            position = bisect.bisect_left(self._index, (previous["spread"], symbol))
+            del self._index[position]
+
+        pair = book.best_pair()
+        if pair is None:
+            return None
+        buy_exchange, buy_price, sell_exchange, sell_price = pair
+        spread = (sell_price - buy_price) / buy_price * 100 if buy_price else 0.0
+        opportunity = {
+            "symbol": symbol,
+            "buy_exchange": buy_exchange,
+            "sell_exchange": sell_exchange,
+            "buy_price": buy_price,
+            "sell_price": sell_price,
+            "spread": spread,  # Percentage
+            "potential_profit": sell_price - buy_price  # Per unit, before fees
+        }
+        self._best[symbol] = opportunity
+        bisect.insort(self._index, (spread, symbol))
+        return opportunity
+
+    def on_ingested(self, topic: str, data: Dict[str, Any]) -> None:
+        """`DataIngestor` listener: update quotes from ticks (the last price stands in for a missing bid/ask)."""
+        if topic != "ticks":
+            return
+        price = data.get("price")
+        self.update(data["symbol"], data["exchange"], data.get("bid", price), data.get("ask", price))
+
+    def best_opportunity(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Return the symbol's best cross-exchange pair (its spread may be negative)."""
+        with self._lock:
+            opportunity = self._best.get(symbol)
+            return dict(opportunity) if opportunity is not None else None
+
+    def opportunities(self, min_spread: float = 0.0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Return the best opportunity of every symbol whose spread is at least `min_spread`.
+
+        Args:
+            min_spread: Minimum spread percentage
+            limit: Maximum number of opportunities to return
+
+        Returns:
+            Opportunities ordered by spread, widest first
+        """
+        with self._lock:
+            start = bisect.bisect_left(self._index, (min_spread, ""))
+            matches = self._index[start:][::-1]
+            if limit is not None:
+                matches = matches[:limit]
+            return [dict(self._best[symbol]) for _, symbol in matches]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "symbols": len(self._books),
+                "quotes": sum(len(book.quotes) for book in self._books.values()),
+                "updates": self.updates
+            }
+
+# Example usage
+if __name__ == "__main__":
+    import random
+
+    scanner = ArbitrageScanner()
+    exchanges = [f"Exchange {i}" for i in range(20)]
+    symbols = [f"COIN{i}" for i in range(200)]
+    updates = 200000
+    started = time.perf_counter()
+    for _ in range(updates):
+        price = 100.0 * (1 + random.gauss(0, 0.002))
+        scanner.update(random.choice(symbols), random.choice(exchanges), price - 0.01, price + 0.01)
+    elapsed = time.perf_counter() - started
+    print(f"{updates} updates in {elapsed:.3f}s ({elapsed / updates * 1e6:.2f} µs each)")
+
+    started = time.perf_counter()
+    for _ in range(1000):
+        found = scanner.opportunities(min_spread=0.5)
+    print(f"opportunities(min_spread=0.5): {len(found)} found in {(time.perf_counter() - started) * 1000:.3f} µs per query")
+
+    # Cross-check the index against a pairwise scan of every symbol
+    for symbol in symbols[:20]:
+        quotes = scanner._books[symbol].quotes
+        pairwise = max((bid - ask) / ask * 100
+                       for buy, (_, ask, _, _) in quotes.items()
+                       for sell, (bid, _, _, _) in quotes.items() if buy != sell)
+        assert abs(pairwise - scanner.best_opportunity(symbol)["spread"]) < 1e-9
+    print("Spread index matches pairwise comparison")
+    print(scanner.opportunities(min_spread=0.5, limit=2))
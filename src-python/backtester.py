@@ -1,8 +1,18 @@
-import sqlite3
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, List, Optional, Callable, TYPE_CHECKING
 from datetime import datetime, timedelta
-import pandas as pd
 from base_strategy import BaseStrategy
+from fill_simulator import FillSimulator, SlippageModel
+from records import Tick
+from strategy_profiler import PROFILER
+from metrics import REGISTRY
+
+BACKTEST_SECONDS = REGISTRY.histogram("noah_backtest_seconds", "Time to run one backtest")
+BACKTEST_TICKS = REGISTRY.counter("noah_backtest_ticks_total", "Ticks fed to strategies by the backtester")
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from history_cache import PriceArrays
 
 class Backtester:
     """Backtesting engine for trading strategies."""
@@ -10,7 +20,36 @@ class Backtester:
     def __init__(self, db_path: str = "market_data.db"):
         self.db_path = db_path
         
-    def fetch_historical_data(self, symbol: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+    def load_price_arrays(self, symbol: str, start_date: datetime, end_date: datetime,
+                          resolution: str = "1min") -> "PriceArrays":
+        """
+        Get historical bars as column arrays through the process-wide history cache.
+        
+        Repeated and overlapping ranges are served from memory without copying;
+        only bars not cached yet are loaded.
+        
+        Args:
+            symbol: Trading symbol
+            start_date: Start date for data retrieval
+            end_date: End date for data retrieval (inclusive)
+            resolution: Bar size (see history_cache.RESOLUTION_SECONDS)
+            
+        Returns:
+            PriceArrays viewing the cached data (read-only)
+        """
+        # numpy is imported on first use to keep engine startup fast
+        from history_cache import HISTORY_CACHE
+        return HISTORY_CACHE.get(self.db_path, symbol, resolution, start_date, end_date, self._load_bars)
+    
+    def _load_bars(self, symbol: str, start_ts: int, end_ts: int, step: int) -> "PriceArrays":
+        """Load bars with timestamps in [start_ts, end_ts) (history cache loader)."""
+        from synthetic_market import SYNTHETIC_MARKET
+        
+        # In a real implementation, you would fetch actual historical data
+        # For now, we'll generate seeded synthetic data
+        return SYNTHETIC_MARKET.bars(symbol, start_ts, end_ts, step)
+    
+    def fetch_historical_data(self, symbol: str, start_date: datetime, end_date: datetime) -> "pd.DataFrame":
         """
         Fetch historical market data from the database.
         
@@ -22,111 +61,138 @@ class Backtester:
         Returns:
             DataFrame with historical market data
         """
-        conn = sqlite3.connect(self.db_path)
-        
-        # In a real implementation, you would fetch actual historical data
-        # For now, we'll generate simulated data
-        dates = pd.date_range(start=start_date, end=end_date, freq='1min')
-        prices = [65000 + i * 0.1 for i in range(len(dates))]
+        # pandas is imported on first use to keep engine startup fast
+        import pandas as pd
         
-        data = pd.DataFrame({
-            'timestamp': dates,
+        arrays = self.load_price_arrays(symbol, start_date, end_date)
+        return pd.DataFrame({
+            'timestamp': pd.to_datetime(arrays.timestamps, unit='s'),
             'symbol': symbol,
-            'open': prices,
-            'high': [p + 100 for p in prices],
-            'low': [p - 100 for p in prices],
-            'close': [p + 50 for p in prices],
-            'volume': [1000000 + i * 1000 for i in range(len(dates))]
+            'open': arrays.open,
+            'high': arrays.high,
+            'low': arrays.low,
+            'close': arrays.close,
+            'volume': arrays.volume
         })
-        
-        conn.close()
-        return data
     
-    def run_backtest(self, strategy: BaseStrategy, symbol: str, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+    def run_backtest(self, strategy: BaseStrategy, symbol: str, start_date: datetime, end_date: datetime,
+                     progress_callback: Optional[Callable[[int, int], None]] = None, latency: float = 0.0,
+                     slippage: Optional[SlippageModel] = None,
+                     max_participation: Optional[float] = 0.1, profile: bool = False) -> Dict[str, Any]:
         """
         Run a backtest for a given strategy.
         
+        Signals are orders matched bar by bar by a `FillSimulator` (market,
+        limit and stop orders, partial fills); each fill is passed to
+        `strategy.on_order_fill`.
+        
         Args:
             strategy: Strategy to backtest
             symbol: Trading symbol
             start_date: Start date for backtest
             end_date: End date for backtest
+            progress_callback: Optional callable receiving (rows processed, total rows),
+                called about every 1% of the data
+            latency: Seconds before an order reaches the simulated market; with 0,
+                market orders fill at the close of the bar that produced them
+            slippage: Slippage model for market and stop fills (default: none)
+            max_participation: Share of each bar's volume an order can take
+            profile: Profile the strategy's callbacks during this backtest only (see
+                strategy_profiler) and add the report to the results
             
         Returns:
             Dictionary with backtest results
         """
-        # Fetch historical data
-        data = self.fetch_historical_data(symbol, start_date, end_date)
+        started = time.perf_counter()
+        
+        # Fetch historical data (cached column arrays; no DataFrame is built)
+        import numpy as np
+        data = self.load_price_arrays(symbol, start_date, end_date)
         
         # Initialize tracking variables
-        portfolio_value = 100000.0  # Starting portfolio value
-        positions = {}  # Current positions
+        initial_value = 100000.0  # Starting portfolio value
         trades = []  # Trade history
         portfolio_history = []  # Portfolio value history
         
+        # Pull the columns out once; iterating plain lists avoids per-row
+        # numpy scalar boxing
+        opens = data.open.tolist()
+        highs = data.high.tolist()
+        lows = data.low.tolist()
+        closes = data.close.tolist()
+        volumes = data.volume.tolist()
+        seconds = data.timestamps.tolist()
+        timestamps = np.datetime_as_string(data.timestamps.astype('datetime64[s]')).tolist()
+        total_rows = len(closes)
+        progress_step = max(1, total_rows // 100)
+        
+        def record_fill(fill: Dict[str, Any]):
+            # Fills happen within the current bar, so they carry its timestamp
+            value = fill['amount'] * fill['price']
+            trades.append({
+                'timestamp': timestamp,
+                'action': fill['action'],
+                'symbol': fill['symbol'],
+                'amount': fill['amount'],
+                'price': fill['price'],
+                'cost' if fill['action'] == 'BUY' else 'revenue': value,
+                'order_id': fill['order_id'],
+                'order_type': fill['order_type']
+            })
+            on_order_fill(dict(fill, timestamp=timestamp))
+        
+        simulator = FillSimulator(cash=initial_value, latency=latency, slippage=slippage,
+                                  max_participation=max_participation, on_fill=record_fill, symbols=(symbol,))
+        
+        # Profile this run only: the callbacks are wrapped here rather than on the
+        # strategy instance, so live ticks are not counted and profiling enabled
+        # through the API is left alone
+        on_tick = strategy.on_tick
+        on_order_fill = strategy.on_order_fill
+        strategy_profile = PROFILER.detached(strategy) if profile else None
+        if strategy_profile is not None:
+            on_tick = strategy_profile.wrap("on_tick", getattr(on_tick, "__wrapped__", on_tick))
+            on_order_fill = strategy_profile.wrap("on_order_fill", getattr(on_order_fill, "__wrapped__", on_order_fill))
+        
         # Run the backtest
-        for index, row in data.iterrows():
-            # Create market data dictionary
-            market_data = {
-                'symbol': row['symbol'],
-                'price': row['close'],
-                'timestamp': row['timestamp'].isoformat(),
-                'sma_short': row['close'] - 100,  # Simulated short SMA
-                'sma_long': row['close'] - 200   # Simulated long SMA
-            }
+        for row_index, (close, timestamp) in enumerate(zip(closes, timestamps)):
+            if progress_callback is not None and row_index % progress_step == 0:
+                progress_callback(row_index, total_rows)
             
-            # Get signals from strategy
-            signals = strategy.on_tick(market_data)
+            # Match resting and in-flight orders against this bar
+            bar_time = seconds[row_index]
+            simulator.on_bar(symbol, bar_time, opens[row_index], highs[row_index], lows[row_index],
+                             close, volumes[row_index])
             
-            # Process signals
-            for signal in signals:
-                if signal['action'] == 'BUY':
-                    # Simulate buying
-                    amount = signal['amount']
-                    price = row['close']
-                    cost = amount * price
-                    
-                    if portfolio_value >= cost:
-                        portfolio_value -= cost
-                        positions[symbol] = positions.get(symbol, 0) + amount
-                        trades.append({
-                            'timestamp': row['timestamp'].isoformat(),
-                            'action': 'BUY',
-                            'symbol': symbol,
-                            'amount': amount,
-                            'price': price,
-                            'cost': cost
-                        })
-                elif signal['action'] == 'SELL':
-                    # Simulate selling
-                    if symbol in positions and positions[symbol] > 0:
-                        amount = min(signal['amount'], positions[symbol])
-                        price = row['close']
-                        revenue = amount * price
-                        
-                        portfolio_value += revenue
-                        positions[symbol] -= amount
-                        trades.append({
-                            'timestamp': row['timestamp'].isoformat(),
-                            'action': 'SELL',
-                            'symbol': symbol,
-                            'amount': amount,
-                            'price': price,
-                            'revenue': revenue
-                        })
+            # Create market data tick
+            market_data = Tick(
+                symbol,
+                close,
+                timestamp,
+                None,
+                close - 100,  # Simulated short SMA
+                close - 200   # Simulated long SMA
+            )
+            
+            # Get signals from strategy and submit them as orders at the close; signals
+            # default to the backtested symbol, orders for other symbols are rejected
+            for signal in on_tick(market_data):
+                simulator.submit(dict(signal, symbol=signal.get("symbol") or symbol), bar_time, close, strategy.name)
             
             # Calculate current portfolio value
-            current_positions_value = sum(positions.get(sym, 0) * row['close'] for sym in positions)
-            total_value = portfolio_value + current_positions_value
+            current_positions_value = sum(amount * close for amount in simulator.positions.values())
+            total_value = simulator.cash + current_positions_value
             portfolio_history.append({
-                'timestamp': row['timestamp'].isoformat(),
+                'timestamp': timestamp,
                 'portfolio_value': total_value,
-                'cash': portfolio_value,
+                'cash': simulator.cash,
                 'positions_value': current_positions_value
             })
         
+        if progress_callback is not None:
+            progress_callback(total_rows, total_rows)
+        
         # Calculate performance metrics
-        initial_value = 100000.0
         final_value = portfolio_history[-1]['portfolio_value'] if portfolio_history else initial_value
         total_return = (final_value - initial_value) / initial_value
         
@@ -150,7 +216,11 @@ class Backtester:
         std_dev = (sum((r - avg_return) ** 2 for r in returns) / len(returns)) ** 0.5 if returns else 0
         sharpe_ratio = avg_return / std_dev if std_dev > 0 else 0
         
-        return {
+        elapsed = time.perf_counter() - started
+        BACKTEST_TICKS.inc(total_rows)
+        BACKTEST_SECONDS.observe(elapsed)
+        
+        results = {
             'strategy_name': strategy.name,
             'symbol': symbol,
             'start_date': start_date.isoformat(),
@@ -163,9 +233,16 @@ class Backtester:
             'max_drawdown_percent': f"{max_drawdown * 100:.2f}%",
             'sharpe_ratio': sharpe_ratio,
             'total_trades': len(trades),
+            'orders': simulator.stats(),
             'trades': trades,
             'portfolio_history': portfolio_history
         }
+        if strategy_profile is not None:
+            # Time in timed strategy callbacks vs. everything else (data, matching, accounting)
+            strategy_seconds = strategy_profile.wall_seconds()
+            results['profile'] = dict(strategy_profile.report(), backtest_seconds=elapsed,
+                                      strategy_seconds=strategy_seconds, loop_seconds=elapsed - strategy_seconds)
+        return results
 
 # Example usage
 if __name__ == "__main__":
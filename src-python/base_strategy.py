@@ -18,7 +18,8 @@ class BaseStrategy(ABC):
         Called on each market data tick.
         
         Args:
-            market_data: Dictionary containing market data
+            market_data: Market data tick; a `records.Tick` or a plain dict,
+                both of which support dict-style access
             
         Returns:
             List of trade signals/actions
@@ -35,6 +36,19 @@ class BaseStrategy(ABC):
         """
         pass
     
+    def on_arbitrage(self, opportunity: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Called with a symbol's best cross-exchange opportunity when a positive spread
+        opens, changes venue pair or moves notably (not on every tick). Optional.
+        
+        Args:
+            opportunity: Dictionary with symbol, buy/sell exchange and price, and spread (percent)
+            
+        Returns:
+            List of trade signals/actions
+        """
+        return []
+    
     def set_parameters(self, parameters: Dict[str, Any]) -> None:
         """Set strategy parameters."""
         self.parameters = parameters
@@ -62,6 +76,8 @@ class SimpleMAStrategy(BaseStrategy):
             "long_window": 200,
             "capital_allocation": 0.1
         })
+        self.fills = 0
+        self.last_fill = None
     
     def on_tick(self, market_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
@@ -102,8 +118,10 @@ class SimpleMAStrategy(BaseStrategy):
         Args:
             fill_data: Dictionary containing fill information
         """
-        # Log the fill or update internal state
-        print(f"Order filled: {fill_data}")
+        # Update internal state; no printing, since backtests and robustness
+        # resamples deliver thousands of fills
+        self.fills += 1
+        self.last_fill = fill_data
 
 # Function to dynamically load strategies
 def load_strategy_from_file(file_path: str) -> BaseStrategy:
@@ -0,0 +1,697 @@
+import asyncio
+import atexit
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Return the pct-th percentile of a list of samples (nearest rank)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+_engine_dir: Optional[str] = None
+
+def _remove_engine_dir(previous_cwd: str) -> None:
+    os.chdir(previous_cwd)
+    shutil.rmtree(_engine_dir, ignore_errors=True)
+
+def _load_engine():
+    """Import engine.py inside a scratch directory so its database, journal and token stay out of the tree.
+
+    engine.py opens its files relative to the working directory when it is
+    first imported, so the process moves into one scratch directory on the
+    first call and stays there; the directory is removed at exit.
+    """
+    global _engine_dir
+    if _engine_dir is None:
+        _engine_dir = tempfile.mkdtemp(prefix="noah-bench-")
+        atexit.register(_remove_engine_dir, os.getcwd())
+        os.chdir(_engine_dir)
+    import engine
+    return engine
+
+def bench_ping_latency_under_load(samples: int = 300, max_p99_ratio: float = 5.0) -> Dict[str, Any]:
+    """
+    Measure /ping latency idle and while a backtest and ingestion writes run.
+
+    The check is relative to the idle p99, so it holds on slow and fast
+    machines alike. A ping can wait for the GIL behind a backtest thread, so
+    the allowed p99 is never below two GIL switch intervals.
+
+    Args:
+        samples: Number of pings per phase
+        max_p99_ratio: Loaded p99 as a multiple of the idle p99 above which the check fails
+
+    Returns:
+        Dictionary with p50/p99 per phase and whether the check passed
+    """
+    import httpx
+    from base_strategy import SimpleMAStrategy
+
+    engine = _load_engine()
+    strategy = SimpleMAStrategy()
+    engine.strategies[strategy.name] = strategy
+
+    async def ping_latencies(client) -> List[float]:
+        latencies = []
+        for i in range(samples):
+            started = time.perf_counter()
+            response = await client.post("/ping", json={"token": engine.SECRET_TOKEN, "message": str(i)})
+            latencies.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+            await asyncio.sleep(0.001)
+        return latencies
+
+    async def run() -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        transport = httpx.ASGITransport(app=engine.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://engine", timeout=None) as client:
+            idle = await ping_latencies(client)
+
+            async def backtests():
+                end = datetime(2023, 1, 8)
+                while not stop.is_set():
+                    await client.post("/strategies/backtest", json={
+                        "token": engine.SECRET_TOKEN,
+                        "strategy_name": strategy.name,
+                        "symbol": "BTC",
+                        "start_date": (end - timedelta(days=7)).isoformat(),
+                        "end_date": end.isoformat()
+                    })
+
+            async def ingestion():
+                ingestor = engine.data_ingestor
+                while not stop.is_set():
+                    await loop.run_in_executor(
+                        ingestor.executor, ingestor.store_ingested_data,
+                        await ingestor.fetch_ark_mcp_data(),
+                        await ingestor.fetch_coordinator_data(),
+                        await ingestor.fetch_exchange_data("Binance", "BTCUSDT")
+                    )
+
+            load = [asyncio.ensure_future(backtests()), asyncio.ensure_future(ingestion())]
+            await asyncio.sleep(0.2)  # Let the load get going
+            loaded = await ping_latencies(client)
+            stop.set()
+            await asyncio.gather(*load)
+
+        idle_p99, loaded_p99 = percentile(idle, 99), percentile(loaded, 99)
+        max_loaded_p99_ms = max(max_p99_ratio * idle_p99, 2 * sys.getswitchinterval() * 1000)
+        return {
+            "idle_p50_ms": percentile(idle, 50),
+            "idle_p99_ms": idle_p99,
+            "loaded_p50_ms": percentile(loaded, 50),
+            "loaded_p99_ms": loaded_p99,
+            "p99_ratio": loaded_p99 / idle_p99 if idle_p99 else None,
+            "max_p99_ratio": max_p99_ratio,
+            "max_loaded_p99_ms": max_loaded_p99_ms,
+            "passed": loaded_p99 <= max_loaded_p99_ms
+        }
+
+    return asyncio.run(run())
+
+def bench_startup(timeout: float = 60.0, top: int = 10) -> Dict[str, Any]:
+    """
+    Measure engine import time per module and time to the first successful /ping.
+
+    Both run in fresh interpreters so nothing is already imported.
+
+    Args:
+        timeout: Seconds to wait for the server to answer /ping
+        top: Number of slowest third-party imports to report
+
+    Returns:
+        Dictionary with per-module import times (ms) and time to first /ping (ms)
+    """
+    import socket
+    import subprocess
+    import urllib.request
+
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=src_dir + os.pathsep + os.environ.get("PYTHONPATH", ""))
+
+    # Per-module import time from -X importtime (cumulative microseconds)
+    workdir = tempfile.mkdtemp(prefix="noah-bench-")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import engine"],
+        cwd=workdir, env=env, capture_output=True, text=True
+    )
+    imports = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if "." not in name:
+            imports[name] = int(cumulative_us) / 1000
+    own_modules = {os.path.splitext(f)[0] for f in os.listdir(src_dir) if f.endswith(".py")}
+    third_party = sorted(
+        ((name, ms) for name, ms in imports.items() if name not in own_modules and name not in getattr(sys, "stdlib_module_names", ())),
+        key=lambda item: item[1], reverse=True
+    )
+
+    # Time from process start to the first successful /ping
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    workdir = tempfile.mkdtemp(prefix="noah-bench-")
+    token_path = os.path.join(workdir, "secret_token.txt")
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "engine:app", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    first_ping_ms = None
+    try:
+        while time.perf_counter() - started < timeout and server.poll() is None:
+            try:
+                with open(token_path) as f:
+                    token = f.read()
+                request = urllib.request.Request(
+                    f"http://127.0.0.1:{port}/ping",
+                    data=json.dumps({"token": token, "message": "startup"}).encode("utf-8"),
+                    headers={"Content-Type": "application/json"}
+                )
+                with urllib.request.urlopen(request, timeout=1) as response:
+                    if response.status == 200:
+                        first_ping_ms = (time.perf_counter() - started) * 1000
+                        break
+            except (OSError, ValueError):
+                time.sleep(0.01)
+    finally:
+        server.terminate()
+        server.wait()
+
+    return {
+        "engine_import_ms": imports.get("engine"),
+        "own_modules_ms": {name: ms for name, ms in imports.items() if name in own_modules},
+        "slowest_third_party_imports_ms": dict(third_party[:top]),
+        "time_to_first_ping_ms": first_ping_ms
+    }
+
+def synthetic_backtest_results(rows: int = 100000) -> Dict[str, Any]:
+    """Build a payload shaped like `Backtester.run_backtest` output with one history entry per row."""
+    history = []
+    trades = []
+    start = datetime(2023, 1, 1)
+    for i in range(rows):
+        timestamp = (start + timedelta(minutes=i)).isoformat()
+        value = 100000.0 + i * 0.37
+        history.append({
+            "timestamp": timestamp,
+            "portfolio_value": value,
+            "cash": value * 0.9,
+            "positions_value": value * 0.1
+        })
+        if i % 10 == 0:
+            trades.append({
+                "timestamp": timestamp,
+                "action": "BUY",
+                "symbol": "BTC",
+                "amount": 0.1,
+                "price": 65000.0 + i * 0.1,
+                "cost": 6500.0 + i * 0.01
+            })
+    return {
+        "strategy_name": "Simple MA Crossover",
+        "symbol": "BTC",
+        "total_trades": len(trades),
+        "trades": trades,
+        "portfolio_history": history
+    }
+
+def bench_serialization(rows: int = 100000, repeat: int = 3) -> Dict[str, Any]:
+    """
+    Compare encode time and payload size of the backtest response across encoders.
+
+    "fastapi_default" is today's path (jsonable_encoder + json.dumps) and is
+    skipped when FastAPI is not installed; optional encoders are skipped too.
+
+    Args:
+        rows: Portfolio history entries in the synthetic payload
+        repeat: Encodes per encoder; the fastest is reported
+
+    Returns:
+        Dictionary keyed by encoder with encode time (ms) and raw/gzip/zstd sizes (bytes)
+    """
+    import gzip
+    import serialization
+
+    payload = {"success": True, "results": synthetic_backtest_results(rows)}
+    encoders = {
+        "stdlib_json": lambda p: json.dumps(p).encode("utf-8"),
+    }
+    try:
+        from fastapi.encoders import jsonable_encoder
+        encoders["fastapi_default"] = lambda p: json.dumps(jsonable_encoder(p)).encode("utf-8")
+    except ImportError:
+        pass
+    if serialization.orjson is not None:
+        encoders["orjson"] = serialization.encode_json
+    if serialization.msgpack is not None:
+        encoders["msgpack"] = serialization.encode_msgpack
+
+    results = {}
+    for name, encode in encoders.items():
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = encode(payload)
+            timings.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        gzipped = gzip.compress(body, compresslevel=5)
+        entry = {
+            "encode_ms": min(timings),
+            "bytes": len(body),
+            "gzip_bytes": len(gzipped),
+            "gzip_ms": (time.perf_counter() - started) * 1000
+        }
+        if serialization.zstandard is not None:
+            started = time.perf_counter()
+            entry["zstd_bytes"] = len(serialization.zstandard.ZstdCompressor(level=3).compress(body))
+            entry["zstd_ms"] = (time.perf_counter() - started) * 1000
+        results[name] = entry
+    return results
+
+def synthetic_tick_db(path: str, ticks: int = 20000, symbols: Optional[List[str]] = None, seed: int = 42) -> str:
+    """Create a market database with `ticks` one-second synthetic ticks spread over `symbols`."""
+    import sqlite3
+    from data_ingestor import DataIngestor
+    from synthetic_market import ORIGIN, SyntheticMarket
+
+    symbols = symbols or ["BTCUSDT", "ETHUSDT"]
+    DataIngestor(path, universe={})  # Creates the schema
+    seconds = -(-ticks // len(symbols))
+    conn = sqlite3.connect(path)
+    SyntheticMarket(seed).write_ticks(conn, symbols, ORIGIN, ORIGIN + timedelta(seconds=seconds), limit=ticks)
+    conn.close()
+    return path
+
+def bench_replay(ticks: int = 20000, speed: Optional[float] = None, min_signals_per_second: float = 1000.0,
+                 max_p99_ms: float = 10.0) -> Dict[str, Any]:
+    """
+    Replay recorded ticks through the live execution path with a local signer and gateway.
+
+    Args:
+        ticks: Ticks in the synthetic recording
+        speed: Replay speed (None for as fast as possible)
+        min_signals_per_second: Sustained throughput below which the check fails
+        max_p99_ms: p99 tick-to-result latency above which the check fails
+
+    Returns:
+        Replay measurements from `HistoricalReplay.run`
+    """
+    from replay import HistoricalReplay
+
+    workdir = tempfile.mkdtemp(prefix="noah-bench-")
+    db_path = synthetic_tick_db(os.path.join(workdir, "market_data.db"), ticks)
+    replay = HistoricalReplay(db_path, speed=speed, journal_path=os.path.join(workdir, "execution_journal.log"))
+    try:
+        return replay.run(min_signals_per_second=min_signals_per_second, max_p99_ms=max_p99_ms)
+    finally:
+        replay.close()
+
+def _local_execution_engine(journal_path: str):
+    """ExecutionEngine with an in-process signer and gateway (no network) and replay risk limits."""
+    import uuid
+    from execution_engine import ExecutionEngine
+    from execution_journal import ExecutionJournal
+    from replay import REPLAY_RISK_LIMITS
+
+    def local_signer(intents):
+        return [dict(intent, signature="bench_signature", public_key="bench_public_key") for intent in intents]
+
+    def local_gateway(signed_intent):
+        return {
+            "success": True,
+            "intent_id": signed_intent["id"],
+            "submission_id": str(uuid.uuid4()),
+            "message": "Intent submitted successfully"
+        }
+
+    execution_engine = ExecutionEngine(signer=local_signer, gateway=local_gateway,
+                                       journal=ExecutionJournal(journal_path), dedup_window_seconds=0.0)
+    execution_engine.risk_limits.update(REPLAY_RISK_LIMITS)
+    return execution_engine
+
+def bench_backtest_throughput(days: int = 7, repeat: int = 3) -> Dict[str, Any]:
+    """
+    Measure ticks per second through `Backtester.run_backtest` on one-minute bars.
+
+    Args:
+        days: Length of the backtest range
+        repeat: Runs; the fastest is reported
+
+    Returns:
+        Dictionary with ticks, best run time and ticks per second
+    """
+    from backtester import Backtester
+    from base_strategy import SimpleMAStrategy
+
+    workdir = tempfile.mkdtemp(prefix="noah-bench-")
+    backtester = Backtester(os.path.join(workdir, "market_data.db"))
+    end = datetime(2023, 1, 1) + timedelta(days=days)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = backtester.run_backtest(SimpleMAStrategy(), "BTC", datetime(2023, 1, 1), end)
+        timings.append(time.perf_counter() - started)
+    ticks = len(results["portfolio_history"])
+    return {
+        "ticks": ticks,
+        "best_seconds": min(timings),
+        "ticks_per_second": ticks / min(timings)
+    }
+
+def bench_fill_simulator(resting_orders: int = 50000, bars: int = 100000) -> Dict[str, Any]:
+    """
+    Measure bars per second through `FillSimulator.on_bar` with many resting limit and stop orders.
+
+    Args:
+        resting_orders: Orders resting in the book, spread over a wide price range
+        bars: One-minute bars to match
+
+    Returns:
+        Dictionary with bars, fills and bars per second
+    """
+    import random
+    from fill_simulator import FillSimulator
+    from synthetic_market import ORIGIN, SyntheticMarket
+    from history_cache import to_unix_seconds
+
+    rng = random.Random(1)
+    simulator = FillSimulator(cash=1e12)
+    simulator.positions["BTC"] = 1e6
+    for i in range(resting_orders):
+        action = "BUY" if i % 2 else "SELL"
+        offset = rng.uniform(50, 20000)
+        signal = {"action": action, "symbol": "BTC", "amount": 0.01}
+        if i % 4 < 2:
+            signal.update(order_type="limit", price=65000 - offset if action == "BUY" else 65000 + offset)
+        else:
+            signal.update(order_type="stop", stop_price=65000 + offset if action == "BUY" else 65000 - offset)
+        simulator.submit(signal, 0, 65000)
+
+    start_ts = int(to_unix_seconds(ORIGIN))
+    arrays = SyntheticMarket().bars("BTC", start_ts, start_ts + bars * 60, 60)
+    rows = zip(arrays.timestamps.tolist(), arrays.open.tolist(), arrays.high.tolist(), arrays.low.tolist(),
+               arrays.close.tolist(), arrays.volume.tolist())
+    started = time.perf_counter()
+    for timestamp, open, high, low, close, volume in rows:
+        simulator.on_bar("BTC", timestamp, open, high, low, close, volume)
+    elapsed = time.perf_counter() - started
+    return {
+        "bars": bars,
+        "resting_orders": resting_orders,
+        "fills": simulator.fills,
+        "bars_per_second": bars / elapsed
+    }
+
+def bench_synthetic_market(days: int = 2, step: int = 1, workers: int = 1) -> Dict[str, Any]:
+    """
+    Measure synthetic market data generation in memory and streamed to disk.
+
+    Args:
+        days: Days of bars for 4 symbols on 3 venues
+        step: Bar size in seconds
+        workers: Worker processes for the disk run
+
+    Returns:
+        Dictionary with bars and bars per second generated and written
+    """
+    from synthetic_market import ORIGIN, SyntheticMarket
+
+    symbols = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT"]
+    venues = ["Binance", "OKX", "Bybit"]
+    end = ORIGIN + timedelta(days=days)
+    market = SyntheticMarket(cache_bytes=0)
+    started = time.perf_counter()
+    bars = sum(chunk["close"].size for chunk in market.generate(symbols, ORIGIN, end, step, venues))
+    generate_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    manifest = market.write(tempfile.mkdtemp(prefix="noah-bench-"), symbols, ORIGIN, end, step, venues, workers)
+    write_seconds = time.perf_counter() - started
+    return {
+        "bars": bars,
+        "generate_bars_per_second": bars / generate_seconds,
+        "write_bars_per_second": manifest["bars"] / write_seconds
+    }
+
+def bench_execution_throughput(signals: int = 5000) -> Dict[str, Any]:
+    """
+    Measure signals per second through `ExecutionEngine`, one at a time and pipelined.
+
+    Risk checks, intent construction, the journal (with fsync) and
+    signing/submission all run; the signer and gateway are in-process.
+
+    Args:
+        signals: Distinct signals per mode
+
+    Returns:
+        Dictionary with signals per second for `execute_signal` and `execute_signals_batch`
+    """
+    from base_strategy import SimpleMAStrategy
+
+    workdir = tempfile.mkdtemp(prefix="noah-bench-")
+    execution_engine = _local_execution_engine(os.path.join(workdir, "execution_journal.log"))
+    strategy = SimpleMAStrategy()
+    execution_engine.register_strategy(strategy)
+    # Distinct amounts keep the signals distinct even with content deduplication
+    batch = [{"action": "BUY", "symbol": "BTC", "amount": 0.01 + i * 1e-7, "strategy": strategy.name}
+             for i in range(signals)]
+
+    started = time.perf_counter()
+    sequential_latencies = []
+    for signal in batch:
+        signal_started = time.perf_counter()
+        execution_engine.execute_signal(strategy.name, dict(signal))
+        sequential_latencies.append((time.perf_counter() - signal_started) * 1000)
+    sequential_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    pipelined = asyncio.run(execution_engine.execute_signals_batch([dict(signal) for signal in batch]))
+    pipelined_seconds = time.perf_counter() - started
+    execution_engine.journal.close()
+    return {
+        "signals": signals,
+        "sequential_signals_per_second": signals / sequential_seconds,
+        "sequential_p50_ms": percentile(sequential_latencies, 50),
+        "sequential_p99_ms": percentile(sequential_latencies, 99),
+        "batch_signals_per_second": signals / pipelined_seconds,
+        "batch_submitted": pipelined["submitted"]
+    }
+
+def bench_ingest_throughput(cycles: int = 50) -> Dict[str, Any]:
+    """
+    Measure ingest rows per second for the default universe: decode, store and fan-out to listeners.
+
+    Args:
+        cycles: Ingestion cycles (one tick per pair each)
+
+    Returns:
+        Dictionary with rows and rows per second overall and per stage
+    """
+    from data_ingestor import DataIngestor
+    from ingest_shards import collect_ticks
+
+    workdir = tempfile.mkdtemp(prefix="noah-bench-")
+    ingestor = DataIngestor(os.path.join(workdir, "market_data.db"))
+    timings = {"decode": 0.0, "store": 0.0, "listeners": 0.0}
+    rows = 0
+    collect_ticks(ingestor.universe)  # Generates today's synthetic quotes once, outside the timings
+    for _ in range(cycles):
+        started = time.perf_counter()
+        ticks = collect_ticks(ingestor.universe)
+        timings["decode"] += time.perf_counter() - started
+        started = time.perf_counter()
+        ingestor.store_exchange_batch(ticks)
+        timings["store"] += time.perf_counter() - started
+        started = time.perf_counter()
+        for tick in ticks:
+            ingestor.notify_listeners("ticks", tick)
+        timings["listeners"] += time.perf_counter() - started
+        rows += len(ticks)
+    total = sum(timings.values())
+    result = {"rows": rows, "pairs": ingestor.pair_count(), "rows_per_second": rows / total}
+    for stage, seconds in timings.items():
+        result[f"{stage}_rows_per_second"] = rows / seconds if seconds else 0.0
+    return result
+
+def bench_api_latency(requests: int = 50) -> Dict[str, Any]:
+    """
+    Measure request latency percentiles for /strategies/backtest, /strategies/execute and /llm/query.
+
+    The engine runs in-process behind an ASGI transport with an in-process
+    signer and gateway; /llm/query uses the mock LLM unless OPENAI_API_KEY is
+    set. Each request is distinct so no response cache answers it.
+
+    Args:
+        requests: Requests per endpoint
+
+    Returns:
+        Dictionary keyed by endpoint with p50/p95/p99 latency (ms) and error counts
+    """
+    import httpx
+    from base_strategy import SimpleMAStrategy
+
+    engine = _load_engine()
+    local_engine = _local_execution_engine(os.path.join(_engine_dir, "bench_journal.log"))
+    strategy = SimpleMAStrategy()
+    local_engine.register_strategy(strategy)
+
+    def payloads(endpoint: str, i: int) -> Dict[str, Any]:
+        if endpoint == "/strategies/backtest":
+            start = datetime(2023, 1, 1) + timedelta(days=i % 30)
+            return {"token": engine.SECRET_TOKEN, "strategy_name": strategy.name, "symbol": "BTC",
+                    "start_date": start.isoformat(), "end_date": (start + timedelta(days=1)).isoformat()}
+        if endpoint == "/strategies/execute":
+            return {"token": engine.SECRET_TOKEN, "strategy_name": strategy.name,
+                    "signal": {"action": "BUY", "symbol": "BTC", "amount": 0.01 + i * 1e-6}}
+        return {"token": engine.SECRET_TOKEN, "query": f"What is the current price of BTC? (request {i})"}
+
+    async def run() -> Dict[str, Any]:
+        transport = httpx.ASGITransport(app=engine.app)
+        results = {}
+        async with httpx.AsyncClient(transport=transport, base_url="http://engine", timeout=None) as client:
+            for endpoint in ("/strategies/backtest", "/strategies/execute", "/llm/query"):
+                latencies = []
+                errors = 0
+                for i in range(requests):
+                    started = time.perf_counter()
+                    response = await client.post(endpoint, json=payloads(endpoint, i))
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    errors += response.status_code != 200
+                results[endpoint] = {
+                    "p50_ms": percentile(latencies, 50),
+                    "p95_ms": percentile(latencies, 95),
+                    "p99_ms": percentile(latencies, 99),
+                    "errors": errors
+                }
+        return results
+
+    # Swap in the in-process executor and strategy only for this run
+    previous_executor = engine.executor
+    previous_strategy = engine.strategies.get(strategy.name)
+    engine.executor = engine.Lazy(lambda: local_engine)
+    engine.strategies[strategy.name] = strategy
+    try:
+        return asyncio.run(run())
+    finally:
+        engine.executor = previous_executor
+        if previous_strategy is None:
+            engine.strategies.pop(strategy.name, None)
+        else:
+            engine.strategies[strategy.name] = previous_strategy
+        local_engine.journal.close()
+
+BENCHMARKS = {
+    "ping_latency_under_load": bench_ping_latency_under_load,
+    "startup": bench_startup,
+    "serialization": bench_serialization,
+    "replay": bench_replay,
+    "backtest_throughput": bench_backtest_throughput,
+    "fill_simulator": bench_fill_simulator,
+    "synthetic_market": bench_synthetic_market,
+    "execution_throughput": bench_execution_throughput,
+    "ingest_throughput": bench_ingest_throughput,
+    "api_latency": bench_api_latency,
+}
+
+def _metrics(result: Any, prefix: str = "") -> Dict[str, float]:
+    """Flatten a benchmark result into {dotted.path: value} for its comparable metrics."""
+    found = {}
+    if isinstance(result, dict):
+        for key, value in result.items():
+            found.update(_metrics(value, f"{prefix}{key}."))
+    elif isinstance(result, (int, float)) and not isinstance(result, bool):
+        name = prefix[:-1]
+        # Maxima are too noisy to compare and max_* settings are thresholds, not measurements
+        if "max" in name.rsplit(".", 1)[-1]:
+            return found
+        if name.endswith("_per_second") or name.endswith("_ms"):
+            found[name] = float(result)
+    return found
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2,
+                        min_latency_delta_ms: float = 1.0) -> List[Dict[str, Any]]:
+    """
+    Flag metrics that regressed by more than `threshold` relative to a baseline.
+
+    Throughput metrics (*_per_second) regress when they drop; latency metrics
+    (*_ms) regress when they rise, and only by at least `min_latency_delta_ms`
+    so sub-millisecond jitter is not flagged. Metrics missing from either side
+    are skipped.
+
+    Args:
+        results: Current results keyed by benchmark name
+        baseline: Baseline results in the same shape
+        threshold: Allowed relative change (0.2 is 20%)
+        min_latency_delta_ms: Smallest latency increase counted as a regression
+
+    Returns:
+        One entry per regression with the metric, baseline and current values and the relative change
+    """
+    regressions = []
+    current = _metrics(results)
+    for name, previous in _metrics(baseline).items():
+        if name not in current or previous == 0:
+            continue
+        change = (current[name] - previous) / previous
+        if name.endswith("_per_second"):
+            regressed = -change > threshold
+        else:
+            regressed = change > threshold and current[name] - previous >= min_latency_delta_ms
+        if regressed:
+            regressions.append({"metric": name, "baseline": previous, "current": current[name], "change": change})
+    return regressions
+
+if __name__ == "__main__":
+    # Usage: python benchmarks.py [benchmark ...] [--baseline FILE] [--save FILE] [--threshold 0.2]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run engine benchmarks")
+    parser.add_argument("benchmarks", nargs="*", help=f"Benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--baseline", help="JSON results to compare against; regressions fail the run")
+    parser.add_argument("--save", help="Write the results to this JSON file (e.g. to record a new baseline)")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative change counted as a regression")
+    args = parser.parse_args()
+
+    # Benchmarks chdir into scratch directories, so resolve paths first
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    save_path = os.path.abspath(args.save) if args.save else None
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    results = {}
+    failed = False
+    for name in args.benchmarks or list(BENCHMARKS):
+        result = BENCHMARKS[name]()
+        results[name] = result
+        failed = failed or result.get("passed") is False
+        print(json.dumps({name: result}, indent=2))
+
+    if save_path:
+        with open(save_path, "w") as f:
+            json.dump({"recorded_at": datetime.now().isoformat(), "python": sys.version.split()[0],
+                       "results": results}, f, indent=2)
+        print(f"Saved results to {save_path}")
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression['metric']}: {regression['baseline']:.3f} -> "
+                  f"{regression['current']:.3f} ({regression['change']:+.1%})")
+        if not regressions:
+            print(f"No regressions beyond {args.threshold:.0%} against {baseline_path}")
+        failed = failed or bool(regressions)
+    sys.exit(1 if failed else 0)
@@ -1,16 +1,69 @@
 import asyncio
-import httpx
-import websockets
+import multiprocessing
+import queue
 import sqlite3
 import json
+import threading
+import time
+from concurrent.futures import Executor
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Callable, List, Union
+from arbitrage_scanner import ArbitrageScanner
+from ingest_shards import collect_ticks, fetch_raw_batch, load_universe, normalize_batch, run_shard, shard_universe
+from market_stats import MarketStats
+from metrics import REGISTRY
+
+INGEST_CYCLES = REGISTRY.counter("noah_ingest_cycles_total", "Completed ingestion cycles")
+INGEST_ERRORS = REGISTRY.counter("noah_ingest_errors_total", "Failed ingestion cycles")
+INGEST_SECONDS = REGISTRY.histogram("noah_ingest_cycle_seconds", "Time to fetch and store one ingestion cycle")
+INGEST_TICKS = REGISTRY.counter("noah_ingest_ticks_total", "Exchange ticks ingested", ("shard",))
+INGEST_TICKS_PER_SECOND = REGISTRY.gauge("noah_ingest_shard_ticks_per_second", "Ticks per second delivered by an ingestion shard", ("shard",))
 
 class DataIngestor:
-    def __init__(self, db_path: str = "market_data.db"):
+    def __init__(self, db_path: str = "market_data.db", executor: Optional[Executor] = None,
+                 universe: Optional[Dict[str, List[str]]] = None, shards: int = 0,
+                 interval_seconds: float = 10.0):
+        """
+        Args:
+            db_path: Path to the SQLite database
+            executor: Executor that runs blocking database writes off the event loop
+                (default: the loop's default executor)
+            universe: Exchange -> symbols to ingest (default: `load_universe()`)
+            shards: Worker processes that fetch and decode ticks, each owning whole
+                venues; 0 collects ticks in this process
+            interval_seconds: Seconds between ingestion cycles
+        """
         self.db_path = db_path
+        self.executor = executor
+        self.universe = universe if universe is not None else load_universe()
+        self.shards = shards
+        self.interval_seconds = interval_seconds
+        self.shard_stats: Dict[str, Dict[str, Any]] = {}
+        self._processes: List[multiprocessing.Process] = []
+        self._shard_queue = None
+        self._stop_event = None
+        self._writer: Optional[threading.Thread] = None
+        self.listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+        # Rolling 24h statistics per symbol, updated as ticks and funding rates arrive
+        self.market_stats = MarketStats()
+        self.add_listener(self.market_stats.on_ingested)
+        # Latest quote per (symbol, exchange) and the best cross-exchange spreads
+        self.arbitrage_scanner = ArbitrageScanner()
+        self.add_listener(self.arbitrage_scanner.on_ingested)
         self.init_database()
         
+    def add_listener(self, listener: Callable[[str, Dict[str, Any]], None]):
+        """Register a callback invoked with (topic, data) for every ingested record."""
+        self.listeners.append(listener)
+        
+    def notify_listeners(self, topic: str, data: Dict[str, Any]):
+        """Pass an ingested record to every listener; a failing listener never stops ingestion."""
+        for listener in self.listeners:
+            try:
+                listener(topic, data)
+            except Exception as e:
+                print(f"Error in data listener: {e}")
+        
     def init_database(self):
         """Initialize the SQLite database with the required tables."""
         conn = sqlite3.connect(self.db_path)
@@ -44,6 +97,16 @@ class DataIngestor:
             )
         ''')
         
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS funding_rates (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                exchange TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                rate REAL
+            )
+        ''')
+        
         conn.commit()
         conn.close()
         
@@ -77,14 +140,17 @@ class DataIngestor:
         
     async def fetch_exchange_data(self, exchange: str, symbol: str):
         """Fetch data from external exchange APIs (placeholder implementation)."""
+        return normalize_batch(exchange, fetch_raw_batch(exchange, [symbol]))[0]
+        
+    async def fetch_funding_rate(self, exchange: str, symbol: str):
+        """Fetch the current perpetual funding rate from an exchange (placeholder implementation)."""
         # In a real implementation, this would connect to exchange APIs
         # For now, we'll simulate data
         return {
             "timestamp": datetime.now().isoformat(),
             "exchange": exchange,
             "symbol": symbol,
-            "price": 65000.0 + (hash(exchange + symbol) % 1000) - 500,  # Simulated price
-            "volume": 1000000.0 + (hash(exchange + symbol) % 100000)   # Simulated volume
+            "funding_rate": 0.0001  # Simulated rate (0.01%)
         }
         
     def store_ark_mcp_data(self, data: Dict[str, Any]):
@@ -120,30 +186,186 @@ class DataIngestor:
         conn.commit()
         conn.close()
         
+    def store_exchange_batch(self, ticks: List[Dict[str, Any]]):
+        """Store many exchange ticks in one transaction."""
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            conn.executemany(
+                "INSERT INTO exchange_data (exchange, symbol, price, volume) VALUES (?, ?, ?, ?)",
+                [(tick["exchange"], tick["symbol"], tick["price"], tick["volume"]) for tick in ticks]
+            )
+        conn.close()
+        
+    def store_ingested_data(self, ark_data: Dict[str, Any], coordinator_data: Dict[str, Any],
+                            exchange_data: Union[Dict[str, Any], List[Dict[str, Any]], None],
+                            funding_data: Optional[Dict[str, Any]] = None):
+        """Store one ingestion cycle (exchange data may be one tick, a list or None) in a single transaction."""
+        ticks = [exchange_data] if isinstance(exchange_data, dict) else exchange_data or []
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO ark_mcp_data (data) VALUES (?)",
+            (json.dumps(ark_data),)
+        )
+        cursor.execute(
+            "INSERT INTO coordinator_data (data) VALUES (?)",
+            (json.dumps(coordinator_data),)
+        )
+        cursor.executemany(
+            "INSERT INTO exchange_data (exchange, symbol, price, volume) VALUES (?, ?, ?, ?)",
+            [(tick["exchange"], tick["symbol"], tick["price"], tick["volume"]) for tick in ticks]
+        )
+        if funding_data is not None:
+            cursor.execute(
+                "INSERT INTO funding_rates (exchange, symbol, rate) VALUES (?, ?, ?)",
+                (funding_data["exchange"], funding_data["symbol"], funding_data["funding_rate"])
+            )
+        conn.commit()
+        conn.close()
+        
+    def start_shards(self, loop: asyncio.AbstractEventLoop):
+        """Start the shard worker processes and the single writer thread that stores their ticks."""
+        # Spawned, not forked: the parent runs an event loop and thread pools
+        context = multiprocessing.get_context("spawn")
+        self._shard_queue = context.Queue()
+        self._stop_event = context.Event()
+        for shard_id, venues in enumerate(shard_universe(self.universe, self.shards)):
+            process = context.Process(
+                target=run_shard, args=(shard_id, venues, self.interval_seconds, self._shard_queue, self._stop_event),
+                name=f"noah-ingest-{shard_id}", daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+        self._writer = threading.Thread(target=self._run_writer, args=(loop,), name="noah-ingest-writer", daemon=True)
+        self._writer.start()
+        print(f"Started {len(self._processes)} ingestion shards for {self.pair_count()} pairs")
+        
+    def _run_writer(self, loop: asyncio.AbstractEventLoop):
+        """Single writer: store shard ticks in batched transactions and hand them to listeners on the loop."""
+        while True:
+            messages = [self._shard_queue.get()]
+            # Coalesce whatever else is waiting into the same transaction
+            while len(messages) < 64:
+                try:
+                    messages.append(self._shard_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            ticks = []
+            for message in messages:
+                if message is None:
+                    return
+                kind, shard_id, payload = message
+                if kind == "ticks":
+                    ticks.extend(payload)
+                    INGEST_TICKS.labels(str(shard_id)).inc(len(payload))
+                else:
+                    self.shard_stats[str(shard_id)] = payload
+                    INGEST_TICKS_PER_SECOND.labels(str(shard_id)).set(payload["ticks_per_second"])
+            if not ticks:
+                continue
+            
+            try:
+                self.store_exchange_batch(ticks)
+            except Exception as e:
+                INGEST_ERRORS.inc()
+                print(f"Error storing shard ticks: {e}")
+                continue
+            loop.call_soon_threadsafe(self._notify_ticks, ticks)
+        
+    def _notify_ticks(self, ticks: List[Dict[str, Any]]):
+        for tick in ticks:
+            self.notify_listeners("ticks", tick)
+        
+    def stop(self):
+        """Stop the shard processes and the writer."""
+        if self._stop_event is None:
+            return
+        self._stop_event.set()
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        self._shard_queue.put(None)
+        self._writer.join(timeout=5)
+        self._stop_event = None
+        
+    def pair_count(self) -> int:
+        return sum(len(symbols) for symbols in self.universe.values())
+        
+    def stats(self) -> Dict[str, Any]:
+        """Return the universe size and per-shard throughput."""
+        return {
+            "venues": len(self.universe),
+            "pairs": self.pair_count(),
+            "shards": self.shards,
+            "shard_stats": dict(self.shard_stats)
+        }
+        
     async def ingest_data_continuously(self):
         """Continuously ingest data from all sources."""
+        loop = asyncio.get_running_loop()
+        
+        # Seed the 24h statistics from stored data once; from here on they are updated incrementally
+        loaded = await loop.run_in_executor(self.executor, self.market_stats.load_from_db, self.db_path)
+        print(f"Loaded {loaded} records into 24h market statistics")
+        
+        # With shards, exchange ticks arrive through the writer; otherwise they are collected below
+        if self.shards:
+            await loop.run_in_executor(self.executor, self.start_shards, loop)
+        
         while True:
             try:
+                cycle_started = time.perf_counter()
+                
                 # Fetch data from all sources
                 ark_data = await self.fetch_ark_mcp_data()
                 coordinator_data = await self.fetch_coordinator_data()
-                exchange_data = await self.fetch_exchange_data("Binance", "BTCUSDT")
+                funding_data = await self.fetch_funding_rate("Binance", "BTCUSDT")
+                ticks = None
+                if not self.shards:
+                    ticks = await loop.run_in_executor(self.executor, collect_ticks, self.universe)
                 
-                # Store data in database
-                self.store_ark_mcp_data(ark_data)
-                self.store_coordinator_data(coordinator_data)
-                self.store_exchange_data(exchange_data)
+                # Store data in database without blocking the event loop
+                await loop.run_in_executor(
+                    self.executor, self.store_ingested_data, ark_data, coordinator_data, ticks, funding_data
+                )
+                self.notify_listeners("ark_mcp", ark_data)
+                self.notify_listeners("coordinator", coordinator_data)
+                self.notify_listeners("funding", funding_data)
+                if ticks:
+                    INGEST_TICKS.labels("local").inc(len(ticks))
+                    INGEST_TICKS_PER_SECOND.labels("local").set(len(ticks) / self.interval_seconds)
+                    self._notify_ticks(ticks)
                 
+                INGEST_SECONDS.observe(time.perf_counter() - cycle_started)
+                INGEST_CYCLES.inc()
                 print(f"Data ingested at {datetime.now()}")
                 
                 # Wait before next ingestion cycle
-                await asyncio.sleep(10)  # Ingest every 10 seconds
+                await asyncio.sleep(self.interval_seconds)
             except Exception as e:
+                INGEST_ERRORS.inc()
                 print(f"Error ingesting data: {e}")
                 await asyncio.sleep(5)  # Wait 5 seconds before retrying
 
 # Example usage
 if __name__ == "__main__":
-    ingestor = DataIngestor()
+    ingestor = DataIngestor(shards=2, interval_seconds=1.0)
     print("Starting data ingestion...")
-    asyncio.run(ingestor.ingest_data_continuously())
\ No newline at end of file
+    
+    async def report():
+        while True:
+            await asyncio.sleep(5)
+            for shard_id, stats in sorted(ingestor.shard_stats.items()):
+                print(f"Shard {shard_id} ({', '.join(stats['venues'])}): {stats['ticks_per_second']:.0f} ticks/s, "
+                      f"{stats['capacity_ticks_per_second']:.0f} ticks/s capacity")
+    
+    async def main():
+        try:
+            await asyncio.gather(ingestor.ingest_data_continuously(), report())
+        finally:
+            ingestor.stop()
+    
+    asyncio.run(main())
\ No newline at end of file
@@ -1,39 +1,123 @@
 # src-python/engine.py
 import uvicorn
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
 from datetime import datetime, timedelta
 import secrets
 import asyncio
+import multiprocessing
+import os
 import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from data_ingestor import DataIngestor
+from ingest_shards import load_universe
 from base_strategy import BaseStrategy, SimpleMAStrategy, load_strategy_from_file
 from backtester import Backtester
+from fill_simulator import FixedSlippage
+from strategy_profiler import PROFILER
 from execution_engine import ExecutionEngine
+from execution_journal import ExecutionJournal
+from order_netting import NettingWindow
 from llm_brain import LLMBrain
-from typing import List, Dict, Any, Optional
+from wallet_store import WalletStore
+from event_stream import EventHub, format_sse
+from serialization import negotiate_encoding
+from worker_pool import BoundedWorkerPool, PoolSaturated
+from metrics import REGISTRY
+import time
+from typing import List, Dict, Any, Optional, Tuple
 
 app = FastAPI()
 
-# Generate a secret token for authentication
-SECRET_TOKEN = secrets.token_urlsafe(32)
-print(f"Secret token: {SECRET_TOKEN}")
+HTTP_REQUEST_SECONDS = REGISTRY.histogram("noah_http_request_seconds", "HTTP request latency", ("path",))
+HTTP_REQUESTS = REGISTRY.counter("noah_http_requests_total", "HTTP requests by status", ("path", "status"))
 
-# Save the secret token to a file that the Rust backend can read
-with open("secret_token.txt", "w") as f:
-    f.write(SECRET_TOKEN)
+# Generate a secret token for authentication. It is published in the startup
+# hook: worker processes started with "spawn" re-import this module as
+# __mp_main__ and must not overwrite the token the Rust backend reads.
+SECRET_TOKEN = secrets.token_urlsafe(32)
 
-# Initialize the data ingestor
-data_ingestor = DataIngestor()
+def publish_secret_token():
+    """Save the secret token to a file that the Rust backend can read."""
+    print(f"Secret token: {SECRET_TOKEN}")
+    with open("secret_token.txt", "w") as f:
+        f.write(SECRET_TOKEN)
+
+# Dedicated executors keep blocking and CPU-heavy work off the event loop and
+# out of the threadpool that serves the remaining sync endpoints. Backtests and
+# strategies still share the GIL, so they are capped below the core count.
+io_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="noah-io")
+cpu_executor = ThreadPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) // 2), thread_name_prefix="noah-cpu")
+# LLM queries are slow and bursty: a bounded queue rejects the overflow (429)
+# instead of letting chat traffic tie up threads the trading endpoints need
+llm_pool = BoundedWorkerPool("llm", max_workers=2, max_queue=16, queue_timeout=10.0, run_timeout=60.0)
+
+# Initialize the data ingestor. The universe comes from NOAH_INGEST_UNIVERSE
+# (a JSON file of exchange -> symbols); with NOAH_INGEST_SHARDS > 0, venues are
+# fetched and decoded in that many worker processes feeding a single database
+# writer. Sharding is opt-in: by default ticks are collected in this process.
+data_ingestor = DataIngestor(
+    executor=io_executor,
+    universe=load_universe(),
+    shards=int(os.environ.get("NOAH_INGEST_SHARDS", "0"))
+)
 
 # Initialize the backtester
 backtester = Backtester()
 
-# Initialize the execution engine
-executor = ExecutionEngine()
+class Lazy:
+    """Builds a subsystem on first use; safe to call from any thread."""
+    
+    def __init__(self, factory):
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+    
+    def get(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
+    
+    async def get_async(self, executor=None):
+        """Like `get`, but a first build runs on `executor` instead of blocking the event loop."""
+        if self._instance is not None:
+            return self._instance
+        return await asyncio.get_running_loop().run_in_executor(executor, self.get)
+
+def build_executor() -> ExecutionEngine:
+    """Create the execution engine and recover its state from the journal."""
+    execution_engine = ExecutionEngine(journal=ExecutionJournal("execution_journal.log"))
+    execution_engine.recover_from_journal()
+    return execution_engine
+
+# The execution engine replays its journal when built, so it is built on first
+# use (and warmed in the background at startup) instead of at import time
+executor = Lazy(build_executor)
 
-# Initialize the LLM brain
-llm_brain = LLMBrain()
+# Signals sent to /strategies/execute_netted are collected and netted per symbol
+netting_window = Lazy(lambda: NettingWindow(executor.get(), window_seconds=0.2))
+
+def build_robustness_analyzer():
+    """Create the walk-forward/Monte Carlo analyzer (imports numpy, so only on first use)."""
+    from robustness import RobustnessAnalyzer
+    return RobustnessAnalyzer(backtester.db_path)
+
+# Robustness reports fan out over their own worker processes, started with the first report
+robustness_analyzer = Lazy(build_robustness_analyzer)
+
+# Local wallet history, synced incrementally from the Ark MCP Gateway (simulated for now)
+wallet_store = WalletStore()
+
+# Initialize the LLM brain (langchain and the agent are loaded on the first query)
+llm_brain = LLMBrain(market_stats=data_ingestor.market_stats, arbitrage_scanner=data_ingestor.arbitrage_scanner)
+
+# Streaming clients receive ticks, signals, executions, backtest progress and
+# wallet updates as they happen instead of polling
+event_hub = EventHub(buffer_size=256)
 
 # Strategy management
 strategies = {}
@@ -49,6 +133,7 @@ class PingResponse(BaseModel):
 class WalletDataResponse(BaseModel):
     balance: float
     transactions: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
 
 class SendTransactionRequest(BaseModel):
     token: str
@@ -89,6 +174,31 @@ class BacktestRequest(BaseModel):
     symbol: str
     start_date: str
     end_date: str
+    latency_seconds: float = 0.0
+    slippage_bps: float = 0.0
+    max_participation: Optional[float] = 0.1
+    profile: bool = False
+
+class ProfileStrategyRequest(BaseModel):
+    token: str
+    strategy_name: str
+    enabled: bool = True
+    allocation_sample_rate: Optional[int] = None
+    hot_function_sample_rate: Optional[int] = None
+
+class RobustnessRequest(BaseModel):
+    token: str
+    strategy_name: str
+    symbol: str
+    start_date: str
+    end_date: str
+    parameter_grid: Optional[Dict[str, List[Any]]] = None
+    in_sample_days: float = Field(14, gt=0)
+    out_of_sample_days: float = Field(7, gt=0)
+    objective: str = "sharpe_ratio"
+    resamples: int = Field(1000, ge=1, le=100000)
+    block_size: int = Field(60, ge=1, le=100000)
+    seed: Optional[int] = None
 
 class BacktestResponse(BaseModel):
     success: bool
@@ -98,12 +208,27 @@ class ExecuteSignalRequest(BaseModel):
     token: str
     strategy_name: str
     signal: Dict[str, Any]
+    idempotency_key: Optional[str] = None
 
 class ExecuteSignalResponse(BaseModel):
     success: bool
     message: str
     execution_id: Optional[str]
 
+class ExecuteBatchRequest(BaseModel):
+    token: str
+    strategy_name: str
+    signals: List[Dict[str, Any]]
+    batch_size: int = Field(16, ge=1, le=256)
+    max_concurrency: int = Field(8, ge=1, le=64)
+
+class ExecuteBatchResponse(BaseModel):
+    success: bool
+    submitted: int
+    duplicates: int
+    results: List[Dict[str, Any]]
+    timings: Dict[str, float]
+
 class LLMQueryRequest(BaseModel):
     token: str
     query: str
@@ -112,37 +237,70 @@ class LLMQueryResponse(BaseModel):
     success: bool
     response: str
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template, not raw URL, to keep label cardinality bounded
+    route = request.scope.get("route")
+    path = route.path if route is not None else "unmatched"
+    HTTP_REQUEST_SECONDS.labels(path).observe(time.perf_counter() - started)
+    HTTP_REQUESTS.labels(path, str(response.status_code)).inc()
+    return response
+
+async def negotiated_response(http_request: Request, payload: Dict[str, Any]) -> Response:
+    """
+    Encode a large payload directly, skipping pydantic validation and the
+    standard JSON encoder; the format (JSON or MessagePack) and compression
+    follow the request's Accept and Accept-Encoding headers.
+    
+    Encoding and compressing a large payload takes milliseconds, so it runs on
+    the CPU executor instead of the event loop. Because a Response is returned,
+    the endpoint's response_model only documents the schema and is not applied.
+    """
+    loop = asyncio.get_running_loop()
+    body, media_type, headers = await loop.run_in_executor(
+        cpu_executor, lambda: negotiate_encoding(
+            payload,
+            accept=http_request.headers.get("accept", ""),
+            accept_encoding=http_request.headers.get("accept-encoding", "")
+        )
+    )
+    return Response(content=body, media_type=media_type, headers=headers)
+
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Noah Python Engine is running"}
 
 @app.post("/ping", response_model=PingResponse)
-def ping(request: PingRequest):
+async def ping(request: PingRequest):
     if request.token != SECRET_TOKEN:
         raise HTTPException(status_code=401, detail="Invalid token")
     return PingResponse(message=f"pong: {request.message}")
 
 @app.get("/wallet/data", response_model=WalletDataResponse)
-def get_wallet_data():
-    # In a real implementation, this would fetch data from the Ark MCP Gateway
-    # For now, we'll return simulated data
-    return WalletDataResponse(
-        balance=1.25,
-        transactions=[
-            {
-                "id": "tx1",
-                "amount": 0.5,
-                "timestamp": "2023-01-01T12:00:00Z",
-                "type": "receive"
-            },
-            {
-                "id": "tx2",
-                "amount": -0.25,
-                "timestamp": "2023-01-02T14:30:00Z",
-                "type": "send"
-            }
-        ]
-    )
+async def get_wallet_data(limit: int = Query(50, ge=1, le=500), cursor: Optional[str] = None,
+                          type: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None):
+    """
+    Get the wallet balance and one page of transactions, newest first.
+    
+    Only transactions newer than the last sync are fetched from the gateway,
+    at most every few seconds; pass `next_cursor` back as `cursor` for older pages.
+    """
+    def read_wallet():
+        wallet_store.sync(max_age_seconds=5.0)
+        return wallet_store.history(limit=limit, cursor=cursor, type=type, since=since, until=until)
+    
+    try:
+        page = await asyncio.get_running_loop().run_in_executor(io_executor, read_wallet)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return WalletDataResponse(balance=wallet_store.balance, **page)
+
+@app.get("/wallet/stats")
+async def get_wallet_stats():
+    """Get the local wallet store's size, balance and sync position."""
+    return await asyncio.get_running_loop().run_in_executor(io_executor, wallet_store.stats)
 
 @app.post("/wallet/send", response_model=SendTransactionResponse)
 def send_transaction(request: SendTransactionRequest):
@@ -153,6 +311,16 @@ def send_transaction(request: SendTransactionRequest):
     # For now, we'll just simulate the process
     import uuid
     transaction_id = str(uuid.uuid4())
+    # Catch up first, so a gateway reset is noticed before this transaction lands behind the stored cursor
+    wallet_store.sync(max_age_seconds=5.0)
+    transaction = wallet_store.gateway.add_transaction({
+        "id": transaction_id,
+        "amount": -request.amount,
+        "recipient": request.recipient,
+        "type": "send"
+    })
+    wallet_store.sync()
+    event_hub.publish("wallet", {"transaction": transaction})
     
     return SendTransactionResponse(
         success=True,
@@ -216,7 +384,7 @@ def activate_strategy(request: ActivateStrategyRequest):
         strategy.set_parameters(request.parameters)
         strategy.activate()
         active_strategies[request.strategy_name] = strategy
-        executor.register_strategy(strategy)
+        executor.get().register_strategy(strategy)
         return ActivateStrategyResponse(
             success=True,
             message=f"Strategy '{request.strategy_name}' activated successfully"
@@ -238,7 +406,7 @@ def deactivate_strategy(request: ActivateStrategyRequest):
         strategy.deactivate()
         if request.strategy_name in active_strategies:
             del active_strategies[request.strategy_name]
-        executor.unregister_strategy(request.strategy_name)
+        executor.get().unregister_strategy(request.strategy_name)
         return ActivateStrategyResponse(
             success=True,
             message=f"Strategy '{request.strategy_name}' deactivated successfully"
@@ -247,7 +415,7 @@ def deactivate_strategy(request: ActivateStrategyRequest):
         raise HTTPException(status_code=400, detail=f"Failed to deactivate strategy: {str(e)}")
 
 @app.post("/strategies/backtest", response_model=BacktestResponse)
-def run_backtest(request: BacktestRequest):
+async def run_backtest(request: BacktestRequest, http_request: Request):
     """Run a backtest for a strategy."""
     if request.token != SECRET_TOKEN:
         raise HTTPException(status_code=401, detail="Invalid token")
@@ -260,22 +428,194 @@ def run_backtest(request: BacktestRequest):
         start_date = datetime.fromisoformat(request.start_date)
         end_date = datetime.fromisoformat(request.end_date)
         
-        results = backtester.run_backtest(strategy, request.symbol, start_date, end_date)
-        return BacktestResponse(
-            success=True,
-            results=results
+        def publish_progress(processed: int, total: int):
+            event_hub.publish("backtest", {
+                "strategy_name": request.strategy_name,
+                "symbol": request.symbol,
+                "processed": processed,
+                "total": total
+            })
+        
+        slippage = FixedSlippage(request.slippage_bps) if request.slippage_bps else None
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(
+            cpu_executor, lambda: backtester.run_backtest(
+                strategy, request.symbol, start_date, end_date, publish_progress,
+                latency=request.latency_seconds, slippage=slippage, max_participation=request.max_participation,
+                profile=request.profile
+            )
         )
+        return await negotiated_response(http_request, {"success": True, "results": results})
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to run backtest: {str(e)}")
 
+@app.post("/strategies/profile", response_model=ActivateStrategyResponse)
+def profile_strategy(request: ProfileStrategyRequest):
+    """Start or stop profiling a strategy's callbacks (live and in backtests)."""
+    if request.token != SECRET_TOKEN:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    
+    if request.strategy_name not in strategies:
+        raise HTTPException(status_code=404, detail="Strategy not found")
+    
+    strategy = strategies[request.strategy_name]
+    if request.enabled:
+        PROFILER.enable(strategy, request.allocation_sample_rate, request.hot_function_sample_rate)
+        message = f"Profiling strategy '{request.strategy_name}'"
+    else:
+        PROFILER.disable(strategy)
+        message = f"Stopped profiling strategy '{request.strategy_name}'"
+    return ActivateStrategyResponse(success=True, message=message)
+
+@app.get("/strategies/{strategy_name}/profile")
+async def get_strategy_profile(strategy_name: str, top: int = Query(10, ge=1, le=100)):
+    """Get a strategy's callback timings, allocation samples and hottest functions."""
+    report = PROFILER.report(strategy_name, top)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Strategy has not been profiled")
+    return report
+
+@app.post("/strategies/robustness", response_model=BacktestResponse)
+async def run_robustness(request: RobustnessRequest, http_request: Request):
+    """Run walk-forward analysis and Monte Carlo resampling for a strategy."""
+    if request.token != SECRET_TOKEN:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    
+    if request.strategy_name not in strategies:
+        raise HTTPException(status_code=404, detail="Strategy not found")
+    
+    try:
+        strategy = strategies[request.strategy_name]
+        start_date = datetime.fromisoformat(request.start_date)
+        end_date = datetime.fromisoformat(request.end_date)
+        
+        def run_report():
+            return robustness_analyzer.get().report(
+                strategy, request.symbol, start_date, end_date,
+                parameter_grid=request.parameter_grid,
+                in_sample_days=request.in_sample_days,
+                out_of_sample_days=request.out_of_sample_days,
+                objective=request.objective,
+                resamples=request.resamples,
+                block_size=request.block_size,
+                seed=request.seed
+            )
+        
+        # The cpu thread only waits on the analyzer's worker processes
+        results = await asyncio.get_running_loop().run_in_executor(cpu_executor, run_report)
+        return await negotiated_response(http_request, {"success": True, "results": results})
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to run robustness analysis: {str(e)}")
+
+@app.get("/backtest/cache/stats")
+async def get_backtest_cache_stats():
+    """Get size and hit rate of the historical data cache shared by backtests."""
+    # Imported here so numpy loads with the first backtest, not at startup
+    from history_cache import HISTORY_CACHE
+    return HISTORY_CACHE.stats()
+
+# A lasting spread is offered to strategies once, then again only when its
+# venue pair changes or it moves by at least this many percentage points
+ARBITRAGE_SPREAD_STEP = 0.05
+# Symbol -> (buy exchange, sell exchange, spread) last offered to strategies
+dispatched_arbitrage: Dict[str, Tuple[str, str, float]] = {}
+dispatched_arbitrage_lock = threading.Lock()
+
+def arbitrage_changed(opportunity: Dict[str, Any]) -> bool:
+    """Return whether an opportunity differs from the one last offered for its symbol, recording it if so."""
+    pair = (opportunity["buy_exchange"], opportunity["sell_exchange"])
+    with dispatched_arbitrage_lock:
+        last = dispatched_arbitrage.get(opportunity["symbol"])
+        if last is not None and last[:2] == pair and abs(opportunity["spread"] - last[2]) < ARBITRAGE_SPREAD_STEP:
+            return False
+        dispatched_arbitrage[opportunity["symbol"]] = pair + (opportunity["spread"],)
+        return True
+
+def dispatch_arbitrage(topic: str, data: Dict[str, Any]):
+    """Ingestor listener: stream a symbol's positive spread and offer changes in it to active strategies."""
+    if topic != "ticks":
+        return
+    opportunity = data_ingestor.arbitrage_scanner.best_opportunity(data["symbol"])
+    if opportunity is None or opportunity["spread"] <= 0:
+        with dispatched_arbitrage_lock:
+            dispatched_arbitrage.pop(data["symbol"], None)
+        return
+    event_hub.publish("arbitrage", opportunity)
+    if active_strategies and arbitrage_changed(opportunity):
+        def run_strategies():
+            for entry in executor.get().process_arbitrage_opportunity(opportunity):
+                publish_execution(entry["strategy"], entry["signal"], entry["result"])
+        io_executor.submit(run_strategies)
+
+def publish_execution(strategy_name: str, signal: Dict[str, Any], result: Dict[str, Any]):
+    """Stream a signal and its execution result."""
+    event_hub.publish("signals", {"strategy": strategy_name, "signal": dict(signal)})
+    event_hub.publish("executions", {"strategy": strategy_name, "result": result})
+
 @app.post("/strategies/execute", response_model=ExecuteSignalResponse)
-def execute_signal(request: ExecuteSignalRequest):
+async def execute_signal(request: ExecuteSignalRequest):
     """Execute a trade signal from a strategy."""
     if request.token != SECRET_TOKEN:
         raise HTTPException(status_code=401, detail="Invalid token")
     
     try:
-        result = executor.execute_signal(request.strategy_name, request.signal)
+        signal = request.signal
+        if request.idempotency_key:
+            signal = dict(signal, idempotency_key=request.idempotency_key)
+        # Signing, journal fsync and submission block, so they run on the I/O executor
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            io_executor, lambda: executor.get().execute_signal(request.strategy_name, signal)
+        )
+        publish_execution(request.strategy_name, signal, result)
+        return ExecuteSignalResponse(
+            success=result["success"],
+            message=result["message"],
+            execution_id=result.get("submission_id")
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to execute signal: {str(e)}")
+
+@app.post("/strategies/execute_batch", response_model=ExecuteBatchResponse)
+async def execute_signals_batch(request: ExecuteBatchRequest, http_request: Request):
+    """
+    Execute many trade signals with signing and submission pipelined.
+    
+    Every signal is executed as `strategy_name`; a "strategy" field in a signal is ignored.
+    """
+    if request.token != SECRET_TOKEN:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    
+    try:
+        signals = [dict(signal, strategy=request.strategy_name) for signal in request.signals]
+        execution_engine = await executor.get_async(io_executor)
+        batch = await execution_engine.execute_signals_batch(
+            signals,
+            batch_size=request.batch_size,
+            max_concurrency=request.max_concurrency
+        )
+        for signal, result in zip(signals, batch["results"]):
+            publish_execution(signal["strategy"], signal, result)
+        return await negotiated_response(http_request, {
+            "success": all(result and result["success"] for result in batch["results"]),
+            "submitted": batch["submitted"],
+            "duplicates": batch["duplicates"],
+            "results": batch["results"],
+            "timings": batch["timings"]
+        })
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to execute signals: {str(e)}")
+
+@app.post("/strategies/execute_netted", response_model=ExecuteSignalResponse)
+async def execute_signal_netted(request: ExecuteSignalRequest):
+    """Execute a trade signal after netting it against other strategies' signals."""
+    if request.token != SECRET_TOKEN:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    
+    try:
+        window = await netting_window.get_async(io_executor)
+        result = await window.submit(request.strategy_name, request.signal)
+        publish_execution(request.strategy_name, request.signal, result)
         return ExecuteSignalResponse(
             success=result["success"],
             message=result["message"],
@@ -284,25 +624,186 @@ def execute_signal(request: ExecuteSignalRequest):
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to execute signal: {str(e)}")
 
+@app.get("/market/stats/{symbol}")
+async def get_market_stats(symbol: str):
+    """Get rolling 24h price and funding-rate statistics for a symbol."""
+    market_stats = data_ingestor.market_stats
+    price = market_stats.price_stats(symbol)
+    if price is None:
+        raise HTTPException(status_code=404, detail=f"No market data for {symbol} in the last 24 hours")
+    return {"price": price, "funding": market_stats.funding_stats(symbol)}
+
+@app.get("/market/arbitrage")
+async def get_arbitrage_opportunities(min_spread: float = 0.0, limit: Optional[int] = None):
+    """Get the best cross-exchange opportunity per symbol with a spread of at least `min_spread` percent."""
+    return data_ingestor.arbitrage_scanner.opportunities(min_spread=min_spread, limit=limit)
+
+@app.get("/ingest/stats")
+async def get_ingest_stats():
+    """Get the ingestion universe size and ticks per second for each shard."""
+    return data_ingestor.stats()
+
+@app.get("/execution/stats")
+async def get_execution_stats():
+    """Get execution counters, including signal deduplication hits and misses."""
+    execution_engine = await executor.get_async(io_executor)
+    return {
+        "trades_this_hour": execution_engine.trades_this_hour,
+        "daily_losses": execution_engine.daily_losses,
+        "in_flight_intents": len(execution_engine.in_flight_intents),
+        "deduplication": execution_engine.submitted_signals.stats(),
+        "streaming": event_hub.stats()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Expose engine metrics in the Prometheus text format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/stream/events")
+async def stream_events(token: str, topics: Optional[str] = Query(None)):
+    """
+    Stream engine events as Server-Sent Events.
+    
+    `topics` is a comma-separated subset of ticks, funding, arbitrage, ark_mcp,
+    coordinator, signals, executions, backtest and wallet (default: all). A client that falls a full
+    buffer behind is disconnected and should reconnect and resync.
+    """
+    if token != SECRET_TOKEN:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    
+    subscription = event_hub.subscribe(set(topics.split(",")) if topics else None)
+    
+    async def frames():
+        async for event in subscription.events():
+            yield format_sse(event)
+        if subscription.overflowed:
+            yield format_sse({"topic": "overflow", "data": {"message": "Client too slow, resync required"}})
+    
+    return StreamingResponse(frames(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 @app.post("/llm/query", response_model=LLMQueryResponse)
-def process_llm_query(request: LLMQueryRequest):
+async def process_llm_query(request: LLMQueryRequest):
     """Process a query with the LLM brain."""
     if request.token != SECRET_TOKEN:
         raise HTTPException(status_code=401, detail="Invalid token")
     
     try:
-        response = llm_brain.process_query(request.query)
+        response = await llm_pool.run(llm_brain.process_query, request.query)
         return LLMQueryResponse(
             success=True,
             response=response
         )
+    except PoolSaturated as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="LLM query timed out")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to process LLM query: {str(e)}")
 
+@app.post("/llm/query/stream")
+async def stream_llm_query(request: LLMQueryRequest):
+    """
+    Process a query with the LLM brain, streaming the answer as Server-Sent Events.
+    
+    Emits `token` events as text is generated, `tool_start`/`tool_end` around
+    tool calls, and a final `done` (with the full response) or `error` event.
+    Disconnecting stops generation at the next token.
+    """
+    if request.token != SECRET_TOKEN:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    cancelled = threading.Event()
+    
+    def emit(event_type: str, data: Dict[str, Any]):
+        loop.call_soon_threadsafe(events.put_nowait, {"topic": event_type, "data": data})
+    
+    async def run():
+        try:
+            await llm_pool.run(llm_brain.stream_query, request.query, emit, cancelled)
+        except PoolSaturated as e:
+            events.put_nowait({"topic": "error", "data": {"message": str(e)}})
+        except asyncio.TimeoutError:
+            cancelled.set()
+            events.put_nowait({"topic": "error", "data": {"message": "LLM query timed out"}})
+        finally:
+            events.put_nowait(None)
+    
+    task = asyncio.ensure_future(run())
+    
+    async def frames():
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    return
+                yield format_sse(event)
+        finally:
+            # The client went away (or the answer is complete): stop generating,
+            # and give up the queue slot if the call is still waiting for a worker
+            cancelled.set()
+            if not task.done():
+                task.cancel()
+    
+    return StreamingResponse(frames(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.get("/llm/cache/stats")
+async def get_llm_cache_stats():
+    """Get LLM response and tool cache hit rates and the latency they saved."""
+    return llm_brain.cache_stats()
+
+@app.get("/llm/pool/stats")
+async def get_llm_pool_stats():
+    """Get LLM worker pool occupancy, queue depth, rejections and timeouts."""
+    return llm_pool.stats()
+
+# The event loop only keeps weak references to tasks: hold them until they finish
+background_tasks = set()
+
+def start_background(coroutine) -> "asyncio.Task":
+    """Run a coroutine as a task that is not garbage collected while it runs."""
+    task = asyncio.create_task(coroutine)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+async def run_startup_job(description: str, function):
+    """Run a blocking startup job on the I/O executor and report a failure instead of dropping it."""
+    started = time.perf_counter()
+    try:
+        await asyncio.get_running_loop().run_in_executor(io_executor, function)
+    except Exception as e:
+        print(f"{description} failed: {e}")
+        return
+    print(f"{description} finished in {time.perf_counter() - started:.2f}s")
+
 @app.on_event("startup")
 async def startup_event():
+    publish_secret_token()
+    event_hub.bind(asyncio.get_running_loop())
+    data_ingestor.add_listener(event_hub.publish)
+    data_ingestor.add_listener(dispatch_arbitrage)
+    
     # Start the data ingestion in the background
-    asyncio.create_task(data_ingestor.ingest_data_continuously())
+    start_background(data_ingestor.ingest_data_continuously())
+    
+    # Replay the execution journal off the loop so /ping answers immediately
+    start_background(run_startup_job("Execution journal replay", executor.get))
+    
+    # Catch the wallet store up with the gateway before the dashboard asks for it
+    start_background(run_startup_job("Wallet sync", wallet_store.sync))
+
+@app.on_event("shutdown")
+def shutdown_event():
+    data_ingestor.stop()
+    if robustness_analyzer._instance is not None:
+        robustness_analyzer._instance.close()
+    for pool in (io_executor, cpu_executor, llm_pool):
+        pool.shutdown(wait=False)
 
 if __name__ == "__main__":
+    # Needed when the engine is frozen into the sidecar executable and starts worker processes
+    multiprocessing.freeze_support()
     uvicorn.run(app, host="127.0.0.1", port=8000)
\ No newline at end of file
@@ -0,0 +1,152 @@
+import asyncio
+import json
+from typing import Dict, Any, Optional, Set, AsyncIterator
+
+class Subscription:
+    """One client's bounded queue of events."""
+
+    def __init__(self, hub: "EventHub", topics: Optional[Set[str]], buffer_size: int):
+        self.hub = hub
+        self.topics = topics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.overflowed = False
+        self.closed = False
+
+    def wants(self, topic: str) -> bool:
+        return self.topics is None or topic in self.topics
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        """Queue an event; a consumer that has fallen a full buffer behind is cut off."""
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Dropping single events would corrupt the delta stream, so the
+            # client is disconnected and has to resync on reconnect
+            self.overflowed = True
+            self.hub.dropped_subscribers += 1
+            self.close()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self.hub.unsubscribe(self)
+        # Wake the consumer even when the buffer is full
+        while True:
+            try:
+                self.queue.put_nowait(None)
+                break
+            except asyncio.QueueFull:
+                self.queue.get_nowait()
+
+    async def events(self, heartbeat_seconds: float = 15.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield events until closed; yields None as a heartbeat when idle."""
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(self.queue.get(), timeout=heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event is None:
+                    return
+                yield event
+        finally:
+            self.close()
+
+class EventHub:
+    """
+    Fan-out of engine events (ticks, signals, executions, backtest progress,
+    wallet updates) to streaming clients.
+
+    `publish` never blocks and may be called from any thread.
+    """
+
+    def __init__(self, buffer_size: int = 256):
+        self.buffer_size = buffer_size
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Set[Subscription] = set()
+        self.published = 0
+        self.dropped_subscribers = 0
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Attach the hub to the event loop that serves the streams."""
+        self.loop = loop
+
+    def subscribe(self, topics: Optional[Set[str]] = None) -> Subscription:
+        """
+        Register a new client.
+
+        Args:
+            topics: Topics to receive (default: all)
+
+        Returns:
+            Subscription whose `events()` yields the client's events
+        """
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
+        subscription = Subscription(self, topics, self.buffer_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def publish(self, topic: str, data: Dict[str, Any]) -> None:
+        """
+        Publish an event to every subscriber of the topic.
+
+        Args:
+            topic: Event topic
+            data: Event payload (only what changed)
+        """
+        if not self._subscribers or self.loop is None:
+            return
+        event = {"topic": topic, "data": data}
+        if self._on_loop_thread():
+            self._deliver(event)
+        else:
+            self.loop.call_soon_threadsafe(self._deliver, event)
+
+    def _on_loop_thread(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        self.published += 1
+        for subscription in list(self._subscribers):
+            if subscription.wants(event["topic"]):
+                subscription.offer(event)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped_subscribers": self.dropped_subscribers
+        }
+
+def format_sse(event: Optional[Dict[str, Any]]) -> str:
+    """Encode an event (or a heartbeat for None) as a Server-Sent Events frame."""
+    if event is None:
+        return ": keepalive\n\n"
+    return f"event: {event['topic']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+# Example usage
+if __name__ == "__main__":
+    async def main():
+        hub = EventHub(buffer_size=4)
+        fast = hub.subscribe({"ticks"})
+        slow = hub.subscribe()
+
+        for i in range(6):
+            hub.publish("ticks", {"symbol": "BTC", "price": 65000 + i})
+            event = await fast.queue.get()
+            print(format_sse(event), end="")
+
+        print(f"Slow consumer overflowed: {slow.overflowed}, hub stats: {hub.stats()}")
+
+    asyncio.run(main())
@@ -1,11 +1,67 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Callable
 from base_strategy import BaseStrategy
+from execution_journal import ExecutionJournal, JournalError
+from order_netting import NETTED_STRATEGY, net_signals, netting_error, split_fill
+from records import Tick, Intent, to_plain
+from strategy_profiler import PROFILER
+from ttl_cache import TTLCache
+from metrics import REGISTRY
+import asyncio
+import hashlib
+import json
+import math
+import time
 import uuid
 
+EXECUTION_SECONDS = REGISTRY.histogram("noah_execution_seconds", "Time to validate, sign and submit one signal")
+EXECUTION_RESULTS = REGISTRY.counter("noah_execution_results_total", "Executed signals by outcome", ("outcome",))
+BATCH_STAGE_SECONDS = REGISTRY.histogram("noah_execution_batch_stage_seconds",
+                                         "Cumulative time per batch execution stage", ("stage",))
+
+# Cache entry claiming an idempotency key while its signal is being executed
+_IN_FLIGHT = {"success": False, "in_flight": True, "message": "An identical signal is still being executed"}
+
+def _count_outcome(result: Optional[Dict[str, Any]]) -> None:
+    if result is None:
+        return
+    if result.get("duplicate"):
+        outcome = "duplicate"
+    elif result.get("success"):
+        outcome = "submitted"
+    else:
+        outcome = "rejected"
+    EXECUTION_RESULTS.labels(outcome).inc()
+
 class ExecutionEngine:
     """Execution engine for trading strategies."""
     
-    def __init__(self):
+    # Simulated loss booked for every executed sell
+    SIMULATED_SELL_LOSS = 0.001
+    
+    def __init__(self,
+                 signer: Optional[Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]] = None,
+                 gateway: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+                 journal: Optional[ExecutionJournal] = None,
+                 dedup_window_seconds: float = 30.0,
+                 dedup_max_entries: int = 10000,
+                 dedup_by_content: bool = False):
+        """
+        Args:
+            signer: Optional callable that signs a batch of intents (stands in for the Rust core)
+            gateway: Optional callable that submits one signed intent (stands in for the Matchmaker/Gateway)
+            journal: Optional write-ahead journal recording every execution stage
+            dedup_window_seconds: How long a submitted signal suppresses identical re-sends
+            dedup_max_entries: Maximum number of remembered submissions
+            dedup_by_content: Also deduplicate signals without a client-supplied
+                idempotency key, by their content (identical orders sent on purpose
+                within the window are then dropped)
+        """
+        self.signer = signer
+        self.gateway = gateway
+        self.journal = journal
+        self.dedup_by_content = dedup_by_content
+        self.submitted_signals = TTLCache(max_entries=dedup_max_entries, ttl_seconds=dedup_window_seconds)
+        self.in_flight_intents = {}
         self.active_strategies = {}
         self.risk_limits = {
             "max_position_size": 0.1,  # 10% of portfolio
@@ -15,6 +71,39 @@ class ExecutionEngine:
         self.daily_losses = 0.0
         self.trades_this_hour = 0
         
+    def recover_from_journal(self) -> Dict[str, Any]:
+        """
+        Rebuild risk counters and in-flight intents by replaying the journal.
+        
+        Returns:
+            Replay summary from the journal
+        """
+        if self.journal is None:
+            return {"records": 0, "trades_last_hour": 0, "sells_today": 0, "in_flight": {}}
+        
+        # Drop records replay no longer needs so the journal stays bounded across restarts
+        compacted = self.journal.compact()
+        if compacted["kept"] < compacted["records"]:
+            print(f"Compacted execution journal from {compacted['records']} to {compacted['kept']} records")
+        state = self.journal.replay()
+        self.trades_this_hour = state["trades_last_hour"]
+        self.daily_losses = state["sells_today"] * self.SIMULATED_SELL_LOSS
+        self.in_flight_intents = {intent_id: entry["intent"] for intent_id, entry in state["in_flight"].items()}
+        if self.in_flight_intents:
+            print(f"Recovered {len(self.in_flight_intents)} unresolved intents from the execution journal")
+        return state
+    
+    def _record_stage(self, stage: str, intent: Dict[str, Any], data: Dict[str, Any], wait: bool = False) -> int:
+        """Track an intent's progress and append the stage to the journal, if any."""
+        if stage == "intent":
+            self.in_flight_intents[intent["id"]] = intent
+        elif stage in ("submitted", "failed"):
+            self.in_flight_intents.pop(intent["id"], None)
+        
+        if self.journal is None:
+            return 0
+        return self.journal.append(stage, intent["id"], data, wait=wait)
+    
     def set_risk_limits(self, limits: Dict[str, Any]) -> None:
         """Set risk limits for the execution engine."""
         self.risk_limits.update(limits)
@@ -55,7 +144,7 @@ class ExecutionEngine:
         
         return True
     
-    def construct_ark_intent(self, signal: Dict[str, Any]) -> Dict[str, Any]:
+    def construct_ark_intent(self, signal: Dict[str, Any]) -> Intent:
         """
         Construct an Ark intent from a trade signal.
         
@@ -63,19 +152,19 @@ class ExecutionEngine:
             signal: Trade signal from a strategy
             
         Returns:
-            Ark intent dictionary
-        """
-        intent = {
-            "id": str(uuid.uuid4()),
-            "timestamp": "2023-01-01T00:00:00Z",  # In a real implementation, this would be the current timestamp
-            "action": signal["action"].lower(),
-            "symbol": signal["symbol"],
-            "amount": signal["amount"],
-            "metadata": {
+            Ark intent record (supports dict-style access)
+        """
+        intent = Intent(
+            id=str(uuid.uuid4()),
+            timestamp="2023-01-01T00:00:00Z",  # In a real implementation, this would be the current timestamp
+            action=signal["action"].lower(),
+            symbol=signal["symbol"],
+            amount=signal["amount"],
+            metadata={
                 "strategy": signal.get("strategy", "unknown"),
                 "version": "1.0"
             }
-        }
+        )
         
         return intent
     
@@ -89,6 +178,9 @@ class ExecutionEngine:
         Returns:
             Signed intent dictionary
         """
+        if self.signer is not None:
+            return self.signer([intent])[0]
+        
         # In a real implementation, this would communicate with the Rust core
         # For now, we'll simulate the signing process
         signed_intent = intent.copy()
@@ -97,6 +189,20 @@ class ExecutionEngine:
         
         return signed_intent
     
+    def request_signatures(self, intents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Request signatures from the Rust core for a batch of intents in one round-trip.
+        
+        Args:
+            intents: Ark intents to sign
+            
+        Returns:
+            Signed intents, in the same order as the input
+        """
+        if self.signer is not None:
+            return self.signer(intents)
+        return [self.request_signature(intent) for intent in intents]
+    
     def submit_intent(self, signed_intent: Dict[str, Any]) -> Dict[str, Any]:
         """
         Submit a signed intent to the Matchmaker/Gateway.
@@ -107,6 +213,9 @@ class ExecutionEngine:
         Returns:
             Submission result
         """
+        if self.gateway is not None:
+            return self.gateway(signed_intent)
+        
         # In a real implementation, this would submit to the Matchmaker/Gateway
         # For now, we'll simulate the submission process
         result = {
@@ -129,82 +238,474 @@ class ExecutionEngine:
         Returns:
             Execution result
         """
-        # Check if the strategy is active
-        if strategy_name not in self.active_strategies:
-            return {
-                "success": False,
-                "message": f"Strategy '{strategy_name}' is not active"
-            }
+        started = time.perf_counter()
+        result = self._execute_signal(strategy_name, signal)
+        EXECUTION_SECONDS.observe(time.perf_counter() - started)
+        _count_outcome(result)
+        return result
+    
+    def _execute_signal(self, strategy_name: str, signal: Dict[str, Any]) -> Dict[str, Any]:
+        rejection = self._validate_signal(strategy_name, signal)
+        if rejection is not None:
+            return rejection
         
-        # Check risk limits
-        if not self.check_risk_limits(signal):
-            return {
-                "success": False,
-                "message": "Trade rejected due to risk limits"
-            }
+        key = self.idempotency_key(strategy_name, signal)
+        if key is None:
+            return self._submit_signal(strategy_name, signal)
         
+        # Claim the key before signing: a concurrent identical signal gets the
+        # in-flight marker, a later one the original result
+        original = self.submitted_signals.put_if_absent(key, _IN_FLIGHT)
+        if original is not None:
+            return dict(original, duplicate=True)
+        result = None
+        try:
+            result = self._submit_signal(strategy_name, signal)
+            return result
+        finally:
+            if result is not None and result.get("success"):
+                self.submitted_signals.put(key, result)
+            else:
+                self.submitted_signals.invalidate(key)  # Failed signals may be retried
+    
+    def _submit_signal(self, strategy_name: str, signal: Dict[str, Any]) -> Dict[str, Any]:
         # Construct Ark intent
         intent = self.construct_ark_intent(signal)
         intent["strategy"] = strategy_name
+        self._record_stage("intent", intent, intent)
         
         # Request signature from Rust core
         try:
             signed_intent = self.request_signature(intent)
         except Exception as e:
-            return {
+            failure = {
                 "success": False,
                 "message": f"Failed to request signature: {str(e)}"
             }
+            self._record_stage("failed", intent, failure)
+            return failure
+        
+        # The signed intent must be durable before it leaves the process
+        try:
+            self._record_stage("signed", intent, self._signature_record(signed_intent), wait=True)
+        except (JournalError, TimeoutError) as e:
+            self.in_flight_intents.pop(intent["id"], None)
+            return {
+                "success": False,
+                "message": f"Failed to journal signed intent: {str(e)}"
+            }
         
         # Submit intent to Matchmaker/Gateway
         try:
             result = self.submit_intent(signed_intent)
         except Exception as e:
-            return {
+            failure = {
                 "success": False,
                 "message": f"Failed to submit intent: {str(e)}"
             }
+            self._record_stage("failed", intent, failure)
+            return failure
+        self._record_stage("submitted", intent, result)
         
         # Update trade counters
         self.trades_this_hour += 1
+        self._record_fill_loss(signal)
+        
+        return result
+    
+    def idempotency_key(self, strategy_name: str, signal: Dict[str, Any]) -> Optional[str]:
+        """
+        Return the idempotency key for a signal.
+        
+        A client-supplied "idempotency_key" wins; otherwise, with
+        `dedup_by_content`, the key is derived from the strategy name and the
+        signal's content.
+        
+        Args:
+            strategy_name: Name of the strategy that generated the signal
+            signal: Trade signal
+            
+        Returns:
+            Idempotency key, or None if the signal is not deduplicated
+        """
+        client_key = signal.get("idempotency_key")
+        if client_key:
+            return f"{strategy_name}:{client_key}"
+        if not self.dedup_by_content:
+            return None
+        content = {key: value for key, value in signal.items() if key != "strategy"}
+        digest = hashlib.sha1(json.dumps(content, sort_keys=True, default=to_plain).encode("utf-8")).hexdigest()
+        return f"{strategy_name}:{digest}"
+    
+    def _validate_signal(self, strategy_name: str, signal: Dict[str, Any],
+                         netted: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Return a failure result if the signal may not be executed, None otherwise.
+        
+        `netted` is only set by `execute_netted` for its residual orders, whose
+        contributing signals were already checked one by one, risk limits
+        included: a residual aggregates several signals, so the per-trade limits
+        do not apply to it. The residuals' strategy name is reserved and never
+        accepted from callers.
+        """
+        if netted:
+            return None
+        
+        if strategy_name == NETTED_STRATEGY:
+            return {
+                "success": False,
+                "message": f"Strategy name '{NETTED_STRATEGY}' is reserved"
+            }
+        
+        # Check if the strategy is active
+        if strategy_name not in self.active_strategies:
+            return {
+                "success": False,
+                "message": f"Strategy '{strategy_name}' is not active"
+            }
         
-        # Update daily losses if this was a sell
+        # Check risk limits
+        if not self.check_risk_limits(signal):
+            return {
+                "success": False,
+                "message": "Trade rejected due to risk limits"
+            }
+        
+        return None
+    
+    def _record_fill_loss(self, signal: Dict[str, Any]) -> None:
+        """Update daily losses if this was a sell."""
         if signal["action"] == "SELL":
-            self.daily_losses += 0.001  # Simulated loss
+            self.daily_losses += self.SIMULATED_SELL_LOSS
+    
+    @staticmethod
+    def _signature_record(signed_intent: Dict[str, Any]) -> Dict[str, Any]:
+        """Journal payload for a signed intent."""
+        return {
+            "signature": signed_intent.get("signature"),
+            "public_key": signed_intent.get("public_key")
+        }
+    
+    async def execute_signals_batch(self, signals: List[Dict[str, Any]], batch_size: int = 16,
+                                    max_concurrency: int = 8, deduplicate: bool = True,
+                                    netted: bool = False) -> Dict[str, Any]:
+        """
+        Execute many trade signals with the construct, sign and submit stages pipelined.
         
-        return result
+        Signals are split into batches. Each batch is signed with a single
+        `request_signatures` call while the previous batch is still being
+        submitted, and at most `max_concurrency` submissions are in flight.
+        
+        Args:
+            signals: Trade signals; each must carry the originating "strategy" name
+            batch_size: Number of intents per signature request
+            max_concurrency: Maximum number of concurrent gateway submissions
+            deduplicate: Answer signals already submitted within the dedup window
+                (or earlier in this batch) with the original result
+            netted: The signals are residuals from `execute_netted` (internal use)
+            
+        Returns:
+            Dictionary with per-signal results (in input order) and cumulative per-stage
+            timings in seconds; stages overlap, so they may sum to more than "total"
+        """
+        if batch_size < 1 or max_concurrency < 1:
+            raise ValueError("batch_size and max_concurrency must be at least 1")
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        timings = {"construct": 0.0, "sign": 0.0, "submit": 0.0}
+        results: List[Optional[Dict[str, Any]]] = [None] * len(signals)
+        # One signed batch may wait while the next is being signed
+        signed_batches: asyncio.Queue = asyncio.Queue(maxsize=1)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        keys: List[Optional[str]] = [None] * len(signals)
+        first_seen: Dict[str, int] = {}
+        repeats: Dict[int, int] = {}
+        
+        async def sign_batches() -> None:
+            # Always end the stream so the submitter stops even if signing raises
+            try:
+                for offset in range(0, len(signals), batch_size):
+                    stage_start = time.perf_counter()
+                    batch = []
+                    for index in range(offset, min(offset + batch_size, len(signals))):
+                        signal = signals[index]
+                        strategy_name = signal.get("strategy", "unknown")
+                        rejection = self._validate_signal(strategy_name, signal, netted=netted)
+                        if rejection is not None:
+                            results[index] = rejection
+                            continue
+                        key = self.idempotency_key(strategy_name, signal) if deduplicate else None
+                        if key is not None:
+                            if key in first_seen:
+                                # Resolved from the first occurrence once it completes
+                                repeats[index] = first_seen[key]
+                                continue
+                            # Claim the key before signing, as in `execute_signal`
+                            original = self.submitted_signals.put_if_absent(key, _IN_FLIGHT)
+                            if original is not None:
+                                results[index] = dict(original, duplicate=True)
+                                continue
+                            first_seen[key] = index
+                            keys[index] = key
+                        # Reserve the trade slot so later signals see in-flight trades
+                        self.trades_this_hour += 1
+                        intent = self.construct_ark_intent(signal)
+                        intent["strategy"] = strategy_name
+                        self._record_stage("intent", intent, intent)
+                        batch.append((index, intent))
+                    timings["construct"] += time.perf_counter() - stage_start
+                
+                    if not batch:
+                        continue
+                
+                    stage_start = time.perf_counter()
+                    try:
+                        signed = await loop.run_in_executor(
+                            None, self.request_signatures, [intent for _, intent in batch]
+                        )
+                    except Exception as e:
+                        for index, intent in batch:
+                            self.trades_this_hour -= 1  # Give back the reserved trade slot
+                            results[index] = {
+                                "success": False,
+                                "message": f"Failed to request signature: {str(e)}"
+                            }
+                            self._record_stage("failed", intent, results[index])
+                        continue
+                    finally:
+                        timings["sign"] += time.perf_counter() - stage_start
+                
+                    # One group-committed fsync makes the whole signed batch durable
+                    stage_start = time.perf_counter()
+                    try:
+                        last_seq = 0
+                        for signed_intent in signed:
+                            last_seq = self._record_stage("signed", signed_intent, self._signature_record(signed_intent))
+                        if self.journal is not None:
+                            await loop.run_in_executor(None, self.journal.wait_durable, last_seq)
+                    except (JournalError, TimeoutError) as e:
+                        for index, intent in batch:
+                            self.trades_this_hour -= 1  # Give back the reserved trade slot
+                            self.in_flight_intents.pop(intent["id"], None)
+                            results[index] = {
+                                "success": False,
+                                "message": f"Failed to journal signed intent: {str(e)}"
+                            }
+                        continue
+                    finally:
+                        if self.journal is not None:
+                            timings["journal"] = timings.get("journal", 0.0) + time.perf_counter() - stage_start
+                
+                    await signed_batches.put([(index, signed_intent) for (index, _), signed_intent in zip(batch, signed)])
+            finally:
+                await signed_batches.put(None)
+        
+        async def submit_one(index: int, signed_intent: Dict[str, Any]) -> None:
+            signal = signals[index]
+            async with semaphore:
+                try:
+                    result = await loop.run_in_executor(None, self.submit_intent, signed_intent)
+                except Exception as e:
+                    self.trades_this_hour -= 1  # Give back the reserved trade slot
+                    results[index] = {
+                        "success": False,
+                        "message": f"Failed to submit intent: {str(e)}"
+                    }
+                    self._record_stage("failed", signed_intent, results[index])
+                    return
+            self._record_stage("submitted", signed_intent, result)
+            if keys[index] is not None and result.get("success"):
+                self.submitted_signals.put(keys[index], result)
+            self._record_fill_loss(signal)
+            results[index] = result
+        
+        async def submit_batch(batch: List[Any]) -> None:
+            stage_start = time.perf_counter()
+            await asyncio.gather(*(submit_one(index, signed_intent) for index, signed_intent in batch))
+            timings["submit"] += time.perf_counter() - stage_start
+        
+        async def submit_batches() -> None:
+            in_flight = []
+            while True:
+                batch = await signed_batches.get()
+                if batch is None:
+                    break
+                in_flight.append(asyncio.ensure_future(submit_batch(batch)))
+            await asyncio.gather(*in_flight)
+        
+        try:
+            await asyncio.gather(sign_batches(), submit_batches())
+        finally:
+            # Release the keys of signals that did not go through so they can be retried
+            for index, key in enumerate(keys):
+                if key is not None and not (results[index] and results[index].get("success")):
+                    self.submitted_signals.invalidate(key)
+        
+        for index, original_index in repeats.items():
+            original = results[original_index]
+            results[index] = dict(original, duplicate=True) if original and original.get("success") else original
+        
+        timings["total"] = time.perf_counter() - started
+        for stage, seconds in timings.items():
+            BATCH_STAGE_SECONDS.labels(stage).observe(seconds)
+        for result in results:
+            _count_outcome(result)
+        return {
+            "results": results,
+            "submitted": sum(1 for result in results if result and result.get("success") and not result.get("duplicate")),
+            "duplicates": sum(1 for result in results if result and result.get("duplicate")),
+            "timings": timings
+        }
     
-    def process_strategy_signals(self) -> List[Dict[str, Any]]:
+    async def execute_netted(self, signals: List[Dict[str, Any]], batch_size: int = 16,
+                             max_concurrency: int = 8) -> Dict[str, Any]:
+        """
+        Net signals from several strategies per symbol and execute only the residuals.
+        
+        Fills are split back to each contributing strategy's `on_order_fill`.
+        
+        Args:
+            signals: Trade signals; each must carry the originating "strategy" name
+            batch_size: Number of residual intents per signature request
+            max_concurrency: Maximum number of concurrent gateway submissions
+            
+        Returns:
+            Dictionary with per-signal results (in input order), the netted orders
+            and the number of intents actually submitted
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(signals)
+        positions = {id(signal): index for index, signal in enumerate(signals)}
+        
+        accepted = []
+        for index, signal in enumerate(signals):
+            # A malformed signal is rejected alone instead of failing the whole window
+            error = netting_error(signal)
+            if error is not None:
+                results[index] = {"success": False, "message": error}
+                continue
+            rejection = self._validate_signal(signal.get("strategy", "unknown"), signal)
+            if rejection is not None:
+                results[index] = rejection
+            else:
+                accepted.append(signal)
+        
+        orders = net_signals(accepted)
+        residual_orders = [order for order in orders if order["action"] is not None]
+        residuals = [
+            {
+                "action": order["action"],
+                "symbol": order["symbol"],
+                "amount": order["amount"],
+                "strategy": NETTED_STRATEGY
+            }
+            for order in residual_orders
+        ]
+        # Residuals are aggregates; two equal residuals are still two real orders
+        batch = await self.execute_signals_batch(residuals, batch_size=batch_size, max_concurrency=max_concurrency,
+                                                 deduplicate=False, netted=True)
+        submissions = {id(order): result for order, result in zip(residual_orders, batch["results"])}
+        
+        for order in orders:
+            residual = submissions.get(id(order))
+            filled = order["amount"] if residual and residual.get("success") else 0.0
+            for allocation, fill in zip(order["allocations"], split_fill(order, filled, order["reference_price"])):
+                strategy = self.active_strategies.get(fill["strategy"])
+                if strategy is not None and fill["amount"] > 0:
+                    strategy.on_order_fill(fill)
+                
+                # Signals crossed entirely inside the window have no submission of their own
+                submission = residual if allocation["external_amount"] > 0 else None
+                # Pro-rata splitting leaves float residue, so compare with a tolerance
+                complete = (fill["amount"] >= fill["requested_amount"]
+                            or math.isclose(fill["amount"], fill["requested_amount"], rel_tol=1e-9))
+                if complete:
+                    message = "Signal filled" + (" internally by netting" if submission is None else "")
+                else:
+                    message = submission["message"] if submission else "Signal not filled"
+                results[positions[id(allocation["signal"])]] = {
+                    "success": complete,
+                    "message": message,
+                    "fill": fill,
+                    "intent_id": submission.get("intent_id") if submission else None,
+                    "submission_id": submission.get("submission_id") if submission else None
+                }
+        
+        return {
+            "results": results,
+            "orders": orders,
+            "submitted_intents": batch["submitted"],
+            "timings": batch["timings"]
+        }
+    
+    def process_strategy_signals(self, market_data: Optional[Tick] = None) -> List[Dict[str, Any]]:
         """
         Process signals from all active strategies.
         
+        Args:
+            market_data: Tick to dispatch to every active strategy (default: a simulated tick)
+            
         Returns:
             List of execution results
         """
         results = []
         
-        # Process signals from each active strategy
-        for strategy_name, strategy in self.active_strategies.items():
+        if market_data is None:
             # In a real implementation, you would get market data from the data ingestion engine
             # For now, we'll simulate market data
-            market_data = {
-                "symbol": "BTC",
-                "price": 65000,
-                "timestamp": "2023-01-01T00:00:00Z",
-                "sma_short": 64000,
-                "sma_long": 63000
-            }
-            
+            market_data = Tick(
+                symbol="BTC",
+                price=65000,
+                timestamp="2023-01-01T00:00:00Z",
+                sma_short=64000,
+                sma_long=63000
+            )
+        
+        # Process signals from each active strategy
+        for strategy_name, strategy in list(self.active_strategies.items()):
             # Get signals from the strategy
             signals = strategy.on_tick(market_data)
+            if not signals:
+                continue
             
-            # Execute each signal
+            # Execute each signal; profiled strategies also get the execution time attributed
+            profile = PROFILER.active(strategy)
+            started = time.perf_counter()
             for signal in signals:
                 signal["strategy"] = strategy_name
                 result = self.execute_signal(strategy_name, signal)
                 results.append(result)
+            if profile is not None:
+                profile.observe_execution(time.perf_counter() - started)
         
         return results
+    
+    def process_arbitrage_opportunity(self, opportunity: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Offer a cross-exchange opportunity to all active strategies and execute their signals.
+        
+        Args:
+            opportunity: Opportunity from `ArbitrageScanner`
+            
+        Returns:
+            List of (strategy name, signal, execution result) dictionaries
+        """
+        results = []
+        for strategy_name, strategy in list(self.active_strategies.items()):
+            signals = strategy.on_arbitrage(opportunity)
+            if not signals:
+                continue
+            profile = PROFILER.active(strategy)
+            started = time.perf_counter()
+            for signal in signals:
+                signal["strategy"] = strategy_name
+                results.append({
+                    "strategy": strategy_name,
+                    "signal": signal,
+                    "result": self.execute_signal(strategy_name, signal)
+                })
+            if profile is not None:
+                profile.observe_execution(time.perf_counter() - started)
+        return results
 
 # Example usage
 if __name__ == "__main__":
@@ -223,4 +724,71 @@ if __name__ == "__main__":
     
     # Print results
     for result in results:
-        print(f"Execution result: {result}")
\ No newline at end of file
+        print(f"Execution result: {result}")
+    
+    # Pipelined batch execution against local stand-ins for the signer and gateway
+    def local_signer(intents):
+        time.sleep(0.01)  # One round-trip per batch
+        return [dict(intent, signature="local_signature", public_key="local_public_key") for intent in intents]
+    
+    def local_gateway(signed_intent):
+        time.sleep(0.005)
+        return {
+            "success": True,
+            "intent_id": signed_intent["id"],
+            "submission_id": str(uuid.uuid4()),
+            "message": "Intent submitted successfully"
+        }
+    
+    import os
+    import tempfile
+    journal_path = os.path.join(tempfile.mkdtemp(), "execution_journal.log")
+    batch_executor = ExecutionEngine(signer=local_signer, gateway=local_gateway,
+                                     journal=ExecutionJournal(journal_path))
+    batch_executor.set_risk_limits({"max_trades_per_hour": 1000})
+    batch_executor.register_strategy(strategy)
+    batch_signals = [
+        {"action": "BUY", "symbol": "BTC", "amount": 0.01, "strategy": strategy.name}
+        for _ in range(200)
+    ]
+    for i, signal in enumerate(batch_signals):
+        signal["idempotency_key"] = f"demo-{i}"
+    batch = asyncio.run(batch_executor.execute_signals_batch(batch_signals))
+    print(f"Batch submitted {batch['submitted']}/{len(batch_signals)} signals, timings: {batch['timings']}")
+    
+    # Re-sending the same signals inside the dedup window does no work
+    batch = asyncio.run(batch_executor.execute_signals_batch(batch_signals))
+    print(f"Re-sent batch: {batch['duplicates']} duplicates, {batch['submitted']} submitted, "
+          f"cache {batch_executor.submitted_signals.stats()}")
+    
+    # Cross-strategy netting: opposite signals on the same symbol cancel out
+    from order_netting import NettingWindow
+    
+    class RecordingStrategy(SimpleMAStrategy):
+        def __init__(self, name):
+            super().__init__()
+            self.name = name
+        
+        def on_order_fill(self, fill_data):
+            print(f"{self.name} filled {fill_data['action']} {fill_data['amount']:.3f} "
+                  f"({fill_data['internal_amount']:.3f} netted internally)")
+    
+    for name in ("Trend A", "Reversion B"):
+        batch_executor.register_strategy(RecordingStrategy(name))
+    
+    async def run_netting_window():
+        window = NettingWindow(batch_executor, window_seconds=0.05)
+        return await asyncio.gather(
+            window.submit("Trend A", {"action": "BUY", "symbol": "BTC", "amount": 0.05}),
+            window.submit("Reversion B", {"action": "SELL", "symbol": "BTC", "amount": 0.03}),
+        )
+    
+    for result in asyncio.run(run_netting_window()):
+        print(f"Netted result: {result['message']}, submission {result['submission_id']}")
+    batch_executor.journal.close()
+    
+    # Recover state after a restart
+    recovered = ExecutionEngine(journal=ExecutionJournal(journal_path))
+    state = recovered.recover_from_journal()
+    print(f"Replayed {state['records']} journal records: {recovered.trades_this_hour} trades this hour")
+    recovered.journal.close()
\ No newline at end of file
@@ -0,0 +1,304 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, List, Optional
+from records import to_plain
+
+class JournalError(RuntimeError):
+    """The journal can no longer make records durable."""
+
+def _day_start(now: float) -> float:
+    """Local midnight before `now`."""
+    return time.mktime(time.localtime(now)[:3] + (0, 0, 0, 0, 0, -1))
+
+def _encode(record: Dict[str, Any]) -> bytes:
+    return (json.dumps(record, separators=(",", ":"), default=to_plain) + "\n").encode("utf-8")
+
+class ExecutionJournal:
+    """
+    Append-only write-ahead journal of execution stages.
+
+    Each record is one JSON line. Appends are buffered in memory and written by
+    a single flusher thread that fsyncs everything pending at once (group
+    commit), so concurrent trades share one fsync instead of paying for their own.
+
+    When the file grows past `max_bytes` it is compacted: resolved intents
+    older than both the hourly and daily risk windows are dropped, since
+    replay no longer needs them.
+    """
+
+    def __init__(self, path: str = "execution_journal.log", max_bytes: int = 64 * 1024 * 1024,
+                 durable_timeout: float = 10.0):
+        """
+        Args:
+            path: Journal file
+            max_bytes: File size above which the journal is compacted
+            durable_timeout: Seconds `wait_durable` waits for an fsync by default
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.durable_timeout = durable_timeout
+        self._cond = threading.Condition()
+        self._pending: List[bytes] = []
+        self._next_seq = 1
+        self._durable_seq = 0
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self.fsync_count = 0
+        self.record_count = 0
+        self.compactions = 0
+        self._compact_at = max_bytes
+        # Held by whoever writes or replaces the file: the flusher or `compact`
+        self._file_lock = threading.Lock()
+        self._file = open(path, "ab")
+        self._flusher = threading.Thread(target=self._flush_loop, name="execution-journal", daemon=True)
+        self._flusher.start()
+
+    def append(self, stage: str, intent_id: str, data: Dict[str, Any], wait: bool = False) -> int:
+        """
+        Append a record to the journal.
+
+        Args:
+            stage: Execution stage ("intent", "signed", "submitted" or "failed")
+            intent_id: ID of the intent the record belongs to
+            data: Stage payload
+            wait: Block until the record has been fsynced
+
+        Returns:
+            Sequence number of the record
+        """
+        with self._cond:
+            if self._error is not None:
+                raise JournalError(f"Execution journal failed: {self._error}") from self._error
+            if self._closed:
+                raise RuntimeError("Execution journal is closed")
+            seq = self._next_seq
+            self._next_seq += 1
+            record = {"seq": seq, "ts": time.time(), "stage": stage, "intent_id": intent_id, "data": data}
+            self._pending.append(_encode(record))
+            self._cond.notify_all()
+        if wait:
+            self.wait_durable(seq)
+        return seq
+
+    def wait_durable(self, seq: int, timeout: Optional[float] = None) -> None:
+        """
+        Block until the record with the given sequence number has been fsynced.
+
+        Args:
+            seq: Sequence number returned by `append`
+            timeout: Seconds to wait (default: `durable_timeout`)
+
+        Raises:
+            JournalError: If writing the journal failed
+            TimeoutError: If the record is not durable in time
+        """
+        timeout = self.durable_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._durable_seq < seq:
+                if self._error is not None:
+                    raise JournalError(f"Execution journal failed: {self._error}") from self._error
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Journal record {seq} not durable after {timeout}s")
+                self._cond.wait(remaining)
+
+    def flush(self) -> None:
+        """Block until every record appended so far has been fsynced."""
+        with self._cond:
+            seq = self._next_seq - 1
+        self.wait_durable(seq)
+
+    def close(self) -> None:
+        """Flush pending records and stop the flusher thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._flusher.join()
+        self._file.close()
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                # Take everything that queued up during the previous fsync
+                batch, self._pending = self._pending, []
+                last_seq = self._next_seq - 1
+
+            try:
+                with self._file_lock:
+                    self._file.write(b"".join(batch))
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                    size = self._file.tell()
+            except Exception as e:
+                # Nothing after this point can be made durable: fail waiters and later appends
+                print(f"Execution journal write failed: {e}")
+                with self._cond:
+                    self._error = e
+                    self._cond.notify_all()
+                return
+
+            with self._cond:
+                self._durable_seq = last_seq
+                self.fsync_count += 1
+                self.record_count += len(batch)
+                self._cond.notify_all()
+
+            if size > self._compact_at:
+                try:
+                    self.compact()
+                except OSError as e:
+                    print(f"Execution journal compaction failed: {e}")
+
+    def compact(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Rewrite the journal with only the records `replay` still needs.
+
+        Kept are all records of intents that are unresolved, or whose last
+        record falls inside the hourly or daily risk window. The new file is
+        fsynced and then atomically replaces the old one. A torn final line is
+        dropped, so records appended afterwards stay readable.
+
+        Args:
+            now: Reference time for the risk windows (default: current time)
+
+        Returns:
+            Dictionary with the records before and after compaction
+        """
+        now = time.time() if now is None else now
+        cutoff = min(_day_start(now), now - 3600)
+        with self._file_lock:
+            records = self.read_records(self.path)
+            last_ts: Dict[str, float] = {}
+            resolved = set()
+            for record in records:
+                last_ts[record["intent_id"]] = record["ts"]
+                if record["stage"] in ("submitted", "failed"):
+                    resolved.add(record["intent_id"])
+            keep = {intent_id for intent_id, ts in last_ts.items() if intent_id not in resolved or ts >= cutoff}
+            kept = [record for record in records if record["intent_id"] in keep]
+
+            temp_path = self.path + ".compact"
+            with open(temp_path, "wb") as f:
+                f.write(b"".join(_encode(record) for record in kept))
+                f.flush()
+                os.fsync(f.fileno())
+            self._file.close()
+            os.replace(temp_path, self.path)
+            self._file = open(self.path, "ab")
+            # Don't compact again until the kept records have had room to grow
+            self._compact_at = max(self.max_bytes, 2 * self._file.tell())
+            self.compactions += 1
+        return {"records": len(records), "kept": len(kept)}
+
+    @staticmethod
+    def read_records(path: str) -> List[Dict[str, Any]]:
+        """
+        Read all intact records from a journal file.
+
+        A torn final line left by a crash mid-write is ignored.
+
+        Args:
+            path: Path to the journal file
+
+        Returns:
+            Records in append order
+        """
+        if not os.path.exists(path):
+            return []
+
+        records = []
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+        return records
+
+    def replay(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Replay the journal to recover execution state after a restart.
+
+        Args:
+            now: Reference time for the hourly and daily windows (default: current time)
+
+        Returns:
+            Dictionary with the trades submitted in the last hour, sells submitted
+            today and intents that were never resolved (submitted or failed)
+        """
+        now = time.time() if now is None else now
+        day_start = _day_start(now)
+        intents: Dict[str, Dict[str, Any]] = {}
+        trades_last_hour = 0
+        sells_today = 0
+        records = self.read_records(self.path)
+
+        for record in records:
+            stage = record["stage"]
+            intent_id = record["intent_id"]
+            if stage == "intent":
+                intents[intent_id] = {"intent": record["data"], "stage": stage}
+            elif stage == "signed":
+                if intent_id in intents:
+                    intents[intent_id]["stage"] = stage
+            else:
+                entry = intents.pop(intent_id, None)
+                if stage == "submitted" and entry is not None:
+                    if record["ts"] >= now - 3600:
+                        trades_last_hour += 1
+                    if record["ts"] >= day_start and entry["intent"].get("action") == "sell":
+                        sells_today += 1
+
+        return {
+            "records": len(records),
+            "trades_last_hour": trades_last_hour,
+            "sells_today": sells_today,
+            "in_flight": intents
+        }
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    path = os.path.join(tempfile.mkdtemp(), "execution_journal.log")
+    journal = ExecutionJournal(path)
+
+    def trade(i):
+        intent_id = f"intent-{i}"
+        journal.append("intent", intent_id, {"id": intent_id, "action": "sell" if i % 2 else "buy", "amount": 0.01})
+        journal.append("signed", intent_id, {"signature": "simulated_signature"}, wait=True)
+        if i % 10:
+            journal.append("submitted", intent_id, {"submission_id": f"sub-{i}"})
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        list(pool.map(trade, range(2000)))
+    journal.flush()
+    elapsed = time.perf_counter() - started
+    print(f"Journaled {journal.record_count} records with {journal.fsync_count} fsyncs in {elapsed:.3f}s")
+
+    started = time.perf_counter()
+    state = journal.replay()
+    print(f"Replayed {state['records']} records in {time.perf_counter() - started:.3f}s: "
+          f"{state['trades_last_hour']} trades this hour, {state['sells_today']} sells today, "
+          f"{len(state['in_flight'])} in flight")
+
+    # Two days later only the unresolved intents are still needed
+    compacted = journal.compact(now=time.time() + 2 * 86400)
+    print(f"Compacted {compacted['records']} records to {compacted['kept']}")
+
+    # A failed write surfaces to waiters instead of blocking them forever
+    journal._file.close()
+    try:
+        journal.append("intent", "intent-after-failure", {"id": "intent-after-failure"}, wait=True)
+    except JournalError as e:
+        print(f"Append failed as expected: {e}")
+    journal.close()
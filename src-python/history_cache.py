@@ -0,0 +1,239 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Dict, Any, Hashable, Optional
+import numpy as np
+
+RESOLUTION_SECONDS = {"1min": 60, "5min": 300, "15min": 900, "1h": 3600, "4h": 14400, "1d": 86400}
+FIELDS = ("timestamps", "open", "high", "low", "close", "volume")
+
+class PriceArrays:
+    """
+    Column arrays for one symbol over a time range. Timestamps are Unix
+    seconds (int64); prices and volume are float64.
+
+    Arrays handed out by `HistoryCache` are views into the cache's buffers:
+    treat them as read-only.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(self, timestamps: np.ndarray, open: np.ndarray, high: np.ndarray,
+                 low: np.ndarray, close: np.ndarray, volume: np.ndarray):
+        self.timestamps = timestamps
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in FIELDS)
+
+    def slice(self, start: int, stop: int) -> "PriceArrays":
+        """Return rows [start, stop) as views (no copy)."""
+        return PriceArrays(*(getattr(self, name)[start:stop] for name in FIELDS))
+
+# Loads bars for (symbol, first bar time, end time exclusive, step seconds)
+Loader = Callable[[str, int, int, int], PriceArrays]
+
+class _Series:
+    """
+    Cached arrays for one key, covering [start, end) in Unix seconds.
+
+    Buffers keep spare capacity at the end so newer bars are appended in
+    amortized O(new bars). Growing reallocates, but views handed out earlier
+    keep pointing at the old buffers and stay valid.
+    """
+
+    def __init__(self, arrays: PriceArrays, start: int, end: int):
+        self.start = start
+        self.end = end
+        self.length = 0
+        self.buffers: Dict[str, np.ndarray] = {
+            name: np.empty(max(1, len(arrays)), dtype=getattr(arrays, name).dtype) for name in FIELDS
+        }
+        self.append(arrays, end)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buffer.nbytes for buffer in self.buffers.values())
+
+    def append(self, arrays: PriceArrays, end: int) -> None:
+        needed = self.length + len(arrays)
+        capacity = len(self.buffers["timestamps"])
+        if needed > capacity:
+            capacity = max(needed, capacity * 2)
+            for name, buffer in self.buffers.items():
+                grown = np.empty(capacity, dtype=buffer.dtype)
+                grown[:self.length] = buffer[:self.length]
+                self.buffers[name] = grown
+        for name in FIELDS:
+            self.buffers[name][self.length:needed] = getattr(arrays, name)
+        self.length = needed
+        self.end = end
+
+    def view(self, start: int, end: int) -> PriceArrays:
+        """Return the bars with timestamps in [start, end) as views."""
+        timestamps = self.buffers["timestamps"][:self.length]
+        first, last = np.searchsorted(timestamps, [start, end])
+        return PriceArrays(*(self.buffers[name][first:last] for name in FIELDS))
+
+def to_unix_seconds(moment: datetime) -> float:
+    """Unix time of a datetime; naive datetimes are taken as UTC."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+class HistoryCache:
+    """
+    Process-wide cache of historical price arrays, bounded by bytes with LRU eviction.
+
+    One entry per (source, symbol, resolution) covers a contiguous time
+    range. Requests inside it are answered with zero-copy slices, requests
+    reaching past its end load only the missing newer bars, and any other
+    request replaces the entry. Concurrent misses for the same key load once.
+    Thread-safe.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            max_bytes: Total buffer size above which least recently used entries are evicted
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, _Series]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._fill_locks: Dict[Hashable, threading.Lock] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.extensions = 0
+        self.evictions = 0
+
+    def get(self, source: str, symbol: str, resolution: str, start: datetime, end: datetime,
+            loader: Loader) -> PriceArrays:
+        """
+        Return bars on the resolution grid from `start` to `end` (both inclusive).
+
+        Args:
+            source: Identifies the data source (e.g. the database path)
+            symbol: Trading symbol
+            resolution: Bar size, a key of RESOLUTION_SECONDS
+            start: First bar time
+            end: Last bar time
+            loader: Called with (symbol, first bar time, end time exclusive, step) on a miss
+
+        Returns:
+            PriceArrays viewing the cache's buffers
+        """
+        step = RESOLUTION_SECONDS[resolution]
+        start_ts = -(-int(to_unix_seconds(start)) // step) * step  # First grid point at or after start
+        end_ts = int(to_unix_seconds(end)) // step * step + step   # Exclusive bound after the last grid point
+        key = (source, symbol, resolution)
+
+        arrays = self._lookup(key, start_ts, end_ts)
+        if arrays is not None:
+            return arrays
+
+        with self._lock:
+            fill_lock = self._fill_locks.setdefault(key, threading.Lock())
+        with fill_lock:
+            # Another thread may have loaded it while this one waited
+            arrays = self._lookup(key, start_ts, end_ts)
+            if arrays is not None:
+                return arrays
+
+            with self._lock:
+                series = self._entries.get(key)
+            if series is not None and series.start <= start_ts <= series.end < end_ts:
+                # Newer data requested: load only the bars after the cached range
+                series.append(loader(symbol, series.end, end_ts, step), end_ts)
+                with self._lock:
+                    self.extensions += 1
+            else:
+                series = _Series(loader(symbol, start_ts, end_ts, step), start_ts, end_ts)
+                with self._lock:
+                    self.misses += 1
+
+            with self._lock:
+                self._entries.pop(key, None)
+                self._entries[key] = series
+                # Extended series grew in place, so recount rather than adjust
+                self.bytes = sum(entry.nbytes for entry in self._entries.values())
+                self._evict(keep=key)
+            return series.view(start_ts, end_ts)
+
+    def _lookup(self, key: Hashable, start_ts: int, end_ts: int) -> Optional[PriceArrays]:
+        with self._lock:
+            series = self._entries.get(key)
+            if series is None or start_ts < series.start or end_ts > series.end:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return series.view(start_ts, end_ts)
+
+    def _evict(self, keep: Hashable) -> None:
+        """Drop least recently used entries until under budget (never the one just stored)."""
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            key, series = next(iter(self._entries.items()))
+            if key == keep:
+                break
+            del self._entries[key]
+            self._fill_locks.pop(key, None)
+            self.bytes -= series.nbytes
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.extensions
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "extensions": self.extensions,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+# Shared by every backtest in the process
+HISTORY_CACHE = HistoryCache()
+
+# Example usage
+if __name__ == "__main__":
+    import time
+    from datetime import timedelta
+
+    loaded = []
+
+    def synthetic_loader(symbol: str, start_ts: int, end_ts: int, step: int) -> PriceArrays:
+        loaded.append((start_ts, end_ts))
+        timestamps = np.arange(start_ts, end_ts, step, dtype=np.int64)
+        close = 65000.0 + (timestamps - timestamps[0]) / step * 0.1 if len(timestamps) else np.empty(0)
+        return PriceArrays(timestamps, close, close + 100, close - 100, close, np.full(len(timestamps), 1e6))
+
+    cache = HistoryCache(max_bytes=64 * 1024 * 1024)
+    start = datetime(2023, 1, 1)
+    started = time.perf_counter()
+    month = cache.get("example", "BTC", "1min", start, start + timedelta(days=30), synthetic_loader)
+    print(f"Loaded {len(month)} bars in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    started = time.perf_counter()
+    week = cache.get("example", "BTC", "1min", start + timedelta(days=7), start + timedelta(days=14), synthetic_loader)
+    print(f"Sliced {len(week)} bars in {(time.perf_counter() - started) * 1000:.3f} ms, "
+          f"shares memory: {np.shares_memory(week.close, month.close)}")
+
+    cache.get("example", "BTC", "1min", start, start + timedelta(days=31), synthetic_loader)
+    print(f"Extension loaded only {(loaded[-1][1] - loaded[-1][0]) // 60} new bars")
+    print(cache.stats())
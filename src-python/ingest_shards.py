@@ -0,0 +1,150 @@
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+# Default universe: the same USDT pairs on every venue, so prices are comparable across exchanges
+DEFAULT_BASE_ASSETS = [
+    "BTC", "ETH", "SOL", "BNB", "XRP", "ADA", "DOGE", "AVAX", "DOT", "LINK",
+    "MATIC", "LTC", "TRX", "ATOM", "UNI", "ETC", "XLM", "NEAR", "APT", "ARB"
+]
+DEFAULT_VENUES = ["Binance", "OKX", "Bybit", "Kraken", "Coinbase"]
+DEFAULT_UNIVERSE = {venue: [f"{asset}USDT" for asset in DEFAULT_BASE_ASSETS] for venue in DEFAULT_VENUES}
+
+# Symbols per ticker request; venues without a multi-symbol endpoint take one symbol per request
+BATCH_LIMITS = {"Binance": 100, "OKX": 100, "Bybit": 50, "Kraken": 50, "Coinbase": 1}
+
+def load_universe(path: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    Load the (exchange -> symbols) universe to ingest.
+
+    Args:
+        path: JSON file mapping exchange names to symbol lists (default: the
+            NOAH_INGEST_UNIVERSE environment variable, else DEFAULT_UNIVERSE)
+
+    Returns:
+        Dictionary mapping each exchange to its symbols
+    """
+    path = path or os.environ.get("NOAH_INGEST_UNIVERSE")
+    if not path:
+        return {venue: list(symbols) for venue, symbols in DEFAULT_UNIVERSE.items()}
+    with open(path) as f:
+        universe = json.load(f)
+    if not isinstance(universe, dict) or not all(isinstance(s, list) for s in universe.values()):
+        raise ValueError(f"{path} must map exchange names to lists of symbols")
+    return universe
+
+def shard_universe(universe: Dict[str, List[str]], shards: int) -> List[Dict[str, List[str]]]:
+    """
+    Split the universe into shards of whole venues with balanced symbol counts.
+
+    Venues are assigned largest first to the least loaded shard.
+
+    Args:
+        universe: Exchange -> symbols
+        shards: Number of shards
+
+    Returns:
+        One (exchange -> symbols) mapping per non-empty shard
+    """
+    assignments: List[Dict[str, List[str]]] = [{} for _ in range(max(1, shards))]
+    loads = [0] * len(assignments)
+    for venue, symbols in sorted(universe.items(), key=lambda item: len(item[1]), reverse=True):
+        target = loads.index(min(loads))
+        assignments[target][venue] = list(symbols)
+        loads[target] += len(symbols)
+    return [assignment for assignment in assignments if assignment]
+
+def fetch_raw_batch(exchange: str, symbols: List[str]) -> bytes:
+    """Fetch one ticker response for a batch of symbols (placeholder implementation)."""
+    # In a real implementation, this would call the venue's multi-symbol ticker endpoint
+    # For now, we'll simulate a response body in the venue's wire format (prices as strings),
+    # quoting the seeded synthetic market so every shard process sees the same prices
+    from synthetic_market import SYNTHETIC_MARKET
+
+    now = time.time()
+    tickers = []
+    for symbol in symbols:
+        price, volume = SYNTHETIC_MARKET.quote(symbol, exchange, now)
+        tickers.append({
+            "symbol": symbol,
+            "lastPrice": f"{price:.8f}",
+            "volume": f"{volume:.2f}",
+            "closeTime": int(now * 1000)
+        })
+    return json.dumps(tickers).encode("utf-8")
+
+def normalize_batch(exchange: str, raw: bytes) -> List[Dict[str, Any]]:
+    """Decode a ticker response into exchange_data rows."""
+    return [
+        {
+            "timestamp": datetime.fromtimestamp(ticker["closeTime"] / 1000).isoformat(),
+            "exchange": exchange,
+            "symbol": ticker["symbol"],
+            "price": float(ticker["lastPrice"]),
+            "volume": float(ticker["volume"])
+        }
+        for ticker in json.loads(raw)
+    ]
+
+def collect_ticks(venues: Dict[str, List[str]]) -> List[Dict[str, Any]]:
+    """Fetch and normalize the latest tick for every (exchange, symbol) in `venues`, batching requests."""
+    ticks = []
+    for exchange, symbols in venues.items():
+        batch_size = BATCH_LIMITS.get(exchange, 1)
+        for start in range(0, len(symbols), batch_size):
+            ticks.extend(normalize_batch(exchange, fetch_raw_batch(exchange, symbols[start:start + batch_size])))
+    return ticks
+
+def run_shard(shard_id: int, venues: Dict[str, List[str]], interval_seconds: float, queue, stop_event) -> None:
+    """
+    Worker process entry point: collect ticks for a shard's venues every
+    interval and send them, with throughput stats, to the single writer.
+
+    Messages on `queue` are ("ticks", shard_id, rows) and ("stats", shard_id, stats).
+    """
+    try:
+        _shard_loop(shard_id, venues, interval_seconds, queue, stop_event)
+    except KeyboardInterrupt:
+        pass  # Ctrl-C reaches the whole process group; the parent shuts down
+
+def _shard_loop(shard_id: int, venues: Dict[str, List[str]], interval_seconds: float, queue, stop_event) -> None:
+    started = time.perf_counter()
+    while not stop_event.is_set():
+        cycle_started = time.perf_counter()
+        try:
+            ticks = collect_ticks(venues)
+        except Exception as e:
+            print(f"Shard {shard_id} failed to collect ticks: {e}")
+            stop_event.wait(interval_seconds)
+            continue
+        busy = time.perf_counter() - cycle_started
+        queue.put(("ticks", shard_id, ticks))
+
+        stop_event.wait(max(0.0, interval_seconds - busy))
+        elapsed = time.perf_counter() - cycle_started
+        queue.put(("stats", shard_id, {
+            "venues": sorted(venues),
+            "symbols": sum(len(symbols) for symbols in venues.values()),
+            "ticks": len(ticks),
+            "ticks_per_second": len(ticks) / elapsed if elapsed else 0.0,
+            "capacity_ticks_per_second": len(ticks) / busy if busy else 0.0,
+            "busy_seconds": busy,
+            "uptime_seconds": time.perf_counter() - started
+        }))
+
+# Example usage: single-process collection throughput for the default universe
+if __name__ == "__main__":
+    universe = load_universe()
+    print(f"{sum(len(s) for s in universe.values())} pairs on {len(universe)} venues")
+    for shard_id, venues in enumerate(shard_universe(universe, 2)):
+        print(f"Shard {shard_id}: {sorted(venues)}")
+
+    rounds = 50
+    started = time.perf_counter()
+    for _ in range(rounds):
+        ticks = collect_ticks(universe)
+    elapsed = time.perf_counter() - started
+    print(f"{rounds * len(ticks) / elapsed:.0f} ticks/s decoded in one process")
+    print(ticks[0])
@@ -1,22 +1,123 @@
-from langchain.agents import AgentExecutor, create_tool_calling_agent
-from langchain.tools import tool
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_openai import ChatOpenAI
+import functools
+import re
 import sqlite3
-from typing import Dict, Any, List
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Callable, Optional
 import os
+from arbitrage_scanner import ArbitrageScanner
+from market_stats import MarketStats
+from metrics import REGISTRY
+from ttl_cache import TTLCache, SingleFlight
+
+LLM_QUERY_SECONDS = REGISTRY.histogram("noah_llm_query_seconds", "Time to answer one LLM query")
+LLM_QUERY_ERRORS = REGISTRY.counter("noah_llm_query_errors_total", "LLM queries that failed")
+LLM_FIRST_TOKEN_SECONDS = REGISTRY.histogram("noah_llm_first_token_seconds", "Time to the first streamed token of an LLM answer")
+
+# Market data is re-ingested every 10 seconds, so cached answers older than
+# that could miss a new tick
+RESPONSE_TTL_SECONDS = 10.0
+
+FUNDING_INTERVAL_SECONDS = 8 * 60 * 60
+
+def normalize_query(query: str) -> str:
+    """Normalize a query for response caching: case, whitespace and trailing punctuation are ignored."""
+    return re.sub(r"\s+", " ", query.strip().lower()).rstrip("?!. ")
+
+def cached_tool(ttl_seconds: float) -> Callable:
+    """Cache a tool method's results per argument set for `ttl_seconds`."""
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            return self._call_tool(method, ttl_seconds, args, kwargs)
+        return wrapper
+    return decorator
+
+class QueryCancelled(Exception):
+    """Raised inside the agent loop when a streaming client has gone away."""
+
+_stream_handler_class = None
+
+def stream_handler_class():
+    """Build (once) the langchain callback handler that forwards tokens and tool calls to a stream."""
+    global _stream_handler_class
+    if _stream_handler_class is not None:
+        return _stream_handler_class
+    from langchain_core.callbacks import BaseCallbackHandler
+    
+    class StreamHandler(BaseCallbackHandler):
+        # Let QueryCancelled abort the agent instead of being logged and ignored
+        raise_error = True
+        
+        def __init__(self, emit: Callable[[str, Dict[str, Any]], None], cancelled: Optional[threading.Event]):
+            self.emit = emit
+            self.cancelled = cancelled
+            self.tokens = 0
+        
+        def _check_cancelled(self):
+            if self.cancelled is not None and self.cancelled.is_set():
+                raise QueryCancelled("Client disconnected")
+        
+        def on_llm_new_token(self, token: str, **kwargs):
+            self._check_cancelled()
+            self.tokens += 1
+            self.emit("token", {"text": token})
+        
+        def on_tool_start(self, serialized: Dict[str, Any], input_str: str, **kwargs):
+            self._check_cancelled()
+            self.emit("tool_start", {"tool": (serialized or {}).get("name"), "input": input_str})
+        
+        def on_tool_end(self, output: Any, **kwargs):
+            self.emit("tool_end", {"tool": kwargs.get("name"), "output": str(output)})
+    
+    _stream_handler_class = StreamHandler
+    return _stream_handler_class
 
 class LLMBrain:
-    \"\"\"LLM Brain for the Noah agent.\"\"\"
+    """LLM Brain for the Noah agent."""
     
-    def __init__(self, db_path: str = "market_data.db"):
+    def __init__(self, db_path: str = "market_data.db", market_stats: Optional[MarketStats] = None,
+                 arbitrage_scanner: Optional[ArbitrageScanner] = None):
+        """
+        Args:
+            db_path: Path to the SQLite market database
+            market_stats: Rolling 24h statistics maintained by the data ingestor
+            arbitrage_scanner: Cross-exchange spread index maintained by the data ingestor
+        """
         self.db_path = db_path
+        self.market_stats = market_stats
+        self.arbitrage_scanner = arbitrage_scanner
         self.llm = None
         self.agent_executor = None
-        self._initialize_llm()
+        # langchain is slow to import, so the agent is built on the first query
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        # One SQLite connection per worker thread, reused across tool calls
+        self._local = threading.local()
+        self.tool_caches: Dict[str, TTLCache] = {}
+        self.response_cache = TTLCache(max_entries=512, ttl_seconds=RESPONSE_TTL_SECONDS)
+        self.query_flight = SingleFlight()
+        self.agent_calls = 0
+        self.agent_seconds = 0.0
+        self.tool_calls = 0
+        self.tool_seconds = 0.0
+        
+    def ensure_initialized(self):
+        """Build the LLM and agent on first use."""
+        if self._initialized:
+            return
+        with self._init_lock:
+            if not self._initialized:
+                self._initialize_llm()
+                self._initialized = True
         
     def _initialize_llm(self):
-        \"\"\"Initialize the LLM with OpenAI API.\"\"\"
+        """Initialize the LLM with OpenAI API."""
+        from langchain.agents import AgentExecutor, create_tool_calling_agent
+        from langchain.tools import tool
+        from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+        
         # Check if OpenAI API key is set
         api_key = os.environ.get("OPENAI_API_KEY")
         if not api_key:
@@ -31,31 +132,95 @@ class LLMBrain:
             ])
         else:
             # Initialize OpenAI LLM
+            from langchain_openai import ChatOpenAI
             self.llm = ChatOpenAI(
                 model="gpt-3.5-turbo",
                 temperature=0.7,
-                api_key=api_key
+                api_key=api_key,
+                streaming=True  # Tokens reach stream_query callbacks as they are generated
             )
         
-        # Create tools
-        tools = [self.get_price_data, self.get_funding_rates, self.get_arbitrage_opportunities]
+        # Create tools (bound methods, so the tools see this brain's database)
+        tools = [tool(self.get_price_data), tool(self.get_funding_rates), tool(self.get_arbitrage_opportunities)]
         
         # Create prompt
+        system = ("system", "You are Noah, an AI-powered financial assistant for Bitcoin DeFi trading. "
+                            "You have access to market data tools that you can use to answer questions and provide insights. "
+                            "Always be helpful, accurate, and concise in your responses.")
         prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are Noah, an AI-powered financial assistant for Bitcoin DeFi trading. "
-                      "You have access to market data tools that you can use to answer questions and provide insights. "
-                      "Always be helpful, accurate, and concise in your responses."),
+            system,
             ("human", "{input}"),
             MessagesPlaceholder("agent_scratchpad"),
         ])
         
-        # Create agent
-        agent = create_tool_calling_agent(self.llm, tools, prompt)
-        self.agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
+        # Create agent. Plain LLMs (like the mock) have no bind_tools, and
+        # create_tool_calling_agent rejects them with a ValueError
+        agent = None
+        if hasattr(self.llm, "bind_tools"):
+            try:
+                agent = create_tool_calling_agent(self.llm, tools, prompt)
+            except (NotImplementedError, ValueError):
+                agent = None
+        if agent is not None:
+            self.agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
+        else:
+            # Models that cannot call tools answer from the prompt alone
+            from langchain_core.output_parsers import StrOutputParser
+            from langchain_core.runnables import RunnableParallel
+            chain = ChatPromptTemplate.from_messages([system, ("human", "{input}")]) | self.llm | StrOutputParser()
+            self.agent_executor = RunnableParallel(output=chain)
+        
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's database connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.db_path)
+        return conn
+    
+    def _call_tool(self, method: Callable, ttl_seconds: float, args: tuple, kwargs: Dict[str, Any]) -> Any:
+        """Serve a tool call from its cache or run it and cache the result."""
+        cache = self.tool_caches.get(method.__name__)
+        if cache is None:
+            cache = self.tool_caches.setdefault(method.__name__, TTLCache(max_entries=256, ttl_seconds=ttl_seconds))
+        key = (args, tuple(sorted(kwargs.items())))
+        result = cache.get(key)
+        if result is None:
+            started = time.perf_counter()
+            result = method(self, *args, **kwargs)
+            self.tool_calls += 1
+            self.tool_seconds += time.perf_counter() - started
+            cache.put(key, result)
+        return result
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Report cache hit rates and the latency they saved.
+        
+        Saved latency is estimated as hits (plus coalesced queries) times the
+        mean latency of the calls that actually ran.
         
-    @tool
+        Returns:
+            Dictionary with response cache, coalescing and per-tool statistics
+        """
+        mean_agent = self.agent_seconds / self.agent_calls if self.agent_calls else 0.0
+        mean_tool = self.tool_seconds / self.tool_calls if self.tool_calls else 0.0
+        responses = self.response_cache.stats()
+        responses["estimated_saved_seconds"] = (responses["hits"] + self.query_flight.coalesced) * mean_agent
+        tools = {}
+        for name, cache in self.tool_caches.items():
+            tools[name] = cache.stats()
+            tools[name]["estimated_saved_seconds"] = tools[name]["hits"] * mean_tool
+        return {
+            "responses": responses,
+            "coalesced_queries": self.query_flight.coalesced,
+            "agent_calls": self.agent_calls,
+            "mean_agent_seconds": mean_agent,
+            "tools": tools
+        }
+    
+    @cached_tool(ttl_seconds=RESPONSE_TTL_SECONDS)
     def get_price_data(self, symbol: str = "BTC") -> Dict[str, Any]:
-        \"\"\"
+        """
         Get current price data for a symbol.
         
         Args:
@@ -63,27 +228,15 @@ class LLMBrain:
             
         Returns:
             Dictionary with price data
-        \"\"\"
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # In a real implementation, you would fetch actual data from the database
-        # For now, we'll return simulated data
-        data = {
-            "symbol": symbol,
-            "price": 65000.0,
-            "change_24h": 2.5,
-            "volume_24h": 15000000000,
-            "high_24h": 66000.0,
-            "low_24h": 64000.0
-        }
-        
-        conn.close()
-        return data
+        """
+        stats = self.market_stats.price_stats(symbol) if self.market_stats is not None else None
+        if stats is None:
+            return {"symbol": symbol, "error": "No price data in the last 24 hours"}
+        return stats
     
-    @tool
+    @cached_tool(ttl_seconds=60.0)  # Funding rates only change at funding intervals
     def get_funding_rates(self, symbol: str = "BTC") -> Dict[str, Any]:
-        \"\"\"
+        """
         Get funding rates for a symbol.
         
         Args:
@@ -91,25 +244,19 @@ class LLMBrain:
             
         Returns:
             Dictionary with funding rate data
-        \"\"\"
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # In a real implementation, you would fetch actual data from the database
-        # For now, we'll return simulated data
-        data = {
-            "symbol": symbol,
-            "funding_rate": 0.0001,  # 0.01%
-            "next_funding_time": "2023-01-01T08:00:00Z",
-            "predicted_rate": 0.00005  # 0.005%
-        }
-        
-        conn.close()
-        return data
+        """
+        stats = self.market_stats.funding_stats(symbol) if self.market_stats is not None else None
+        if stats is None:
+            return {"symbol": symbol, "error": "No funding rate data in the last 24 hours"}
+        # Perpetual funding settles every 8 hours at 00:00, 08:00 and 16:00 UTC
+        now = time.time()
+        next_funding = now - now % FUNDING_INTERVAL_SECONDS + FUNDING_INTERVAL_SECONDS
+        stats["next_funding_time"] = datetime.fromtimestamp(next_funding, tz=timezone.utc).isoformat()
+        return stats
     
-    @tool
+    @cached_tool(ttl_seconds=RESPONSE_TTL_SECONDS)
     def get_arbitrage_opportunities(self, min_spread: float = 0.1) -> List[Dict[str, Any]]:
-        \"\"\"
+        """
         Get arbitrage opportunities between exchanges.
         
         Args:
@@ -117,29 +264,15 @@ class LLMBrain:
             
         Returns:
             List of arbitrage opportunities
-        \"\"\"
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # In a real implementation, you would fetch actual data from the database
-        # For now, we'll return simulated data
-        opportunities = [
-            {
-                "symbol": "BTC",
-                "buy_exchange": "Exchange A",
-                "sell_exchange": "Exchange B",
-                "buy_price": 64900.0,
-                "sell_price": 65100.0,
-                "spread": 0.31,  # Percentage
-                "potential_profit": 200.0  # In USD
-            }
-        ]
-        
-        conn.close()
+        """
+        if self.arbitrage_scanner is None:
+            return []
+        opportunities = self.arbitrage_scanner.opportunities(min_spread=min_spread)
+        
         return opportunities
     
     def process_query(self, query: str) -> str:
-        \"\"\"
+        """
         Process a natural language query using the LLM brain.
         
         Args:
@@ -147,20 +280,101 @@ class LLMBrain:
             
         Returns:
             Response from the LLM
-        \"\"\"
+        """
+        key = normalize_query(query)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            self.ensure_initialized()
+        except Exception as e:
+            LLM_QUERY_ERRORS.inc()
+            return f"Error initializing LLM brain: {str(e)}"
         if not self.agent_executor:
             return "LLM brain not initialized properly."
         
         try:
-            result = self.agent_executor.invoke({"input": query})
-            return result["output"]
+            # Identical queries arriving while one is running share its answer
+            return self.query_flight.do(key, lambda: self._run_agent(query, key))
         except Exception as e:
+            LLM_QUERY_ERRORS.inc()
             return f"Error processing query: {str(e)}"
+    
+    def stream_query(self, query: str, emit: Callable[[str, Dict[str, Any]], None],
+                     cancelled: Optional[threading.Event] = None) -> str:
+        """
+        Process a query, emitting the answer as it is produced.
+        
+        `emit(event_type, data)` is called from the calling thread with "token"
+        and "tool_start"/"tool_end" events, then exactly one "done" or "error".
+        LLMs that do not stream (like the mock) emit their answer as one token.
+        
+        Args:
+            query: Natural language query
+            emit: Callback receiving each event
+            cancelled: Set by the caller to abort at the next token or tool call
+            
+        Returns:
+            Response from the LLM (or the error message)
+        """
+        started = time.perf_counter()
+        first_token = []
+        
+        def emit_timed(event_type: str, data: Dict[str, Any]):
+            if event_type == "token" and not first_token:
+                first_token.append(True)
+                LLM_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - started)
+            emit(event_type, data)
+        
+        key = normalize_query(query)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            emit_timed("token", {"text": cached})
+            emit("done", {"response": cached, "cached": True})
+            return cached
+        
+        try:
+            self.ensure_initialized()
+            if not self.agent_executor:
+                raise RuntimeError("LLM brain not initialized properly.")
+            handler = stream_handler_class()(emit_timed, cancelled)
+            response = self._run_agent(query, key, callbacks=[handler])
+        except Exception as e:
+            LLM_QUERY_ERRORS.inc()
+            message = f"Error processing query: {str(e)}"
+            emit("error", {"message": message})
+            return message
+        
+        if not handler.tokens:
+            emit_timed("token", {"text": response})
+        emit("done", {"response": response, "cached": False})
+        return response
+    
+    def _run_agent(self, query: str, key: str, callbacks: Optional[List[Any]] = None) -> str:
+        """Run the agent loop and cache a successful answer."""
+        started = time.perf_counter()
+        with LLM_QUERY_SECONDS.time():
+            result = self.agent_executor.invoke({"input": query}, config={"callbacks": callbacks} if callbacks else None)
+        self.agent_calls += 1
+        self.agent_seconds += time.perf_counter() - started
+        self.response_cache.put(key, result["output"])
+        return result["output"]
 
 # Example usage
 if __name__ == "__main__":
-    # Create LLM brain
-    brain = LLMBrain()
+    # Create LLM brain backed by a few minutes of simulated ticks
+    market_stats = MarketStats()
+    for i in range(30):
+        market_stats.update_tick("BTCUSDT", 65000.0 + i * 10, 1000.0, time.time() - 300 + i * 10)
+    market_stats.update_funding("BTCUSDT", 0.0001)
+    arbitrage_scanner = ArbitrageScanner()
+    arbitrage_scanner.update("BTC", "Exchange A", 64890.0, 64900.0)
+    arbitrage_scanner.update("BTC", "Exchange B", 65100.0, 65110.0)
+    brain = LLMBrain(market_stats=market_stats, arbitrage_scanner=arbitrage_scanner)
+    print(brain.get_price_data("BTC"))
+    print(brain.get_funding_rates("BTC"))
+    print(brain.get_arbitrage_opportunities(0.2))
     
     # Process some example queries
     queries = [
@@ -172,4 +386,11 @@ if __name__ == "__main__":
     for query in queries:
         print(f"Query: {query}")
         response = brain.process_query(query)
-        print(f"Response: {response}\n")
\ No newline at end of file
+        print(f"Response: {response}\n")
+    
+    # Repeated questions are answered from the response cache
+    brain.process_query("what is the current price of btc")
+    
+    # Streaming: tokens and tool calls arrive as they are produced
+    brain.stream_query("Summarize the BTC market", lambda event_type, data: print(f"[{event_type}] {data}"))
+    print(f"Cache stats: {brain.cache_stats()}")
\ No newline at end of file
@@ -0,0 +1,245 @@
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+
+WINDOW_SECONDS = 24 * 60 * 60
+BUCKET_SECONDS = 60
+
+class RollingWindow:
+    """
+    24h sliding window over one-minute buckets for a single series.
+
+    Sum and count are kept as running totals, and high/low come from
+    monotonic deques, so updates are amortized O(1) and reads are O(1).
+    """
+
+    def __init__(self, window_seconds: int = WINDOW_SECONDS, bucket_seconds: int = BUCKET_SECONDS):
+        self.window_buckets = window_seconds // bucket_seconds
+        self.bucket_seconds = bucket_seconds
+        # (bucket index, first value, sum, count) per non-empty bucket, oldest first
+        self.buckets: deque = deque()
+        self.maxima: deque = deque()  # (bucket index, high), decreasing highs
+        self.minima: deque = deque()  # (bucket index, low), increasing lows
+        self.total = 0.0
+        self.count = 0
+        self.last: Optional[float] = None
+        self.last_timestamp: Optional[float] = None
+
+    def add(self, value: float, weight: float, timestamp: float) -> None:
+        """
+        Add an observation.
+
+        Args:
+            value: Observed value (price or rate), tracked for first/last/high/low
+            weight: Amount added to the window total (volume, or the value itself for averages)
+            timestamp: Unix timestamp of the observation
+        """
+        bucket = int(timestamp // self.bucket_seconds)
+        if self.buckets and bucket < self.buckets[-1][0]:
+            bucket = self.buckets[-1][0]  # Late observations count towards the current bucket
+        if self.buckets and self.buckets[-1][0] == bucket:
+            index, first, bucket_total, bucket_count = self.buckets[-1]
+            self.buckets[-1] = (index, first, bucket_total + weight, bucket_count + 1)
+        else:
+            self.buckets.append((bucket, value, weight, 1))
+        self.total += weight
+        self.count += 1
+
+        while self.maxima and self.maxima[-1][1] <= value:
+            self.maxima.pop()
+        self.maxima.append((bucket, value))
+        while self.minima and self.minima[-1][1] >= value:
+            self.minima.pop()
+        self.minima.append((bucket, value))
+
+        self.last = value
+        self.last_timestamp = timestamp
+        self.expire(timestamp)
+
+    def expire(self, now: float) -> None:
+        """Drop buckets that have slid out of the window."""
+        oldest = int(now // self.bucket_seconds) - self.window_buckets + 1
+        while self.buckets and self.buckets[0][0] < oldest:
+            _, _, bucket_total, bucket_count = self.buckets.popleft()
+            self.total -= bucket_total
+            self.count -= bucket_count
+        while self.maxima and self.maxima[0][0] < oldest:
+            self.maxima.popleft()
+        while self.minima and self.minima[0][0] < oldest:
+            self.minima.popleft()
+
+    @property
+    def first(self) -> Optional[float]:
+        return self.buckets[0][1] if self.buckets else None
+
+    @property
+    def high(self) -> Optional[float]:
+        return self.maxima[0][1] if self.maxima else None
+
+    @property
+    def low(self) -> Optional[float]:
+        return self.minima[0][1] if self.minima else None
+
+class MarketStats:
+    """Rolling 24h price and funding-rate statistics per symbol, maintained as data is ingested."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._prices: Dict[str, RollingWindow] = {}
+        self._funding: Dict[str, RollingWindow] = {}
+
+    def update_tick(self, symbol: str, price: float, volume: float, timestamp: Optional[float] = None) -> None:
+        """Record a price tick."""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            window = self._prices.get(symbol)
+            if window is None:
+                window = self._prices[symbol] = RollingWindow()
+            window.add(price, volume, timestamp)
+
+    def update_funding(self, symbol: str, rate: float, timestamp: Optional[float] = None) -> None:
+        """Record a funding-rate observation."""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            window = self._funding.get(symbol)
+            if window is None:
+                window = self._funding[symbol] = RollingWindow()
+            window.add(rate, rate, timestamp)
+
+    def on_ingested(self, topic: str, data: Dict[str, Any]) -> None:
+        """`DataIngestor` listener: fold ticks and funding rates into the windows as they arrive."""
+        if topic not in ("ticks", "funding"):
+            return
+        timestamp = datetime.fromisoformat(data["timestamp"]).timestamp() if data.get("timestamp") else None
+        if topic == "ticks":
+            self.update_tick(data["symbol"], data["price"], data.get("volume") or 0.0, timestamp)
+        else:
+            self.update_funding(data["symbol"], data["funding_rate"], timestamp)
+
+    def _resolve(self, windows: Dict[str, RollingWindow], symbol: str) -> Optional[RollingWindow]:
+        # Accept base assets ("BTC") as well as exchange pairs ("BTCUSDT")
+        return windows.get(symbol) or windows.get(f"{symbol}USDT")
+
+    def price_stats(self, symbol: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Return the current 24h price statistics for a symbol in O(1).
+
+        Args:
+            symbol: Trading symbol or base asset
+            now: Reference time (default: current time)
+
+        Returns:
+            Dictionary with price, change_24h (percent), volume_24h, high_24h and
+            low_24h, or None if no ticks are in the window
+        """
+        with self._lock:
+            window = self._resolve(self._prices, symbol)
+            if window is None:
+                return None
+            window.expire(time.time() if now is None else now)
+            if not window.count:
+                return None
+            first = window.first
+            return {
+                "symbol": symbol,
+                "price": window.last,
+                "change_24h": (window.last - first) / first * 100 if first else 0.0,
+                "volume_24h": window.total,
+                "high_24h": window.high,
+                "low_24h": window.low,
+                "ticks_24h": window.count,
+                "updated_at": datetime.fromtimestamp(window.last_timestamp).isoformat()
+            }
+
+    def funding_stats(self, symbol: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Return the current 24h funding-rate statistics for a symbol in O(1).
+
+        Args:
+            symbol: Trading symbol or base asset
+            now: Reference time (default: current time)
+
+        Returns:
+            Dictionary with the latest funding_rate and its 24h average, high and
+            low, or None if no rates are in the window
+        """
+        with self._lock:
+            window = self._resolve(self._funding, symbol)
+            if window is None:
+                return None
+            window.expire(time.time() if now is None else now)
+            if not window.count:
+                return None
+            return {
+                "symbol": symbol,
+                "funding_rate": window.last,
+                "average_24h": window.total / window.count,
+                "high_24h": window.high,
+                "low_24h": window.low,
+                "updated_at": datetime.fromtimestamp(window.last_timestamp).isoformat()
+            }
+
+    def symbols(self) -> List[str]:
+        with self._lock:
+            return sorted(self._prices)
+
+    def load_from_db(self, db_path: str, now: Optional[float] = None) -> int:
+        """
+        Warm the windows from the last 24h of stored ticks and funding rates (once, at startup).
+
+        Args:
+            db_path: Path to the SQLite market database
+            now: Reference time (default: current time)
+
+        Returns:
+            Number of rows loaded
+        """
+        now = time.time() if now is None else now
+        conn = sqlite3.connect(db_path)
+        try:
+            loaded = 0
+            queries = (
+                ("SELECT symbol, price, volume, strftime('%s', timestamp) FROM exchange_data "
+                 "WHERE timestamp >= datetime(?, 'unixepoch') ORDER BY timestamp", self.update_tick),
+                ("SELECT symbol, rate, strftime('%s', timestamp) FROM funding_rates "
+                 "WHERE timestamp >= datetime(?, 'unixepoch') ORDER BY timestamp", self.update_funding),
+            )
+            for query, update in queries:
+                try:
+                    rows = conn.execute(query, (now - WINDOW_SECONDS,)).fetchall()
+                except sqlite3.OperationalError:
+                    continue  # Table not created yet
+                for row in rows:
+                    *values, timestamp = row
+                    update(*values, timestamp=float(timestamp))
+                loaded += len(rows)
+            return loaded
+        finally:
+            conn.close()
+
+# Example usage
+if __name__ == "__main__":
+    import random
+
+    stats = MarketStats()
+    start = time.time() - 2 * WINDOW_SECONDS
+    price = 65000.0
+    ticks = 2 * 24 * 60 * 6  # Two days of ticks every 10 seconds
+    started = time.perf_counter()
+    for i in range(ticks):
+        price *= 1 + random.gauss(0, 0.0005)
+        stats.update_tick("BTCUSDT", price, 10.0, start + i * 10)
+        if i % 360 == 0:
+            stats.update_funding("BTCUSDT", random.uniform(-0.0002, 0.0003), start + i * 10)
+    elapsed = time.perf_counter() - started
+    print(f"{ticks} updates in {elapsed:.3f}s ({elapsed / ticks * 1e6:.2f} µs each)")
+
+    started = time.perf_counter()
+    for _ in range(10000):
+        stats.price_stats("BTC", now=start + ticks * 10)
+    print(f"price_stats read: {(time.perf_counter() - started) / 10000 * 1e6:.2f} µs")
+    print(stats.price_stats("BTC", now=start + ticks * 10))
+    print(stats.funding_stats("BTC", now=start + ticks * 10))
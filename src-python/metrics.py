@@ -0,0 +1,212 @@
+import bisect
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+# Latency buckets in seconds, from 100µs to 60s
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _format_labels(label_names: Tuple[str, ...], label_values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+# Metrics are updated from the event loop and from executor threads; `+=` is a
+# read-modify-write, so every metric guards its values with its own lock.
+
+class Counter:
+    """Monotonically increasing value."""
+
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+class Gauge:
+    """Value that can go up and down."""
+
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+class Histogram:
+    """Bucketed distribution of observed values."""
+
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        """Return consistent copies of (bucket counts, sum, count)."""
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+    def time(self) -> "_Timer":
+        """Context manager that observes the elapsed wall time in seconds."""
+        return _Timer(self)
+
+class _Timer:
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self) -> "_Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.histogram.observe(time.perf_counter() - self.started)
+
+class MetricFamily:
+    """A named metric with optional labels; each label combination is one child metric."""
+
+    def __init__(self, kind: str, name: str, documentation: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        # Unlabelled families expose the child's methods directly
+        self._default = self.labels() if not label_names else None
+
+    def labels(self, *label_values: str) -> Any:
+        """Return the child metric for the given label values, creating it on first use."""
+        child = self._children.get(label_values)
+        if child is None:
+            if len(label_values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}")
+            with self._lock:
+                # Another thread may have created it while we waited for the lock
+                child = self._children.get(label_values)
+                if child is None:
+                    if self.kind == "counter":
+                        child = Counter()
+                    elif self.kind == "gauge":
+                        child = Gauge()
+                    else:
+                        child = Histogram(self.buckets)
+                    self._children[label_values] = child
+        return child
+
+    def __getattr__(self, attribute: str) -> Any:
+        default = self.__dict__.get("_default")
+        if default is None:
+            raise AttributeError(attribute)
+        return getattr(default, attribute)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for label_values, child in list(self._children.items()):
+            if self.kind == "histogram":
+                counts, total, observations = child.snapshot()
+                cumulative = 0
+                for bound, count in zip(self.bounds_with_inf(), counts):
+                    cumulative += count
+                    labels = _format_labels(self.label_names, label_values, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.label_names, label_values)
+                lines.append(f"{self.name}_sum{labels} {total}")
+                lines.append(f"{self.name}_count{labels} {observations}")
+            else:
+                lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {child.value}")
+        return lines
+
+    def bounds_with_inf(self) -> List[str]:
+        return [repr(bound) for bound in self.buckets] + ["+Inf"]
+
+class MetricsRegistry:
+    """Process-wide collection of metrics, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._families: Dict[str, MetricFamily] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, kind: str, name: str, documentation: str, label_names: Tuple[str, ...],
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> MetricFamily:
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = MetricFamily(kind, name, documentation, tuple(label_names), buckets)
+                self._families[name] = family
+        if family.kind != kind:
+            raise ValueError(f"Metric {name} is already registered as a {family.kind}")
+        return family
+
+    def counter(self, name: str, documentation: str, label_names: Tuple[str, ...] = ()) -> MetricFamily:
+        return self._register("counter", name, documentation, label_names)
+
+    def gauge(self, name: str, documentation: str, label_names: Tuple[str, ...] = ()) -> MetricFamily:
+        return self._register("gauge", name, documentation, label_names)
+
+    def histogram(self, name: str, documentation: str, label_names: Tuple[str, ...] = (),
+                  buckets: Optional[Tuple[float, ...]] = None) -> MetricFamily:
+        return self._register("histogram", name, documentation, label_names, buckets or DEFAULT_BUCKETS)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        for family in list(self._families.values()):
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+# Default registry shared by all engine modules
+REGISTRY = MetricsRegistry()
+
+# Example usage: per-observation overhead
+if __name__ == "__main__":
+    count = 1_000_000
+    latency = REGISTRY.histogram("example_latency_seconds", "Example latency", ("endpoint",))
+    requests = REGISTRY.counter("example_requests_total", "Example requests", ("endpoint",))
+    ping_latency = latency.labels("/ping")
+    ping_requests = requests.labels("/ping")
+
+    for label, observe in (
+        ("counter.inc", lambda: ping_requests.inc()),
+        ("histogram.observe", lambda: ping_latency.observe(0.003)),
+        ("labels().observe", lambda: latency.labels("/ping").observe(0.003)),
+    ):
+        started = time.perf_counter()
+        for _ in range(count):
+            observe()
+        elapsed = time.perf_counter() - started
+        print(f"{label:20s} {elapsed / count * 1e9:6.0f} ns per observation (including loop and lambda call)")
+
+    print(REGISTRY.render()[:400])
@@ -0,0 +1,155 @@
+import asyncio
+from typing import Dict, Any, List, Optional
+
+# Strategy name carried by residual signals that combine several strategies
+NETTED_STRATEGY = "netted"
+
+def netting_error(signal: Dict[str, Any]) -> Optional[str]:
+    """Return why a signal cannot be netted, or None if it can."""
+    if not signal.get("symbol"):
+        return "Signal has no symbol"
+    if signal.get("action") not in ("BUY", "SELL"):
+        return "Signal action must be BUY or SELL"
+    amount = signal.get("amount")
+    if isinstance(amount, bool) or not isinstance(amount, (int, float)) or amount <= 0:
+        return "Signal amount must be a positive number"
+    return None
+
+def net_signals(signals: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Net trade signals per symbol.
+
+    Opposite BUY and SELL amounts on the same symbol cross internally; only the
+    residual is left to be submitted. Every signal keeps an allocation entry so
+    fills can be split back to the strategy that produced it.
+
+    Args:
+        signals: Trade signals, each carrying its originating "strategy" name;
+            all must pass `netting_error`
+
+    Returns:
+        List of netted orders, one per symbol, with the residual "action" (None if
+        the symbol netted out completely), residual "amount" and "allocations"
+    """
+    by_symbol: Dict[str, List[Dict[str, Any]]] = {}
+    for signal in signals:
+        by_symbol.setdefault(signal["symbol"], []).append(signal)
+
+    orders = []
+    for symbol, symbol_signals in by_symbol.items():
+        bought = sum(s["amount"] for s in symbol_signals if s["action"] == "BUY")
+        sold = sum(s["amount"] for s in symbol_signals if s["action"] == "SELL")
+        crossed = min(bought, sold)
+
+        allocations = []
+        for signal in symbol_signals:
+            side_total = bought if signal["action"] == "BUY" else sold
+            # Each side's crossed volume is shared pro rata within that side
+            internal = signal["amount"] * crossed / side_total if side_total else 0.0
+            allocations.append({
+                "strategy": signal.get("strategy", "unknown"),
+                "action": signal["action"],
+                "amount": signal["amount"],
+                "internal_amount": internal,
+                "external_amount": signal["amount"] - internal,
+                "signal": signal
+            })
+
+        residual = bought - sold
+        prices = [s["price"] for s in symbol_signals if s.get("price") is not None]
+        orders.append({
+            "symbol": symbol,
+            "action": "BUY" if residual > 0 else "SELL" if residual < 0 else None,
+            "amount": abs(residual),
+            "crossed_amount": crossed,
+            "reference_price": sum(prices) / len(prices) if prices else None,
+            "allocations": allocations
+        })
+
+    return orders
+
+def split_fill(order: Dict[str, Any], filled_amount: float, price: Optional[float]) -> List[Dict[str, Any]]:
+    """
+    Split a fill of a netted order back into per-strategy fills.
+
+    Internally crossed volume is always filled; the residual fill is shared pro
+    rata among the signals on the residual side.
+
+    Args:
+        order: Netted order from `net_signals`
+        filled_amount: Amount of the residual that was filled
+        price: Fill price
+
+    Returns:
+        List of fill dictionaries, one per contributing signal
+    """
+    fill_ratio = filled_amount / order["amount"] if order["amount"] else 0.0
+    fills = []
+    for allocation in order["allocations"]:
+        amount = allocation["internal_amount"] + allocation["external_amount"] * fill_ratio
+        fills.append({
+            "strategy": allocation["strategy"],
+            "symbol": order["symbol"],
+            "action": allocation["action"],
+            "amount": amount,
+            "requested_amount": allocation["amount"],
+            "internal_amount": allocation["internal_amount"],
+            "price": price,
+            "netted": True
+        })
+    return fills
+
+class NettingWindow:
+    """Collects signals for a short window and executes them netted per symbol."""
+
+    def __init__(self, executor, window_seconds: float = 0.2):
+        """
+        Args:
+            executor: ExecutionEngine used to execute the residual intents
+            window_seconds: How long to collect signals before netting them
+        """
+        self.executor = executor
+        self.window_seconds = window_seconds
+        self._pending: List[Any] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, strategy_name: str, signal: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue a signal for the current netting window.
+
+        Args:
+            strategy_name: Name of the strategy that generated the signal
+            signal: Trade signal
+
+        Returns:
+            Execution result for this signal once its window has been executed
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((dict(signal, strategy=strategy_name), future))
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(
+                self.window_seconds, lambda: asyncio.ensure_future(self.flush())
+            )
+        return await future
+
+    async def flush(self) -> None:
+        """Net and execute every signal collected so far."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        try:
+            outcome = await self.executor.execute_netted([signal for signal, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(pending, outcome["results"]):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,187 @@
+from collections.abc import MutableMapping
+from typing import Dict, Any, Iterator, Optional
+
+class Record(MutableMapping):
+    """
+    Compact base class for hot-path records.
+
+    Fields live in `__slots__`, so a record carries no per-instance dict. To stay
+    compatible with strategies written against plain dicts, records are mutable
+    mappings: indexing, `get`, `in`, `keys`/`values`/`items`, `update`, `pop`,
+    `setdefault`, `del` and `dict(record)` all work. Unset fields (None) are
+    treated as missing keys, and keys that are not fields are kept in a lazily
+    created `extra` dict. Records are not `dict` instances: use `to_dict()` (or
+    `to_plain` as the `json.dumps` default) where a real dict is required.
+    """
+
+    __slots__ = ("extra",)
+    fields: tuple = ()
+    _field_set: frozenset = frozenset()
+
+    def __init__(self, **extra: Any):
+        self.extra: Optional[Dict[str, Any]] = extra or None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Record":
+        """Build a record from a dict; keys that are not fields go to `extra`."""
+        if isinstance(data, cls):
+            return data
+        return cls(**data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the record as a plain dict, omitting unset fields."""
+        return {key: self[key] for key in self.keys()}
+
+    def copy(self) -> "Record":
+        """Return a shallow copy of the record."""
+        clone = self.__class__.__new__(self.__class__)
+        for key in self.fields:
+            setattr(clone, key, getattr(self, key))
+        clone.extra = dict(self.extra) if self.extra else None
+        return clone
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._field_set:
+            value = getattr(self, key)
+            return default if value is None else value
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._field_set:
+            value = getattr(self, key)
+        else:
+            value = self.extra.get(key) if self.extra else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self._field_set:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._field_set:
+            if getattr(self, key) is None:
+                raise KeyError(key)
+            setattr(self, key, None)
+        elif self.extra and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self.fields:
+            if getattr(self, key) is not None:
+                yield key
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (Record, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.to_dict()!r})"
+
+def _record_class(name: str, fields: tuple, doc: str) -> type:
+    """Create a Record subclass whose fields are slots defaulting to None."""
+    # Generate a plain __init__ (as dataclasses does) so construction costs
+    # one attribute store per field instead of a generic loop
+    params = ", ".join(f"{field}=None" for field in fields)
+    body = "\n".join(f"    self.{field} = {field}" for field in fields)
+    namespace: Dict[str, Any] = {}
+    exec(f"def __init__(self, {params}, **extra):\n{body}\n    self.extra = extra or None\n", namespace)
+
+    return type(Record)(name, (Record,), {
+        "__slots__": fields,
+        "__doc__": doc,
+        "__init__": namespace["__init__"],
+        "fields": fields,
+        "_field_set": frozenset(fields),
+    })
+
+Tick = _record_class("Tick", (
+    "symbol", "price", "timestamp", "volume", "sma_short", "sma_long"
+), "Market data tick passed to `BaseStrategy.on_tick`.")
+
+Bar = _record_class("Bar", (
+    "symbol", "timestamp", "open", "high", "low", "close", "volume"
+), "OHLCV bar.")
+
+Signal = _record_class("Signal", (
+    "action", "symbol", "amount", "strategy", "price"
+), "Trade signal emitted by a strategy.")
+
+Intent = _record_class("Intent", (
+    "id", "timestamp", "action", "symbol", "amount", "strategy", "metadata", "signature", "public_key"
+), "Ark intent built from a signal, optionally signed.")
+
+def to_plain(value: Any) -> Any:
+    """`json.dumps` default hook that serializes records as dicts."""
+    if isinstance(value, Record):
+        return value.to_dict()
+    raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+
+# Example usage: memory and time per million ticks, dicts vs records
+if __name__ == "__main__":
+    import time
+    import tracemalloc
+
+    count = 1_000_000
+
+    def build_dicts():
+        return [
+            {"symbol": "BTC", "price": 65000.0 + i, "timestamp": "2023-01-01T00:00:00",
+             "sma_short": 64900.0 + i, "sma_long": 64800.0 + i}
+            for i in range(count)
+        ]
+
+    def build_ticks():
+        return [
+            Tick(symbol="BTC", price=65000.0 + i, timestamp="2023-01-01T00:00:00",
+                 sma_short=64900.0 + i, sma_long=64800.0 + i)
+            for i in range(count)
+        ]
+
+    def build_ticks_positional():
+        return [
+            Tick("BTC", 65000.0 + i, "2023-01-01T00:00:00", None, 64900.0 + i, 64800.0 + i)
+            for i in range(count)
+        ]
+
+    for label, build, read in (
+        ("dict", build_dicts, lambda t: t["price"] - t["sma_short"]),
+        ("Tick (mapping access)", build_ticks, lambda t: t["price"] - t["sma_short"]),
+        ("Tick (positional, attrs)", build_ticks_positional, lambda t: t.price - t.sma_short),
+    ):
+        tracemalloc.start()
+        ticks = build()
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del ticks
+
+        started = time.perf_counter()
+        ticks = build()
+        build_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        total = 0.0
+        for tick in ticks:
+            total += read(tick)
+        read_time = time.perf_counter() - started
+
+        print(f"{label:24s} {memory / 1e6:8.1f} MB  build {build_time:.2f}s  read {read_time:.2f}s per {count:,} ticks")
+        del ticks
@@ -0,0 +1,243 @@
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+from collections import deque
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+from base_strategy import BaseStrategy
+from benchmarks import percentile
+from execution_engine import ExecutionEngine
+from execution_journal import ExecutionJournal
+from records import Tick
+
+# Risk limits for replays: position size checks still apply, but the hourly
+# and daily caps count wall-clock time and would reject nearly every replayed signal
+REPLAY_RISK_LIMITS = {
+    "max_trades_per_hour": float("inf"),
+    "max_daily_loss": float("inf")
+}
+
+class MovingAverages:
+    """Incremental short/long simple moving averages per symbol."""
+
+    def __init__(self, short_window: int, long_window: int):
+        self.short_window = short_window
+        self.long_window = long_window
+        self._windows: Dict[str, Tuple[deque, List[float]]] = {}
+
+    def update(self, symbol: str, price: float) -> Tuple[float, float]:
+        """Add a price and return the (short, long) averages; short histories average what they have."""
+        entry = self._windows.get(symbol)
+        if entry is None:
+            entry = self._windows[symbol] = (deque(), [0.0, 0.0])
+        prices, sums = entry
+        prices.append(price)
+        sums[0] += price
+        sums[1] += price
+        if len(prices) > self.short_window:
+            sums[0] -= prices[-self.short_window - 1]
+        if len(prices) > self.long_window:
+            sums[1] -= prices.popleft()
+        return sums[0] / min(len(prices), self.short_window), sums[1] / len(prices)
+
+class HistoricalReplay:
+    """
+    Streams recorded ticks from market_data.db through the live execution path.
+
+    Each tick goes to `ExecutionEngine.process_strategy_signals`, so strategy
+    dispatch, risk checks, intent construction, journaling, signing and
+    submission all run as they do live; only the signer and gateway are
+    local stand-ins.
+    """
+
+    def __init__(self, db_path: str = "market_data.db", strategies: Optional[List[BaseStrategy]] = None,
+                 speed: Optional[float] = None, journal_path: Optional[str] = None,
+                 sign_latency: float = 0.0, submit_latency: float = 0.0,
+                 risk_limits: Optional[Dict[str, Any]] = None, dedup_window_seconds: float = 0.0):
+        """
+        Args:
+            db_path: SQLite database with recorded exchange_data ticks
+            strategies: Strategies to activate (default: SimpleMAStrategy)
+            speed: Replay speed relative to recorded time (1.0 is real time,
+                10.0 is ten times faster); None replays as fast as possible
+            journal_path: Execution journal to write (default: a scratch file, so
+                the journal's fsyncs are part of the measurement)
+            sign_latency: Seconds the stand-in signer takes per batch
+            submit_latency: Seconds the stand-in gateway takes per intent
+            risk_limits: Overrides for the engine's risk limits (default: REPLAY_RISK_LIMITS)
+            dedup_window_seconds: Identical-signal suppression window; off by default
+                because replayed strategies repeat signals far faster than live
+        """
+        if strategies is None:
+            from base_strategy import SimpleMAStrategy
+            strategies = [SimpleMAStrategy()]
+        self.db_path = db_path
+        self.speed = speed
+        self.sign_latency = sign_latency
+        self.submit_latency = submit_latency
+        if journal_path is None:
+            journal_path = os.path.join(tempfile.mkdtemp(prefix="noah-replay-"), "execution_journal.log")
+        self.journal = ExecutionJournal(journal_path)
+        self.engine = ExecutionEngine(signer=self._sign, gateway=self._submit, journal=self.journal,
+                                      dedup_window_seconds=dedup_window_seconds,
+                                      dedup_by_content=dedup_window_seconds > 0)
+        self.engine.risk_limits.update(REPLAY_RISK_LIMITS if risk_limits is None else risk_limits)
+        for strategy in strategies:
+            strategy.activate()
+            self.engine.register_strategy(strategy)
+        parameters = strategies[0].parameters if strategies else {}
+        self.averages = MovingAverages(int(parameters.get("short_window", 50)), int(parameters.get("long_window", 200)))
+
+    def _sign(self, intents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if self.sign_latency:
+            time.sleep(self.sign_latency)
+        return [dict(intent, signature="replay_signature", public_key="replay_public_key") for intent in intents]
+
+    def _submit(self, signed_intent: Dict[str, Any]) -> Dict[str, Any]:
+        if self.submit_latency:
+            time.sleep(self.submit_latency)
+        return {
+            "success": True,
+            "intent_id": signed_intent["id"],
+            "submission_id": str(uuid.uuid4()),
+            "message": "Intent submitted successfully"
+        }
+
+    def read_ticks(self, symbol: Optional[str] = None, start: Optional[str] = None, end: Optional[str] = None,
+                   limit: Optional[int] = None, chunk_size: int = 5000) -> Iterator[Tuple[float, Tick]]:
+        """
+        Stream recorded ticks in time order without loading them all.
+
+        Args:
+            symbol: Only replay this symbol
+            start: Earliest timestamp (inclusive, as stored)
+            end: Latest timestamp (exclusive, as stored)
+            limit: Maximum number of ticks
+            chunk_size: Rows fetched per database round trip
+
+        Yields:
+            (recorded Unix time, Tick) pairs with moving averages filled in
+        """
+        conditions, params = [], []
+        if symbol:
+            conditions.append("symbol = ?")
+            params.append(symbol)
+        if start:
+            conditions.append("timestamp >= ?")
+            params.append(start)
+        if end:
+            conditions.append("timestamp < ?")
+            params.append(end)
+        query = ("SELECT (julianday(timestamp) - 2440587.5) * 86400.0, timestamp, symbol, price, volume "
+                 "FROM exchange_data")
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY timestamp, id"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                for recorded_at, timestamp, row_symbol, price, volume in rows:
+                    sma_short, sma_long = self.averages.update(row_symbol, price)
+                    yield recorded_at, Tick(row_symbol, price, timestamp, volume, sma_short, sma_long)
+        finally:
+            conn.close()
+
+    def run(self, symbol: Optional[str] = None, start: Optional[str] = None, end: Optional[str] = None,
+            limit: Optional[int] = None, min_signals_per_second: Optional[float] = None,
+            max_p99_ms: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Replay recorded ticks and measure the execution path.
+
+        Args:
+            symbol: Only replay this symbol
+            start: Earliest timestamp (inclusive, as stored)
+            end: Latest timestamp (exclusive, as stored)
+            limit: Maximum number of ticks
+            min_signals_per_second: Sustained throughput below which the run fails
+            max_p99_ms: p99 tick-to-result latency above which the run fails
+
+        Returns:
+            Dictionary with tick and signal counts, sustained ticks/s and
+            signals/s, tick-to-result latency percentiles (ms) for ticks that
+            produced signals, how far pacing fell behind, and whether the
+            thresholds were met
+        """
+        ticks = 0
+        signals = 0
+        submitted = 0
+        latencies: List[float] = []
+        max_lag = 0.0
+        first_recorded = None
+        started = time.perf_counter()
+
+        for recorded_at, tick in self.read_ticks(symbol, start, end, limit):
+            if self.speed:
+                # Hold each tick until its recorded offset (scaled) has elapsed
+                if first_recorded is None:
+                    first_recorded = recorded_at
+                due = started + (recorded_at - first_recorded) / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    max_lag = max(max_lag, -delay)
+
+            dispatched = time.perf_counter()
+            results = self.engine.process_strategy_signals(tick)
+            ticks += 1
+            if results:
+                latencies.append((time.perf_counter() - dispatched) * 1000)
+                signals += len(results)
+                submitted += sum(1 for result in results if result.get("success"))
+
+        elapsed = time.perf_counter() - started
+        self.journal.flush()
+        signals_per_second = signals / elapsed if elapsed else 0.0
+        p99 = percentile(latencies, 99)
+        passed = True
+        if min_signals_per_second is not None and signals_per_second < min_signals_per_second:
+            passed = False
+        if max_p99_ms is not None and p99 > max_p99_ms:
+            passed = False
+        return {
+            "speed": self.speed or "max",
+            "ticks": ticks,
+            "signals": signals,
+            "submitted": submitted,
+            "elapsed_seconds": elapsed,
+            "ticks_per_second": ticks / elapsed if elapsed else 0.0,
+            "signals_per_second": signals_per_second,
+            "latency_p50_ms": percentile(latencies, 50),
+            "latency_p99_ms": p99,
+            "latency_p999_ms": percentile(latencies, 99.9),
+            "latency_max_ms": max(latencies, default=0.0),
+            "max_pacing_lag_seconds": max_lag,
+            "min_signals_per_second": min_signals_per_second,
+            "max_p99_ms": max_p99_ms,
+            "passed": passed
+        }
+
+    def close(self) -> None:
+        self.journal.close()
+
+# Example usage: python replay.py [db_path] [speed|max] [symbol]
+if __name__ == "__main__":
+    import json
+    import sys
+
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "market_data.db"
+    speed = None if len(sys.argv) <= 2 or sys.argv[2] == "max" else float(sys.argv[2])
+    symbol = sys.argv[3] if len(sys.argv) > 3 else None
+    replay = HistoricalReplay(db_path, speed=speed)
+    try:
+        print(json.dumps(replay.run(symbol=symbol), indent=2))
+    finally:
+        replay.close()
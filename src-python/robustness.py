@@ -0,0 +1,366 @@
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple, Union
+import numpy as np
+from backtester import Backtester
+from base_strategy import BaseStrategy, load_strategy_from_file
+
+SUMMARY_FIELDS = ("total_return", "max_drawdown", "sharpe_ratio", "total_trades")
+METRICS = ("total_return", "max_drawdown", "sharpe_ratio")
+# Objectives where lower is better; the rest are maximized
+MINIMIZED_FIELDS = ("max_drawdown",)
+# Upper bound on parameter combinations per walk-forward; each window backtests all of them
+MAX_CANDIDATES = 1000
+
+# Upper bound on resamples x path length per chunk, so a chunk's working
+# arrays stay around 16 MB each however long the path is
+CHUNK_ELEMENTS = 2_000_000
+
+# A strategy class, or the file a strategy was loaded from with load_strategy_from_file
+StrategySource = Union[type, str]
+
+def strategy_source(strategy: BaseStrategy) -> StrategySource:
+    """Return what a worker process needs to rebuild `strategy`."""
+    cls = type(strategy)
+    if cls.__module__ == "strategy_module":
+        # Loaded from a file: the module is not importable by name in other processes
+        return sys.modules[cls.__module__].__file__
+    return cls
+
+def make_strategy(source: StrategySource, parameters: Dict[str, Any]) -> BaseStrategy:
+    """Build a strategy from its source with the given parameters."""
+    strategy = load_strategy_from_file(source) if isinstance(source, str) else source()
+    strategy.set_parameters(dict(parameters))
+    return strategy
+
+def trade_pnls(trades: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Realized profit of each sell in a backtest's trade list, against the
+    average cost of the position it reduces.
+    """
+    holdings: Dict[str, Tuple[float, float]] = {}  # symbol -> (amount, cost)
+    pnls = []
+    for trade in trades:
+        amount, cost = holdings.get(trade['symbol'], (0.0, 0.0))
+        if trade['action'] == 'BUY':
+            holdings[trade['symbol']] = (amount + trade['amount'], cost + trade['cost'])
+        elif amount > 0:
+            sold_cost = cost * trade['amount'] / amount
+            pnls.append(trade['revenue'] - sold_cost)
+            holdings[trade['symbol']] = (amount - trade['amount'], cost - sold_cost)
+    return np.array(pnls, dtype=np.float64)
+
+def _backtest_job(db_path: str, source: StrategySource, parameters: Dict[str, Any], symbol: str,
+                  start: datetime, end: datetime, keep_paths: bool) -> Dict[str, Any]:
+    """Run one backtest (in a worker process) and return its summary, optionally with returns and trade P&L."""
+    results = Backtester(db_path).run_backtest(make_strategy(source, parameters), symbol, start, end)
+    summary = {name: results[name] for name in SUMMARY_FIELDS}
+    if keep_paths:
+        values = np.fromiter((point['portfolio_value'] for point in results['portfolio_history']),
+                             dtype=np.float64, count=len(results['portfolio_history']))
+        previous = np.concatenate(([results['initial_value']], values[:-1]))
+        summary['returns'] = values / previous - 1
+        summary['trade_pnls'] = trade_pnls(results['trades'])
+    return summary
+
+def _path_metrics(equity: np.ndarray, initial_value: float) -> np.ndarray:
+    """
+    Total return, max drawdown and Sharpe ratio of each row of an equity matrix.
+
+    Sharpe is the per-period mean return over its standard deviation, as in
+    `Backtester.run_backtest`.
+
+    Returns:
+        Array of shape (3, rows) in METRICS order
+    """
+    previous = np.concatenate((np.full((len(equity), 1), initial_value), equity[:, :-1]), axis=1)
+    returns = equity / previous - 1
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), initial_value)
+    drawdown = ((peak - equity) / peak).max(axis=1)
+    std = returns.std(axis=1)
+    sharpe = np.divide(returns.mean(axis=1), std, out=np.zeros_like(std), where=std > 0)
+    return np.stack((equity[:, -1] / initial_value - 1, drawdown, sharpe))
+
+def _resample_trades(pnls: np.ndarray, initial_value: float, count: int,
+                     seed: np.random.SeedSequence) -> np.ndarray:
+    """Bootstrap `count` trade sequences: trades drawn with replacement, P&L added to the initial value."""
+    rng = np.random.default_rng(seed)
+    picks = pnls[rng.integers(0, len(pnls), size=(count, len(pnls)))]
+    return _path_metrics(initial_value + np.cumsum(picks, axis=1), initial_value)
+
+def _resample_blocks(returns: np.ndarray, block_size: int, count: int,
+                     seed: np.random.SeedSequence) -> np.ndarray:
+    """Circular block bootstrap of `count` return paths, keeping autocorrelation within blocks."""
+    rng = np.random.default_rng(seed)
+    length = len(returns)
+    blocks = -(-length // block_size)
+    starts = rng.integers(0, length, size=(count, blocks, 1))
+    index = ((starts + np.arange(block_size)) % length).reshape(count, -1)[:, :length]
+    return _path_metrics(np.cumprod(1 + returns[index], axis=1), 1.0)
+
+def _summarize(samples: np.ndarray, confidence: float) -> Dict[str, Any]:
+    """Mean, median and confidence interval of each metric across resamples."""
+    tail = (1 - confidence) / 2 * 100
+    summary: Dict[str, Any] = {}
+    for name, values in zip(METRICS, samples):
+        lower, median, upper = np.percentile(values, [tail, 50, 100 - tail])
+        summary[name] = {
+            "mean": float(values.mean()),
+            "median": float(median),
+            "lower": float(lower),
+            "upper": float(upper)
+        }
+    summary["probability_of_loss"] = float((samples[0] < 0).mean())
+    return summary
+
+def _check_resampling(resamples: int, block_size: int) -> None:
+    if resamples < 1 or block_size < 1:
+        raise ValueError("resamples and block_size must be at least 1")
+
+class RobustnessAnalyzer:
+    """
+    Walk-forward analysis and Monte Carlo resampling of backtests.
+
+    Backtests and resampling chunks run on a pool of worker processes, one per
+    core by default. Each worker keeps its own history cache, so rolling
+    windows handled by the same worker reuse loaded bars.
+    """
+
+    def __init__(self, db_path: str = "market_data.db", workers: Optional[int] = None):
+        """
+        Args:
+            db_path: Database the backtests read
+            workers: Worker processes (default: one per core); 1 runs everything in this process
+        """
+        self.db_path = db_path
+        self.workers = workers or os.cpu_count() or 1
+        self._executor: Optional[Executor] = None
+
+    def _pool(self) -> Optional[Executor]:
+        if self.workers <= 1:
+            return None
+        if self._executor is None:
+            # Spawned rather than forked: the engine forks from a threaded process.
+            # Spawned workers re-import the launching script as __mp_main__, so
+            # the engine keeps side effects such as publishing its token out of
+            # module level (see engine.startup_event).
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def _map(self, function, calls: List[tuple]) -> List[Any]:
+        pool = self._pool()
+        if pool is None:
+            return [function(*args) for args in calls]
+        return [future.result() for future in [pool.submit(function, *args) for args in calls]]
+
+    def walk_forward(self, strategy: BaseStrategy, symbol: str, start: datetime, end: datetime,
+                     parameter_grid: Optional[Dict[str, List[Any]]] = None, in_sample_days: float = 14,
+                     out_of_sample_days: float = 7, objective: str = "sharpe_ratio") -> Dict[str, Any]:
+        """
+        Rolling walk-forward analysis.
+
+        Each window optimizes the parameters over its in-sample period, then
+        evaluates the winner on the following out-of-sample period. Windows
+        advance by the out-of-sample length, so out-of-sample periods tile the range.
+
+        Args:
+            strategy: Strategy to analyze; its current parameters are the defaults
+            symbol: Trading symbol
+            start: Start of the first in-sample period
+            end: End of the analyzed range
+            parameter_grid: Candidate values per parameter; every combination is tried
+            in_sample_days: Length of each optimization period
+            out_of_sample_days: Length of each evaluation period
+            objective: Backtest metric to optimize in-sample; max_drawdown is
+                minimized, the others maximized
+
+        Returns:
+            Dictionary with each window's chosen parameters and in/out-of-sample
+            metrics, the stitched out-of-sample metrics, and walk-forward
+            efficiency (mean out-of-sample over mean in-sample return)
+        """
+        report, _, _ = self._walk_forward(strategy, symbol, start, end, parameter_grid,
+                                          in_sample_days, out_of_sample_days, objective)
+        return report
+
+    def _walk_forward(self, strategy: BaseStrategy, symbol: str, start: datetime, end: datetime,
+                      parameter_grid: Optional[Dict[str, List[Any]]], in_sample_days: float,
+                      out_of_sample_days: float, objective: str) -> Tuple[Dict[str, Any], np.ndarray, np.ndarray]:
+        if objective not in SUMMARY_FIELDS:
+            raise ValueError(f"objective must be one of {', '.join(SUMMARY_FIELDS)}")
+        if in_sample_days <= 0 or out_of_sample_days <= 0:
+            raise ValueError("in_sample_days and out_of_sample_days must be positive")
+        names = list(parameter_grid or {})
+        combinations = 1
+        for name in names:
+            combinations *= len(parameter_grid[name])
+        if combinations > MAX_CANDIDATES:
+            raise ValueError(f"Parameter grid has {combinations} combinations, more than {MAX_CANDIDATES}")
+        source = strategy_source(strategy)
+        candidates = [dict(strategy.parameters, **dict(zip(names, values)))
+                      for values in itertools.product(*(parameter_grid[name] for name in names))]
+
+        in_sample, out_of_sample = timedelta(days=in_sample_days), timedelta(days=out_of_sample_days)
+        windows = []
+        window_start = start
+        while window_start + in_sample + out_of_sample <= end:
+            windows.append((window_start, window_start + in_sample, window_start + in_sample + out_of_sample))
+            window_start += out_of_sample
+        if not windows:
+            raise ValueError("Range is shorter than one in-sample plus out-of-sample period")
+
+        # Backtest ends are inclusive; stop one second early so periods do not share a bar
+        second = timedelta(seconds=1)
+        scores = self._map(_backtest_job, [
+            (self.db_path, source, parameters, symbol, first, split - second, False)
+            for first, split, _ in windows for parameters in candidates
+        ])
+        direction = -1 if objective in MINIMIZED_FIELDS else 1
+        chosen = []
+        for index in range(len(windows)):
+            window_scores = scores[index * len(candidates):(index + 1) * len(candidates)]
+            best = max(range(len(candidates)), key=lambda i: direction * window_scores[i][objective])
+            chosen.append((candidates[best], window_scores[best]))
+        evaluations = self._map(_backtest_job, [
+            (self.db_path, source, parameters, symbol, split, last - second, True)
+            for (_, split, last), (parameters, _) in zip(windows, chosen)
+        ])
+
+        returns = np.concatenate([evaluation.pop('returns') for evaluation in evaluations])
+        pnls = np.concatenate([evaluation.pop('trade_pnls') for evaluation in evaluations])
+        stitched = _path_metrics(np.cumprod(1 + returns)[None, :], 1.0)[:, 0] if len(returns) else np.zeros(3)
+        mean_in_sample = float(np.mean([score['total_return'] for _, score in chosen]))
+        mean_out_of_sample = float(np.mean([evaluation['total_return'] for evaluation in evaluations]))
+        report = {
+            "objective": objective,
+            "candidates": len(candidates),
+            "windows": [
+                {
+                    "in_sample_start": first.isoformat(),
+                    "out_of_sample_start": split.isoformat(),
+                    "out_of_sample_end": last.isoformat(),
+                    "parameters": {name: parameters[name] for name in names},
+                    "in_sample": score,
+                    "out_of_sample": evaluation
+                }
+                for (first, split, last), (parameters, score), evaluation in zip(windows, chosen, evaluations)
+            ],
+            # Fills, as in each window's backtest; closed_trades are the sells with realized P&L
+            "out_of_sample": dict(zip(METRICS, stitched.tolist()),
+                                  total_trades=sum(evaluation['total_trades'] for evaluation in evaluations),
+                                  closed_trades=len(pnls)),
+            "efficiency": mean_out_of_sample / mean_in_sample if mean_in_sample else None
+        }
+        return report, returns, pnls
+
+    def monte_carlo(self, returns: Optional[np.ndarray] = None, pnls: Optional[np.ndarray] = None,
+                    resamples: int = 1000, block_size: int = 60, initial_value: float = 100000.0,
+                    confidence: float = 0.95, seed: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Confidence intervals on return, drawdown and Sharpe from resampling.
+
+        Trade bootstrap redraws the sequence of realized trade P&L with
+        replacement; block bootstrap rebuilds the per-bar return path from
+        randomly placed blocks of consecutive returns. Resamples are computed
+        as matrices in chunks spread over the worker processes; the same seed
+        gives the same result with any number of workers.
+
+        Args:
+            returns: Per-bar portfolio returns to block-bootstrap
+            pnls: Realized P&L per trade to bootstrap
+            resamples: Number of resampled paths per method
+            block_size: Bars per block
+            initial_value: Capital the trade P&L is measured against
+            confidence: Width of the reported intervals
+            seed: Random seed
+
+        Returns:
+            Dictionary with per-metric mean, median and interval, and the
+            probability of a loss, for each method that had enough data
+        """
+        _check_resampling(resamples, block_size)
+        trade_seed, block_seed = np.random.SeedSequence(seed).spawn(2)
+        report: Dict[str, Any] = {"resamples": resamples, "confidence": confidence,
+                                  "trade_bootstrap": None, "block_bootstrap": None}
+        if pnls is not None and len(pnls) >= 2:
+            report["trade_bootstrap"] = self._resample(_resample_trades, (np.asarray(pnls, dtype=np.float64), initial_value),
+                                                       len(pnls), resamples, trade_seed, confidence)
+        if returns is not None and len(returns) >= 2:
+            block_size = max(1, min(block_size, len(returns)))
+            report["block_bootstrap"] = self._resample(_resample_blocks, (np.asarray(returns, dtype=np.float64), block_size),
+                                                       len(returns), resamples, block_seed, confidence)
+            report["block_bootstrap"]["block_size"] = block_size
+        return report
+
+    def _resample(self, function, data: tuple, length: int, resamples: int,
+                  seed: np.random.SeedSequence, confidence: float) -> Dict[str, Any]:
+        chunk = max(1, CHUNK_ELEMENTS // length)
+        counts = [min(chunk, resamples - offset) for offset in range(0, resamples, chunk)]
+        calls = [data + (count, chunk_seed) for count, chunk_seed in zip(counts, seed.spawn(len(counts)))]
+        return _summarize(np.concatenate(self._map(function, calls), axis=1), confidence)
+
+    def report(self, strategy: BaseStrategy, symbol: str, start: datetime, end: datetime,
+               parameter_grid: Optional[Dict[str, List[Any]]] = None, in_sample_days: float = 14,
+               out_of_sample_days: float = 7, objective: str = "sharpe_ratio", resamples: int = 1000,
+               block_size: int = 60, confidence: float = 0.95, seed: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Full robustness report: walk-forward analysis, then Monte Carlo
+        resampling of the stitched out-of-sample returns and trades.
+
+        Args:
+            See `walk_forward` and `monte_carlo`
+
+        Returns:
+            Dictionary with the walk-forward and Monte Carlo reports and the elapsed time
+        """
+        _check_resampling(resamples, block_size)  # Before the backtests, not after
+        started = time.perf_counter()
+        walk_forward, returns, pnls = self._walk_forward(strategy, symbol, start, end, parameter_grid,
+                                                         in_sample_days, out_of_sample_days, objective)
+        monte_carlo = self.monte_carlo(returns, pnls, resamples=resamples, block_size=block_size,
+                                       confidence=confidence, seed=seed)
+        return {
+            "strategy_name": strategy.name,
+            "symbol": symbol,
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "walk_forward": walk_forward,
+            "monte_carlo": monte_carlo,
+            "elapsed_seconds": time.perf_counter() - started
+        }
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+# Example usage
+if __name__ == "__main__":
+    import json
+    from base_strategy import SimpleMAStrategy
+
+    analyzer = RobustnessAnalyzer()
+    try:
+        report = analyzer.report(
+            SimpleMAStrategy(),
+            "BTC",
+            datetime(2023, 1, 1),
+            datetime(2023, 2, 1),
+            parameter_grid={"capital_allocation": [0.05, 0.1, 0.2]},
+            resamples=5000,
+            seed=7
+        )
+        for window in report["walk_forward"]["windows"]:
+            print(f"{window['out_of_sample_start']}: {window['parameters']} "
+                  f"in-sample {window['in_sample']['total_return']:.4%}, "
+                  f"out-of-sample {window['out_of_sample']['total_return']:.4%}")
+        print(json.dumps(report["monte_carlo"], indent=2))
+        print(f"Report finished in {report['elapsed_seconds']:.2f} s")
+    finally:
+        analyzer.close()
@@ -0,0 +1,82 @@
+import gzip
+import json
+from typing import Dict, Any, Tuple
+
+# Optional fast encoders; each falls back to the standard library when missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# Bodies smaller than this are sent uncompressed; compressing them costs more than it saves
+COMPRESSION_THRESHOLD = 16 * 1024
+
+def encode_json(payload: Any) -> bytes:
+    """Encode a payload as JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY, default=str)
+    return json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+
+def encode_msgpack(payload: Any) -> bytes:
+    """Encode a payload as MessagePack."""
+    return msgpack.packb(payload, default=str, use_bin_type=True)
+
+def _accepts(header: str, token: str) -> bool:
+    """Whether a comma-separated Accept/Accept-Encoding header lists a token with non-zero quality."""
+    for part in header.lower().split(","):
+        fields = [field.strip() for field in part.split(";")]
+        if fields[0] == token:
+            return not any(field.replace(" ", "") in ("q=0", "q=0.0") for field in fields[1:])
+    return False
+
+def negotiate_encoding(payload: Any, accept: str = "", accept_encoding: str = "",
+                       compression_threshold: int = COMPRESSION_THRESHOLD) -> Tuple[bytes, str, Dict[str, str]]:
+    """
+    Serialize and optionally compress a payload according to the request headers.
+
+    MessagePack is used when the client asks for it and msgpack is installed;
+    otherwise JSON. Bodies above the threshold are compressed with zstd or
+    gzip if the client accepts it.
+
+    Args:
+        payload: JSON-compatible payload
+        accept: Value of the request's Accept header
+        accept_encoding: Value of the request's Accept-Encoding header
+        compression_threshold: Minimum body size in bytes to compress
+
+    Returns:
+        Tuple of (body, media type, extra response headers)
+    """
+    accept = accept or ""
+    accept_encoding = accept_encoding or ""
+    headers = {"Vary": "Accept, Accept-Encoding"}
+
+    media_type = next((m for m in MSGPACK_MEDIA_TYPES if msgpack is not None and _accepts(accept, m)), None)
+    if media_type is not None:
+        body = encode_msgpack(payload)
+    else:
+        media_type = JSON_MEDIA_TYPE
+        body = encode_json(payload)
+
+    if len(body) >= compression_threshold:
+        if zstandard is not None and _accepts(accept_encoding, "zstd"):
+            body = zstandard.ZstdCompressor(level=3).compress(body)
+            headers["Content-Encoding"] = "zstd"
+        elif _accepts(accept_encoding, "gzip"):
+            body = gzip.compress(body, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+
+    return body, media_type, headers
@@ -0,0 +1,357 @@
+import threading
+import time
+import tracemalloc
+from typing import Dict, Any, List, Optional
+from base_strategy import BaseStrategy
+from metrics import REGISTRY, Histogram
+
+# Strategy callbacks that can be profiled
+CALLBACKS = ("on_tick", "on_order_fill", "on_arbitrage")
+
+# Strategy callbacks are usually microseconds, far below the default latency buckets
+CALLBACK_BUCKETS = (0.000001, 0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+                    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+STRATEGY_CALLBACK_SECONDS = REGISTRY.histogram("noah_strategy_callback_seconds", "Wall time per profiled strategy callback",
+                                               ("strategy", "callback"), CALLBACK_BUCKETS)
+STRATEGY_CALLBACK_CPU_SECONDS = REGISTRY.histogram("noah_strategy_callback_cpu_seconds",
+                                                   "CPU time per profiled strategy callback",
+                                                   ("strategy", "callback"), CALLBACK_BUCKETS)
+STRATEGY_EXECUTION_SECONDS = REGISTRY.histogram("noah_strategy_execution_seconds",
+                                                "Time executing a profiled strategy's signals from one callback",
+                                                ("strategy",), CALLBACK_BUCKETS)
+
+# tracemalloc is process-wide, so only one call is traced at a time; calls
+# arriving meanwhile are just timed
+_allocation_lock = threading.Lock()
+
+def _histogram_summary(histogram: Histogram) -> Dict[str, Any]:
+    """Count, mean and approximate percentiles (bucket upper bounds) of a histogram."""
+    def quantile(q: float) -> Optional[float]:
+        if not histogram.count:
+            return None
+        rank = q * histogram.count
+        cumulative = 0
+        for bound, count in zip(histogram.bounds + (float("inf"),), histogram.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return float("inf")
+
+    return {
+        "count": histogram.count,
+        "total_seconds": histogram.sum,
+        "mean_seconds": histogram.sum / histogram.count if histogram.count else 0.0,
+        "p50_seconds": quantile(0.5),
+        "p99_seconds": quantile(0.99)
+    }
+
+class StrategyProfile:
+    """
+    Profiling data for one strategy.
+
+    Every call is timed (wall and CPU). One call in `allocation_sample_rate`
+    runs under tracemalloc and one in `hot_function_sample_rate` under
+    cProfile instead; sampled calls are slower, so they are left out of the
+    timing histograms.
+
+    The report is built from the profile's own histograms. Exported profiles
+    also feed the registry's histograms, which accumulate across profiles
+    of the same strategy name like any other exported metric.
+    """
+
+    def __init__(self, strategy: BaseStrategy, allocation_sample_rate: int, hot_function_sample_rate: int,
+                 export: bool = True):
+        self.strategy = strategy
+        self.name = strategy.name
+        self.allocation_sample_rate = allocation_sample_rate
+        self.hot_function_sample_rate = hot_function_sample_rate
+        self.wall = {callback: Histogram(CALLBACK_BUCKETS) for callback in CALLBACKS}
+        self.cpu = {callback: Histogram(CALLBACK_BUCKETS) for callback in CALLBACKS}
+        self.execution = Histogram(CALLBACK_BUCKETS)
+        if export:
+            self._exported_wall = {callback: STRATEGY_CALLBACK_SECONDS.labels(self.name, callback)
+                                   for callback in CALLBACKS}
+            self._exported_cpu = {callback: STRATEGY_CALLBACK_CPU_SECONDS.labels(self.name, callback)
+                                  for callback in CALLBACKS}
+            self._exported_execution = STRATEGY_EXECUTION_SECONDS.labels(self.name)
+        else:
+            self._exported_wall, self._exported_cpu, self._exported_execution = {}, {}, None
+        self.calls = 0
+        self.errors = 0
+        self.allocation_samples = 0
+        self.peak_bytes_total = 0
+        self.peak_bytes_max = 0
+        self.retained_bytes_total = 0
+        self.retained_blocks_total = 0
+        self.hot_samples = 0
+        self._profile = None  # cProfile.Profile, created with the first sample
+        self._profile_lock = threading.Lock()
+        self.enabled_at = time.time()
+
+    def wrap(self, callback: str, function):
+        """Return `function` instrumented as the given callback."""
+        wall = self.wall[callback]
+        cpu = self.cpu[callback]
+        exported_wall = self._exported_wall.get(callback)
+        exported_cpu = self._exported_cpu.get(callback)
+        perf_counter = time.perf_counter
+        thread_time = time.thread_time
+
+        def profiled(*args, **kwargs):
+            self.calls += 1
+            calls = self.calls
+            if self.allocation_sample_rate and calls % self.allocation_sample_rate == 0:
+                return self._sample_allocations(function, args, kwargs)
+            if self.hot_function_sample_rate and calls % self.hot_function_sample_rate == 0:
+                return self._sample_hot_functions(function, args, kwargs)
+            started = perf_counter()
+            cpu_started = thread_time()
+            try:
+                return function(*args, **kwargs)
+            except Exception:
+                self.errors += 1
+                raise
+            finally:
+                cpu_seconds = thread_time() - cpu_started
+                wall_seconds = perf_counter() - started
+                cpu.observe(cpu_seconds)
+                wall.observe(wall_seconds)
+                if exported_wall is not None:
+                    exported_cpu.observe(cpu_seconds)
+                    exported_wall.observe(wall_seconds)
+
+        profiled.__wrapped__ = function
+        return profiled
+
+    def observe_execution(self, seconds: float) -> None:
+        """Record the time spent executing the signals of one callback."""
+        self.execution.observe(seconds)
+        if self._exported_execution is not None:
+            self._exported_execution.observe(seconds)
+
+    def _sample_allocations(self, function, args, kwargs):
+        if not _allocation_lock.acquire(blocking=False):
+            return function(*args, **kwargs)
+        try:
+            # Trace only this call when nothing else is tracing, so the snapshot
+            # holds exactly the blocks it left allocated
+            owns_tracing = not tracemalloc.is_tracing()
+            if owns_tracing:
+                tracemalloc.start()
+            else:
+                tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            try:
+                return function(*args, **kwargs)
+            finally:
+                current, peak = tracemalloc.get_traced_memory()
+                if owns_tracing:
+                    self.retained_blocks_total += sum(stat.count for stat in
+                                                      tracemalloc.take_snapshot().statistics("filename"))
+                    tracemalloc.stop()
+                self.allocation_samples += 1
+                self.peak_bytes_total += peak - before
+                self.peak_bytes_max = max(self.peak_bytes_max, peak - before)
+                self.retained_bytes_total += current - before
+        finally:
+            _allocation_lock.release()
+
+    def _sample_hot_functions(self, function, args, kwargs):
+        if not self._profile_lock.acquire(blocking=False):
+            return function(*args, **kwargs)
+        try:
+            if self._profile is None:
+                import cProfile
+                self._profile = cProfile.Profile()
+            try:
+                self._profile.enable()
+            except ValueError:
+                # Another profiler is active on this thread
+                return function(*args, **kwargs)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._profile.disable()
+                self.hot_samples += 1
+        finally:
+            self._profile_lock.release()
+
+    def wall_seconds(self) -> float:
+        """Total timed wall seconds across callbacks."""
+        return sum(histogram.sum for histogram in self.wall.values())
+
+    def hot_functions(self, top: int = 10) -> List[Dict[str, Any]]:
+        """Functions with the most own time across sampled calls."""
+        import pstats
+        with self._profile_lock:
+            if not self.hot_samples:
+                return []
+            stats = pstats.Stats(self._profile).stats
+        entries = [
+            (key, value) for key, value in stats.items()
+            if "_lsprof" not in key[2]  # The profiler's own disable() call
+        ]
+        entries.sort(key=lambda entry: entry[1][2], reverse=True)
+        return [
+            {
+                "function": f"{filename}:{line}({name})",
+                "calls": total_calls,
+                "own_seconds": own_seconds,
+                "cumulative_seconds": cumulative_seconds
+            }
+            for (filename, line, name), (_, total_calls, own_seconds, cumulative_seconds, _) in entries[:top]
+        ]
+
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        samples = self.allocation_samples
+        return {
+            "strategy_name": self.name,
+            "enabled_at": self.enabled_at,
+            "calls": self.calls,
+            "errors": self.errors,
+            "wall": {callback: _histogram_summary(histogram) for callback, histogram in self.wall.items()
+                     if histogram.count},
+            "cpu": {callback: _histogram_summary(histogram) for callback, histogram in self.cpu.items()
+                    if histogram.count},
+            "execution": _histogram_summary(self.execution),
+            "allocations": {
+                "samples": samples,
+                "sample_rate": self.allocation_sample_rate,
+                "mean_peak_bytes": self.peak_bytes_total / samples if samples else 0.0,
+                "max_peak_bytes": self.peak_bytes_max,
+                "mean_retained_bytes": self.retained_bytes_total / samples if samples else 0.0,
+                "mean_retained_blocks": self.retained_blocks_total / samples if samples else 0.0
+            },
+            "hot_functions": {
+                "samples": self.hot_samples,
+                "sample_rate": self.hot_function_sample_rate,
+                "top": self.hot_functions(top)
+            }
+        }
+
+class StrategyProfiler:
+    """
+    Opt-in profiling of strategy callbacks, per strategy.
+
+    Enabling installs instrumented `on_tick`, `on_order_fill` and
+    `on_arbitrage` on the strategy instance, so the backtester, the execution
+    engine and the ingest listeners all go through them; disabling removes
+    them again. Strategies that are not profiled run their own methods
+    directly and pay nothing.
+    """
+
+    def __init__(self, allocation_sample_rate: int = 100, hot_function_sample_rate: int = 50):
+        """
+        Args:
+            allocation_sample_rate: Trace allocations for one call in this many (0 disables)
+            hot_function_sample_rate: Run one call in this many under cProfile (0 disables)
+        """
+        self.allocation_sample_rate = allocation_sample_rate
+        self.hot_function_sample_rate = hot_function_sample_rate
+        self._profiles: Dict[str, StrategyProfile] = {}
+        self._lock = threading.Lock()
+
+    def enable(self, strategy: BaseStrategy, allocation_sample_rate: Optional[int] = None,
+               hot_function_sample_rate: Optional[int] = None) -> StrategyProfile:
+        """
+        Start profiling a strategy (a no-op if it is already profiled).
+
+        Profiling a strategy again after `disable` continues its profile.
+
+        Args:
+            strategy: Strategy instance to instrument
+            allocation_sample_rate: Override of the profiler's allocation sampling rate
+            hot_function_sample_rate: Override of the profiler's hot function sampling rate
+
+        Returns:
+            The strategy's profile
+        """
+        with self._lock:
+            profile = self._profiles.get(strategy.name)
+            if profile is None or profile.strategy is not strategy:
+                profile = StrategyProfile(strategy, self.allocation_sample_rate, self.hot_function_sample_rate)
+            if allocation_sample_rate is not None:
+                profile.allocation_sample_rate = allocation_sample_rate
+            if hot_function_sample_rate is not None:
+                profile.hot_function_sample_rate = hot_function_sample_rate
+            if self.is_enabled(strategy):
+                return profile
+            for callback in CALLBACKS:
+                setattr(strategy, callback, profile.wrap(callback, getattr(strategy, callback)))
+            self._profiles[strategy.name] = profile
+            return profile
+
+    def detached(self, strategy: BaseStrategy) -> StrategyProfile:
+        """
+        Create a profile that is neither installed on the strategy nor registered.
+
+        The caller wraps the callbacks it invokes itself (see `StrategyProfile.wrap`),
+        so other callers of the strategy are not counted. Its timings are not
+        exported to the metrics registry.
+        """
+        return StrategyProfile(strategy, self.allocation_sample_rate, self.hot_function_sample_rate, export=False)
+
+    def disable(self, strategy: BaseStrategy) -> None:
+        """Stop profiling a strategy; its report stays available until `reset`."""
+        with self._lock:
+            self._uninstall(strategy)
+
+    @staticmethod
+    def _uninstall(strategy: BaseStrategy) -> None:
+        for callback in CALLBACKS:
+            if hasattr(strategy.__dict__.get(callback), "__wrapped__"):
+                del strategy.__dict__[callback]
+
+    @staticmethod
+    def is_enabled(strategy: BaseStrategy) -> bool:
+        return hasattr(strategy.__dict__.get("on_tick"), "__wrapped__")
+
+    def get(self, strategy_name: str) -> Optional[StrategyProfile]:
+        return self._profiles.get(strategy_name)
+
+    def active(self, strategy: BaseStrategy) -> Optional[StrategyProfile]:
+        """The strategy's profile if it is being profiled, else None."""
+        return self._profiles.get(strategy.name) if self.is_enabled(strategy) else None
+
+    def report(self, strategy_name: str, top: int = 10) -> Optional[Dict[str, Any]]:
+        """Profile report for a strategy, or None if it was never profiled."""
+        profile = self._profiles.get(strategy_name)
+        if profile is None:
+            return None
+        return dict(profile.report(top), enabled=self.is_enabled(profile.strategy))
+
+    def reset(self, strategy_name: str) -> None:
+        """Forget a strategy's report (and stop profiling it)."""
+        with self._lock:
+            profile = self._profiles.pop(strategy_name, None)
+            if profile is not None:
+                self._uninstall(profile.strategy)
+
+    def strategies(self) -> List[str]:
+        return list(self._profiles)
+
+# Shared by the backtester and the engine
+PROFILER = StrategyProfiler()
+
+# Example usage: overhead per on_tick call, disabled and enabled
+if __name__ == "__main__":
+    import json
+    from base_strategy import SimpleMAStrategy
+    from records import Tick
+
+    strategy = SimpleMAStrategy()
+    tick = Tick("BTC", 65000.0, "2023-01-01T00:00:00", None, 64900.0, 64800.0)
+    count = 200000
+
+    for label in ("disabled", "enabled"):
+        if label == "enabled":
+            PROFILER.enable(strategy)
+        started = time.perf_counter()
+        for _ in range(count):
+            strategy.on_tick(tick)
+        elapsed = time.perf_counter() - started
+        print(f"{label:8s} {elapsed / count * 1e9:6.0f} ns per on_tick")
+
+    PROFILER.disable(strategy)
+    print(json.dumps(PROFILER.report(strategy.name, top=5), indent=2))
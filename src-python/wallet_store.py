@@ -0,0 +1,317 @@
+import base64
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+def encode_cursor(timestamp: str, transaction_id: str) -> str:
+    """Opaque history cursor pointing just past (timestamp, id) in newest-first order."""
+    return base64.urlsafe_b64encode(json.dumps([timestamp, transaction_id]).encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> List[str]:
+    try:
+        timestamp, transaction_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return [str(timestamp), str(transaction_id)]
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+class CursorError(ValueError):
+    """The gateway does not recognize a transaction feed cursor."""
+
+class SimulatedArkGateway:
+    """
+    Local stand-in for the Ark MCP Gateway's wallet endpoints (placeholder implementation).
+
+    Keeps an append-only ledger in memory and serves it in pages after a
+    cursor, the way the gateway's transaction feed does. Transactions can be
+    added to simulate activity.
+    """
+
+    def __init__(self, transactions: Optional[List[Dict[str, Any]]] = None, height: int = 123456):
+        # In a real implementation, this would connect to the Ark MCP Gateway
+        # For now, we'll simulate the wallet's history
+        if transactions is None:
+            transactions = [
+                {"id": "tx0", "amount": 1.0, "timestamp": "2022-12-31T09:00:00Z", "type": "receive"},
+                {"id": "tx1", "amount": 0.5, "timestamp": "2023-01-01T12:00:00Z", "type": "receive"},
+                {"id": "tx2", "amount": -0.25, "timestamp": "2023-01-02T14:30:00Z", "type": "send"}
+            ]
+        self.height = height
+        self.ledger: List[Dict[str, Any]] = []
+        self.requests = 0
+        self.transactions_served = 0
+        self._lock = threading.Lock()
+        for transaction in transactions:
+            self.add_transaction(transaction)
+
+    def add_transaction(self, transaction: Dict[str, Any]) -> Dict[str, Any]:
+        """Append a transaction to the ledger (fills in id, timestamp, status and height)."""
+        with self._lock:
+            self.height += 1
+            transaction = dict(transaction)
+            transaction.setdefault("id", str(uuid.uuid4()))
+            transaction.setdefault("timestamp", datetime.utcnow().isoformat() + "Z")
+            transaction.setdefault("status", "confirmed")
+            transaction.setdefault("height", self.height)
+            self.ledger.append(transaction)
+            return transaction
+
+    def fetch_transactions(self, cursor: Optional[str] = None, limit: int = 500) -> Dict[str, Any]:
+        """
+        Return up to `limit` transactions recorded after `cursor`, oldest first.
+
+        Returns:
+            Dictionary with transactions, the cursor to resume from, whether more
+            are available and the current height
+
+        Raises:
+            CursorError: If `cursor` does not point into this ledger
+        """
+        with self._lock:
+            self.requests += 1
+            start = int(cursor) if cursor else 0
+            if start > len(self.ledger):
+                raise CursorError(f"Unknown cursor: {cursor}")
+            page = [dict(transaction) for transaction in self.ledger[start:start + limit]]
+            end = start + len(page)
+            self.transactions_served += len(page)
+            return {
+                "transactions": page,
+                "cursor": str(end),
+                "has_more": end < len(self.ledger),
+                "height": self.height
+            }
+
+class WalletStore:
+    """
+    Local copy of the wallet's transaction history, synced incrementally from the gateway.
+
+    Each sync asks the gateway only for transactions after the stored
+    cursor, so polling costs one small request however long the history is.
+    Transactions are indexed by time and by type for newest-first,
+    cursor-paginated history, and the balance is kept up to date from the
+    synced amounts so reading it never touches the gateway or the database.
+    """
+
+    def __init__(self, db_path: str = "wallet.db", gateway: Optional[SimulatedArkGateway] = None,
+                 page_size: int = 500):
+        """
+        Args:
+            db_path: SQLite database for the wallet store
+            gateway: Source of wallet transactions (default: SimulatedArkGateway)
+            page_size: Transactions requested per gateway call
+        """
+        self.db_path = db_path
+        self.gateway = gateway or SimulatedArkGateway()
+        self.page_size = page_size
+        self._local = threading.local()
+        self._sync_lock = threading.Lock()
+        self.synced_at = 0.0
+        self.init_database()
+        state = self._state()
+        self.cursor: Optional[str] = state.get("cursor")
+        self.height = int(state.get("height", 0))
+        self.balance = float(state.get("balance", 0.0))
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's database connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.db_path)
+        return conn
+
+    def init_database(self):
+        """Initialize the wallet tables and indexes."""
+        conn = self._connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS wallet_transactions (
+                id TEXT PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                type TEXT NOT NULL,
+                amount REAL NOT NULL,
+                status TEXT,
+                height INTEGER,
+                data TEXT NOT NULL
+            )
+        ''')
+        # Newest-first history, overall and per type, is read straight off these indexes
+        conn.execute("CREATE INDEX IF NOT EXISTS wallet_transactions_time ON wallet_transactions (timestamp, id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS wallet_transactions_type_time "
+                     "ON wallet_transactions (type, timestamp, id)")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS wallet_state (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        ''')
+        conn.commit()
+
+    def _state(self) -> Dict[str, str]:
+        return dict(self._connection().execute("SELECT key, value FROM wallet_state").fetchall())
+
+    def sync(self, max_age_seconds: float = 0.0) -> Dict[str, Any]:
+        """
+        Fetch transactions newer than the stored cursor and apply them.
+
+        Syncs run one at a time, so callers passing `max_age_seconds` while a
+        sync is running get its result instead of starting another. Each page
+        is stored together with the cursor that follows it, so an interrupted
+        sync resumes where it stopped; transactions seen again only have their
+        status and height updated. If the gateway rejects the stored cursor or
+        its height goes backwards, its ledger was reset, so the local copy is
+        cleared and the history and balance are rebuilt from the new ledger.
+
+        Args:
+            max_age_seconds: Skip the gateway if the last sync is more recent than this
+
+        Returns:
+            Dictionary with the number of new and updated transactions, gateway
+            requests made, whether the history was fetched again from the start,
+            the cursor, height and balance
+        """
+        with self._sync_lock:
+            if max_age_seconds and time.time() - self.synced_at < max_age_seconds:
+                return {"new": 0, "updated": 0, "requests": 0, "resynced": False, "cursor": self.cursor,
+                        "height": self.height, "balance": self.balance}
+            new = updated = requests = 0
+            resynced = False
+            conn = self._connection()
+            while True:
+                try:
+                    page = self.gateway.fetch_transactions(self.cursor, self.page_size)
+                except CursorError:
+                    if self.cursor is None:
+                        raise
+                    page = None
+                requests += 1
+                if self.cursor is not None and (page is None or page["height"] < self.height):
+                    print(f"Wallet gateway no longer matches cursor {self.cursor} at height {self.height}; "
+                          f"syncing the history again")
+                    # Rows missing from the new ledger would otherwise linger in the history and balance
+                    with conn:
+                        conn.execute("DELETE FROM wallet_transactions")
+                        conn.execute("DELETE FROM wallet_state")
+                    self.cursor = None
+                    self.height = 0
+                    self.balance = 0.0
+                    resynced = True
+                    continue
+                transactions = page["transactions"]
+                ids = [transaction["id"] for transaction in transactions]
+                known = set()
+                for start in range(0, len(ids), 500):
+                    chunk = ids[start:start + 500]
+                    known.update(row[0] for row in conn.execute(
+                        f"SELECT id FROM wallet_transactions WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                    ))
+                fresh = [transaction for transaction in transactions if transaction["id"] not in known]
+                seen = [transaction for transaction in transactions if transaction["id"] in known]
+                balance = self.balance + sum(transaction["amount"] for transaction in fresh)
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO wallet_transactions (id, timestamp, type, amount, status, height, data) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        [(t["id"], t["timestamp"], t["type"], t["amount"], t.get("status"), t.get("height"),
+                          json.dumps(t)) for t in fresh]
+                    )
+                    conn.executemany(
+                        "UPDATE wallet_transactions SET status = ?, height = ?, data = ? WHERE id = ?",
+                        [(t.get("status"), t.get("height"), json.dumps(t), t["id"]) for t in seen]
+                    )
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO wallet_state (key, value) VALUES (?, ?)",
+                        [("cursor", page["cursor"]), ("height", str(page["height"])), ("balance", repr(balance))]
+                    )
+                self.cursor = page["cursor"]
+                self.height = page["height"]
+                self.balance = balance
+                new += len(fresh)
+                updated += len(seen)
+                if not page.get("has_more") or not transactions:
+                    break
+            self.synced_at = time.time()
+            return {"new": new, "updated": updated, "requests": requests, "resynced": resynced,
+                    "cursor": self.cursor, "height": self.height, "balance": self.balance}
+
+    def history(self, limit: int = 50, cursor: Optional[str] = None, type: Optional[str] = None,
+                since: Optional[str] = None, until: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Return transactions newest first, one page at a time.
+
+        Args:
+            limit: Maximum transactions in the page
+            cursor: `next_cursor` of the previous page
+            type: Only transactions of this type (e.g. "send" or "receive")
+            since: Earliest timestamp (inclusive, as stored)
+            until: Latest timestamp (exclusive, as stored)
+
+        Returns:
+            Dictionary with the page's transactions and the cursor of the next
+            page (None on the last page)
+        """
+        conditions, params = [], []
+        if type:
+            conditions.append("type = ?")
+            params.append(type)
+        if since:
+            conditions.append("timestamp >= ?")
+            params.append(since)
+        if until:
+            conditions.append("timestamp < ?")
+            params.append(until)
+        if cursor:
+            conditions.append("(timestamp, id) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+        query = "SELECT data FROM wallet_transactions"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        rows = self._connection().execute(query, params).fetchall()
+        transactions = [json.loads(row[0]) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = transactions[-1]
+            next_cursor = encode_cursor(last["timestamp"], last["id"])
+        return {"transactions": transactions, "next_cursor": next_cursor}
+
+    def stats(self) -> Dict[str, Any]:
+        count = self._connection().execute("SELECT COUNT(*) FROM wallet_transactions").fetchone()[0]
+        return {
+            "transactions": count,
+            "balance": self.balance,
+            "cursor": self.cursor,
+            "height": self.height,
+            "synced_at": self.synced_at
+        }
+
+# Example usage: incremental sync against the local gateway stand-in
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    gateway = SimulatedArkGateway(transactions=[])
+    for i in range(20000):
+        gateway.add_transaction({
+            "amount": 0.001 if i % 3 else -0.0005,
+            "timestamp": f"2023-01-{1 + i // 1000:02d}T{(i // 60) % 24:02d}:{i % 60:02d}:00Z",
+            "type": "receive" if i % 3 else "send"
+        })
+    store = WalletStore(os.path.join(tempfile.mkdtemp(prefix="noah-wallet-"), "wallet.db"), gateway)
+
+    started = time.perf_counter()
+    print("Initial sync:", store.sync(), f"{(time.perf_counter() - started) * 1000:.0f} ms")
+    gateway.add_transaction({"amount": 0.5, "type": "receive"})
+    started = time.perf_counter()
+    print("Next poll:", store.sync(), f"{(time.perf_counter() - started) * 1000:.1f} ms")
+    print(f"Gateway served {gateway.transactions_served} transactions in {gateway.requests} requests")
+
+    page = store.history(limit=3, type="send")
+    print([transaction["id"][:8] for transaction in page["transactions"]], page["next_cursor"])
+    page = store.history(limit=3, type="send", cursor=page["next_cursor"])
+    print([transaction["id"][:8] for transaction in page["transactions"]])
+    print(store.stats())
@@ -0,0 +1,142 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional
+from metrics import REGISTRY
+
+POOL_RUNNING = REGISTRY.gauge("noah_pool_running", "Calls running on a bounded worker pool", ("pool",))
+POOL_QUEUED = REGISTRY.gauge("noah_pool_queued", "Calls waiting for a bounded worker pool", ("pool",))
+POOL_REJECTED = REGISTRY.counter("noah_pool_rejected_total", "Calls rejected because the pool queue was full", ("pool",))
+POOL_TIMEOUTS = REGISTRY.counter("noah_pool_timeouts_total", "Calls that timed out queueing or running", ("pool",))
+
+class PoolSaturated(Exception):
+    """Raised when a bounded worker pool's queue is full."""
+
+class BoundedWorkerPool:
+    """
+    Thread pool with a fixed number of workers, a bounded admission queue and
+    timeouts, so bursts of slow work are rejected instead of piling up.
+
+    `run` must be awaited on the event loop. A call that times out while
+    running keeps its worker until the function returns (threads cannot be
+    interrupted), so the number of running calls never exceeds `max_workers`.
+    """
+
+    def __init__(self, name: str, max_workers: int = 2, max_queue: int = 16,
+                 queue_timeout: float = 10.0, run_timeout: float = 60.0):
+        """
+        Args:
+            name: Pool name, used for thread names and metric labels
+            max_workers: Maximum calls running at once
+            max_queue: Maximum calls waiting for a worker; further calls are rejected
+            queue_timeout: Seconds a call may wait for a worker
+            run_timeout: Seconds the caller waits for a running call
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.run_timeout = run_timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"noah-{name}")
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._running_gauge = POOL_RUNNING.labels(name)
+        self._queued_gauge = POOL_QUEUED.labels(name)
+
+    async def run(self, function: Callable, *args, run_timeout: Optional[float] = None) -> Any:
+        """
+        Run a blocking function on the pool.
+
+        Args:
+            function: Callable to run on a worker thread
+            *args: Positional arguments for the callable
+            run_timeout: Per-call override of the running timeout
+
+        Returns:
+            The function's result
+
+        Raises:
+            PoolSaturated: If the queue is full
+            asyncio.TimeoutError: If no worker frees up within `queue_timeout`
+                or the call runs longer than the running timeout
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        if self.queued + self.running >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            POOL_REJECTED.labels(self.name).inc()
+            raise PoolSaturated(f"{self.name} pool is busy ({self.queued} calls queued)")
+
+        self.queued += 1
+        self._queued_gauge.inc()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            POOL_TIMEOUTS.labels(self.name).inc()
+            raise
+        finally:
+            self.queued -= 1
+            self._queued_gauge.dec()
+
+        self.running += 1
+        self._running_gauge.inc()
+        future = asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+        future.add_done_callback(self._release)
+        try:
+            # Shielded so a timed-out caller does not release the slot before the worker is done
+            return await asyncio.wait_for(asyncio.shield(future),
+                                          self.run_timeout if run_timeout is None else run_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            POOL_TIMEOUTS.labels(self.name).inc()
+            raise
+
+    def _release(self, future: asyncio.Future) -> None:
+        self.running -= 1
+        self.completed += 1
+        self._running_gauge.dec()
+        self._slots.release()
+        if not future.cancelled():
+            future.exception()  # Mark a failure of an abandoned call as retrieved
+
+    def shutdown(self, wait: bool = False) -> None:
+        self.executor.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "queued": self.queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts
+        }
+
+# Example usage
+if __name__ == "__main__":
+    import time
+
+    async def main():
+        pool = BoundedWorkerPool("example", max_workers=2, max_queue=3, queue_timeout=0.5, run_timeout=0.3)
+
+        async def call(seconds: float) -> str:
+            try:
+                return await pool.run(time.sleep, seconds) or "ok"
+            except PoolSaturated:
+                return "rejected"
+            except asyncio.TimeoutError:
+                return "timeout"
+
+        # 2 run, 3 queue, the rest are rejected; the slow calls time out
+        results = await asyncio.gather(*(call(0.1 if i % 3 else 0.4) for i in range(8)))
+        print(results)
+        await asyncio.sleep(0.5)
+        print(pool.stats())
+        pool.shutdown()
+
+    asyncio.run(main())